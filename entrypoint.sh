@@ -2,4 +2,4 @@
 
 cd src
 python manage.py migrate && \
-python manage.py runserver 0.0.0.0:8000
+exec python manage.py serve --bind 0.0.0.0:8000
@@ -4,3 +4,10 @@ from django.apps import AppConfig
 class SchedulerConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'scheduler'
+
+    def ready(self):
+        import scheduler.signals  # noqa: F401
+        from django.db.backends.signals import connection_created
+        from scheduler.metrics import install_query_recorder
+
+        connection_created.connect(install_query_recorder, dispatch_uid="scheduler.metrics.query_recorder")
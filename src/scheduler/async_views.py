@@ -0,0 +1,244 @@
+from inspect import isawaitable
+
+from asgiref.sync import sync_to_async
+from rest_framework import exceptions, status
+from rest_framework.response import Response
+from rest_framework.views import APIView
+
+from scheduler.slots import SlotGrid
+from scheduler.utils import (
+    acreate_attendee,
+    aget_event_by_unique_id,
+    apply_specific_date_intervals,
+    create_day_of_week_availability,
+    delete_availability,
+    etag_matches,
+    get_bitmap_availabilities_list,
+    get_bitmap_interval,
+    get_event_day_of_week,
+    get_attendee_by_event_and_name,
+    get_day_of_week_bits,
+    get_existing_day_availability,
+    get_existing_days_of_week_availability,
+    get_existing_specific_date_availability,
+    get_specific_date_bits,
+    update_attendee_bitmap,
+)
+from scheduler.views import (
+    DayOfWeekAvailabilityView,
+    EventView,
+    SignInEventView,
+    SpecificDateAvailabilityView,
+    check_event_attendee,
+    outside_grid_response,
+)
+from scheduler.write_queue import asubmit_write
+
+
+class AsyncAPIView(APIView):
+    """APIView whose handlers are coroutines, awaited on the event loop under ASGI.
+
+    A request holds no thread while it waits on the database, the write queue or the
+    password hashing pool. Authenticators with an ``aauthenticate`` coroutine are awaited;
+    negotiation, permission and throttle checks are the synchronous DRF ones, which do no I/O.
+    Under WSGI Django runs the view in an event loop of its own.
+    """
+
+    async def dispatch(self, request, *args, **kwargs):
+        self.args = args
+        self.kwargs = kwargs
+        request = self.initialize_request(request, *args, **kwargs)
+        self.request = request
+        self.headers = self.default_response_headers
+
+        try:
+            await self.aperform_authentication(request)
+            self.initial(request, *args, **kwargs)
+
+            if request.method.lower() in self.http_method_names:
+                handler = getattr(self, request.method.lower(), self.http_method_not_allowed)
+            else:
+                handler = self.http_method_not_allowed
+
+            response = handler(request, *args, **kwargs)
+            # OPTIONS is answered by the synchronous APIView handler
+            if isawaitable(response):
+                response = await response
+
+        except Exception as exc:
+            response = self.handle_exception(exc)
+
+        self.response = self.finalize_response(request, response, *args, **kwargs)
+        return self.response
+
+    async def aperform_authentication(self, request):
+        """Sets request.user and request.auth before initial() reads them."""
+        for authenticator in request.authenticators:
+            authenticate = getattr(authenticator, "aauthenticate", None)
+            try:
+                if authenticate is not None:
+                    user_auth_tuple = await authenticate(request)
+                else:
+                    user_auth_tuple = await sync_to_async(authenticator.authenticate)(request)
+            except exceptions.APIException:
+                request._not_authenticated()
+                raise
+
+            if user_auth_tuple is not None:
+                request._authenticator = authenticator
+                request.user, request.auth = user_auth_tuple
+                return
+        request._not_authenticated()
+
+
+# The handlers below keep the flow of their synchronous counterparts, whose validation and
+# response building they reuse: only database reads and writes leave the event loop.
+
+
+class AsyncEventView(AsyncAPIView, EventView):
+    async def post(self, request):
+        # DRF serializers have no async API; validation and the inserts run on a thread
+        return await sync_to_async(super().post)(request)
+
+    async def get(self, request, unique_id):
+        event = await aget_event_by_unique_id(unique_id)
+
+        attendee = request.user if request.user.is_authenticated else None
+        options = self.get_read_options(request)
+        if isinstance(options, Response):
+            return options
+
+        headers = self.get_read_headers(request, event, attendee, options)
+        if etag_matches(request, headers["ETag"]):
+            return Response(status=status.HTTP_304_NOT_MODIFIED, headers=headers)
+        return await sync_to_async(self.read_response)(request, event, attendee, options, headers)
+
+
+class AsyncSignInEventView(AsyncAPIView, SignInEventView):
+    async def post(self, request, unique_id):
+        event = await aget_event_by_unique_id(unique_id)
+
+        name = request.data.get('name')
+        password = request.data.get('password')
+        timezone = request.data.get('timezone', event.timezone)
+
+        attendee = await sync_to_async(get_attendee_by_event_and_name)(event, name)
+
+        if attendee:
+            return self.signed_in(attendee, *await attendee.avalidate_password(password))
+        return self.signed_up(event, await acreate_attendee(event, name, password, timezone))
+
+
+class AsyncSpecificDateAvailabilityView(AsyncAPIView, SpecificDateAvailabilityView):
+    async def post(self, request, unique_id):
+        attendee = request.user
+        event = await aget_event_by_unique_id(unique_id)
+
+        forbidden = check_event_attendee(attendee, event)
+        if forbidden:
+            return forbidden
+
+        interval = self.parse_added_interval(request)
+        if isinstance(interval, Response):
+            return interval
+        start_time, end_time = interval
+
+        if event.compact_storage:
+            grid = SlotGrid(event)
+            bits = get_specific_date_bits(grid, start_time, end_time)
+            if bits is None:
+                return outside_grid_response()
+            old_bits, new_bits = await asubmit_write(update_attendee_bitmap, attendee, grid, add=bits)
+            added = get_bitmap_availabilities_list(grid, bits & ~old_bits)
+            return self.added_response(event, attendee, added, get_bitmap_interval(grid, new_bits, bits))
+
+        added = (await asubmit_write(apply_specific_date_intervals, attendee, [((start_time, end_time), True)])).created
+        avail = await sync_to_async(get_existing_specific_date_availability)(attendee, start_time, end_time)
+        return self.added_response(
+            event, attendee, added, {"id": avail.id, "start_time": avail.start_time, "end_time": avail.end_time}
+        )
+
+    async def delete(self, request, unique_id):
+        attendee = request.user
+        event = await aget_event_by_unique_id(unique_id)
+
+        forbidden = check_event_attendee(attendee, event)
+        if forbidden:
+            return forbidden
+
+        interval = self.parse_removed_interval(request)
+        if isinstance(interval, Response):
+            return interval
+        start_time, end_time = interval
+
+        if event.compact_storage:
+            grid = SlotGrid(event)
+            bits = get_specific_date_bits(grid, start_time, end_time)
+            if bits is None:
+                return self.removed_response(event, attendee, [])
+            old_bits, _ = await asubmit_write(update_attendee_bitmap, attendee, grid, remove=bits)
+            return self.removed_response(event, attendee, get_bitmap_availabilities_list(grid, bits & old_bits))
+
+        removed = (await asubmit_write(apply_specific_date_intervals, attendee, [((start_time, end_time), False)])).deleted
+        return self.removed_response(event, attendee, removed)
+
+
+class AsyncDayOfWeekAvailabilityView(AsyncAPIView, DayOfWeekAvailabilityView):
+    async def post(self, request, unique_id):
+        attendee = request.user
+        event = await aget_event_by_unique_id(unique_id)
+
+        forbidden = check_event_attendee(attendee, event)
+        if forbidden:
+            return forbidden
+
+        slot = self.parse_added_slot(request)
+        if isinstance(slot, Response):
+            return slot
+        day_number, start_hour = slot
+
+        if event.compact_storage:
+            grid = SlotGrid(event)
+            bits = get_day_of_week_bits(grid, day_number, start_hour)
+            if bits is None:
+                return outside_grid_response()
+            old_bits, _ = await asubmit_write(update_attendee_bitmap, attendee, grid, add=bits)
+            event_day = get_event_day_of_week(event, day_number)
+            return self.added_response(
+                event, attendee, bits.bit_length() - 1, event_day, start_hour, created=not old_bits & bits
+            )
+
+        avail = await sync_to_async(get_existing_day_availability)(attendee, day_number, start_hour)
+        if avail:
+            return self.added_response(event, attendee, avail.id, avail.event_day_of_week, start_hour, created=False)
+        avail = await asubmit_write(create_day_of_week_availability, event, attendee, day_number, start_hour)
+        return self.added_response(event, attendee, avail.id, avail.event_day_of_week, start_hour, created=True)
+
+    async def delete(self, request, unique_id):
+        attendee = request.user
+        event = await aget_event_by_unique_id(unique_id)
+
+        forbidden = check_event_attendee(attendee, event)
+        if forbidden:
+            return forbidden
+
+        slot = self.parse_removed_slot(request)
+        if isinstance(slot, Response):
+            return slot
+        day_number, start_hour = slot
+
+        if event.compact_storage:
+            grid = SlotGrid(event)
+            bits = get_day_of_week_bits(grid, day_number, start_hour)
+            if bits is None:
+                return self.removed_response(event, attendee, None)
+            old_bits, _ = await asubmit_write(update_attendee_bitmap, attendee, grid, remove=bits)
+            return self.removed_response(event, attendee, slot if old_bits & bits else None)
+
+        existing_availability = await sync_to_async(get_existing_days_of_week_availability)(
+            attendee, day_number, start_hour
+        )
+        if not existing_availability:
+            return self.removed_response(event, attendee, None)
+        await asubmit_write(delete_availability, event, existing_availability)
+        return self.removed_response(event, attendee, (day_number, start_hour))
@@ -11,7 +11,32 @@ class CustomJWTAuthentication(JWTAuthentication):
             raise AuthenticationFailed('Invalid token: user_id is missing')
 
         try:
-            user = get_user_model().objects.get(id=user_id)
+            user = get_user_model().objects.select_related('event').get(id=user_id)
+        except get_user_model().DoesNotExist:
+            raise AuthenticationFailed('User not found')
+
+        return user
+
+    async def aauthenticate(self, request):
+        """authenticate() for async views: the token is checked inline and the user read with the async ORM."""
+        header = self.get_header(request)
+        if header is None:
+            return None
+
+        raw_token = self.get_raw_token(header)
+        if raw_token is None:
+            return None
+
+        validated_token = self.get_validated_token(raw_token)
+        return await self.aget_user(validated_token), validated_token
+
+    async def aget_user(self, validated_token):
+        user_id = validated_token.get('user_id')
+        if user_id is None:
+            raise AuthenticationFailed('Invalid token: user_id is missing')
+
+        try:
+            user = await get_user_model().objects.select_related('event').aget(id=user_id)
         except get_user_model().DoesNotExist:
             raise AuthenticationFailed('User not found')
 
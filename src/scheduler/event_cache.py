@@ -0,0 +1,65 @@
+import threading
+import time
+from collections import OrderedDict
+
+from django.conf import settings
+
+
+class EventCache:
+    """Bounded, thread-safe LRU cache with a per-entry time to live."""
+
+    def __init__(self, maxsize, ttl):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[1] > time.monotonic():
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return entry[0]
+            if entry is not None:
+                del self._entries[key]
+            self.misses += 1
+            return None
+
+    def peek(self, key):
+        """Returns a live entry without touching the LRU order or the counters."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[1] > time.monotonic():
+                return entry[0]
+            return None
+
+    def set(self, key, value):
+        with self._lock:
+            self._entries[key] = (value, time.monotonic() + self.ttl)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+    def invalidate(self, key):
+        with self._lock:
+            self._entries.pop(key, None)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self):
+        with self._lock:
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "size": len(self._entries),
+                "maxsize": self.maxsize,
+                "ttl": self.ttl,
+            }
+
+
+event_cache = EventCache(settings.EVENT_LOOKUP_CACHE_SIZE, settings.EVENT_LOOKUP_CACHE_TTL)
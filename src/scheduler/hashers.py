@@ -0,0 +1,62 @@
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from django.contrib.auth.hashers import PBKDF2PasswordHasher, make_password, verify_password
+
+
+class EventPasswordHasher(PBKDF2PasswordHasher):
+    """PBKDF2 with a per-deployment work factor sized for low-stakes event passwords.
+
+    It has its own algorithm name so changing EVENT_PASSWORD_ITERATIONS re-hashes stored
+    passwords on their next sign-in instead of breaking them. It is not the default hasher:
+    only the attendee sign-in path below asks for it, so staff passwords keep Django's profile.
+    """
+    algorithm = "event_pbkdf2_sha256"
+    iterations = settings.EVENT_PASSWORD_ITERATIONS
+
+
+# hashlib releases the GIL while running PBKDF2, so async views hash on this pool without
+# blocking the event loop. Sync views already run on a request thread and hash in place:
+# handing the work to the pool would only hold that thread idle while a worker hashes.
+hashing_executor = ThreadPoolExecutor(
+    max_workers=settings.PASSWORD_HASHING_WORKERS,
+    thread_name_prefix="password-hashing",
+)
+
+
+def get_attendee_hasher(attendee):
+    # staff attendees also sign in to the admin, whose passwords keep the default hasher
+    return "default" if attendee.is_staff else EventPasswordHasher.algorithm
+
+
+def _verify(password, encoded, hasher):
+    is_correct, must_update = verify_password(password, encoded, preferred=hasher)
+    return is_correct, make_password(password, hasher=hasher) if is_correct and must_update else None
+
+
+def hash_password(password):
+    return make_password(password, hasher=EventPasswordHasher.algorithm)
+
+
+async def ahash_password(password):
+    return await asyncio.get_running_loop().run_in_executor(hashing_executor, hash_password, password)
+
+
+def check_attendee_password(attendee, password):
+    """Checks the password and stores a re-hash if the hasher profile changed."""
+    is_correct, new_encoded = _verify(password, attendee.password, get_attendee_hasher(attendee))
+    if new_encoded:
+        attendee.password = new_encoded
+        attendee.save(update_fields=["password"])
+    return is_correct
+
+
+async def acheck_attendee_password(attendee, password):
+    is_correct, new_encoded = await asyncio.get_running_loop().run_in_executor(
+        hashing_executor, _verify, password, attendee.password, get_attendee_hasher(attendee)
+    )
+    if new_encoded:
+        attendee.password = new_encoded
+        await attendee.asave(update_fields=["password"])
+    return is_correct
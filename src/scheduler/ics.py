@@ -0,0 +1,126 @@
+from bisect import bisect_right
+from datetime import datetime, timedelta
+import pytz
+
+
+WEEKDAY_CODES = ("MO", "TU", "WE", "TH", "FR", "SA", "SU")
+
+# Lines are folded at 75 octets (RFC 5545, 3.1).
+MAX_LINE_OCTETS = 75
+
+# How far past a weekly recurrence's start its VTIMEZONE lists offset changes.
+WEEKLY_TIMEZONE_SPAN = timedelta(days=2 * 366)
+
+
+def escape_text(value):
+    return (
+        str(value).replace("\\", "\\\\").replace(";", "\\;").replace(",", "\\,")
+        .replace("\r\n", "\\n").replace("\n", "\\n")
+    )
+
+
+def fold(line):
+    """Encodes a content line with CRLF, continuing it on space-indented lines past 75 octets.
+
+    Lines are only broken between characters, so multi-byte UTF-8 text stays intact.
+    """
+    chunks = []
+    size = 0
+    limit = MAX_LINE_OCTETS
+    start = 0
+    for position, char in enumerate(line):
+        width = len(char.encode())
+        if size + width > limit:
+            chunks.append(line[start:position])
+            start = position
+            size = 0
+            limit = MAX_LINE_OCTETS - 1
+        size += width
+    chunks.append(line[start:])
+    return ("\r\n ".join(chunks) + "\r\n").encode()
+
+
+def format_local(value):
+    return value.strftime("%Y%m%dT%H%M%S")
+
+
+def format_offset(offset):
+    seconds = int(offset.total_seconds())
+    sign = "-" if seconds < 0 else "+"
+    hours, rest = divmod(abs(seconds), 3600)
+    minutes, seconds = divmod(rest, 60)
+    return f"{sign}{hours:02d}{minutes:02d}{seconds:02d}" if seconds else f"{sign}{hours:02d}{minutes:02d}"
+
+
+def iter_vtimezone(zone, start, end):
+    """Yields a VTIMEZONE for ``zone`` listing each of its offset changes between ``start`` and ``end``."""
+    yield "BEGIN:VTIMEZONE"
+    yield f"TZID:{zone.zone}"
+    transitions = getattr(zone, "_utc_transition_times", None)
+    if not transitions:
+        offset = zone.utcoffset(None) or timedelta(0)
+        yield from iter_timezone_component("STANDARD", datetime(1970, 1, 1), offset, offset, zone.tzname(None))
+    else:
+        start = start.astimezone(pytz.UTC).replace(tzinfo=None)
+        end = end.astimezone(pytz.UTC).replace(tzinfo=None)
+        first = max(bisect_right(transitions, start) - 1, 0)
+        last = max(bisect_right(transitions, end), first + 1)
+        for position in range(first, last):
+            offset, dst, name = zone._transition_info[position]
+            offset_from = zone._transition_info[max(position - 1, 0)][0]
+            # pytz tables start at datetime.min, which has no local time to write
+            onset = max(transitions[position], datetime(1970, 1, 1)) + offset_from
+            kind = "DAYLIGHT" if dst else "STANDARD"
+            yield from iter_timezone_component(kind, onset, offset_from, offset, name)
+    yield "END:VTIMEZONE"
+
+
+def iter_timezone_component(kind, onset, offset_from, offset_to, name):
+    yield f"BEGIN:{kind}"
+    yield f"DTSTART:{format_local(onset)}"
+    yield f"TZOFFSETFROM:{format_offset(offset_from)}"
+    yield f"TZOFFSETTO:{format_offset(offset_to)}"
+    yield f"TZNAME:{name}"
+    yield f"END:{kind}"
+
+
+def iter_calendar(event, windows, stamp):
+    """Yields an iCalendar file, line by line as bytes, with one VEVENT per window.
+
+    A window is a dict with aware ``start`` and ``end`` datetimes in the event timezone, a
+    ``description`` and, for weekly recurrences, ``weekly`` set. Times are written as local
+    times with the event's TZID.
+    """
+    zone = pytz.timezone(event.timezone)
+    lines = [
+        "BEGIN:VCALENDAR",
+        "VERSION:2.0",
+        "PRODID:-//when2meet//Event export//EN",
+        "CALSCALE:GREGORIAN",
+        "METHOD:PUBLISH",
+        f"X-WR-CALNAME:{escape_text(event.name)}",
+        f"X-WR-TIMEZONE:{zone.zone}",
+    ]
+    for line in lines:
+        yield fold(line)
+    if windows:
+        span_end = max(
+            window["start"] + WEEKLY_TIMEZONE_SPAN if window.get("weekly") else window["end"] for window in windows
+        )
+        for line in iter_vtimezone(zone, min(window["start"] for window in windows), span_end):
+            yield fold(line)
+
+    for window in windows:
+        start = window["start"].astimezone(zone)
+        yield fold("BEGIN:VEVENT")
+        yield fold(f"UID:{event.unique_id}-{format_local(start)}@when2meet")
+        yield fold(f"DTSTAMP:{stamp.astimezone(pytz.UTC).strftime('%Y%m%dT%H%M%SZ')}")
+        yield fold(f"DTSTART;TZID={zone.zone}:{format_local(start)}")
+        yield fold(f"DTEND;TZID={zone.zone}:{format_local(window['end'].astimezone(zone))}")
+        if window.get("weekly"):
+            yield fold(f"RRULE:FREQ=WEEKLY;BYDAY={WEEKDAY_CODES[start.weekday()]}")
+        yield fold(f"SUMMARY:{escape_text(event.name)}")
+        yield fold(f"DESCRIPTION:{escape_text(window['description'])}")
+        yield fold(f"URL:{event.get_event_link()}")
+        yield fold("END:VEVENT")
+    yield fold("END:VCALENDAR")
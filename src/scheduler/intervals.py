@@ -0,0 +1,71 @@
+from bisect import bisect_left, bisect_right
+
+
+def normalize(intervals):
+    """Sorts half-open ``(start, end)`` intervals and merges the overlapping and adjacent ones."""
+    merged = []
+    for start, end in sorted(intervals):
+        if merged and start <= merged[-1][1]:
+            if end > merged[-1][1]:
+                merged[-1] = (merged[-1][0], end)
+        else:
+            merged.append((start, end))
+    return merged
+
+
+def union(intervals, others):
+    return normalize([*intervals, *others])
+
+
+def subtract(intervals, others):
+    """Parts of ``intervals`` not covered by ``others``; both must be normalized."""
+    result = []
+    first = 0
+    for start, end in intervals:
+        while first < len(others) and others[first][1] <= start:
+            first += 1
+        position = first
+        while position < len(others) and others[position][0] < end:
+            if others[position][0] > start:
+                result.append((start, others[position][0]))
+            start = max(start, others[position][1])
+            position += 1
+        if start < end:
+            result.append((start, end))
+    return result
+
+
+def intersect(intervals, others):
+    return subtract(intervals, subtract(intervals, others))
+
+
+class IntervalIndex:
+    """Answers "which owners cover all of [start, end)" over disjoint per-owner intervals.
+
+    Intervals are kept sorted by start next to the longest interval length. An interval
+    covering ``start`` must begin in ``[start - longest, start]``, so a query bisects to that
+    window and only checks the intervals inside it: O(log n + k) instead of a full scan.
+    Bounds can be any ordered values whose differences add back to them (numbers, datetimes).
+    """
+
+    def __init__(self, intervals):
+        # (start, end, owner), with each owner's intervals normalized so coverage is one interval
+        entries = sorted(intervals, key=lambda entry: entry[0])
+        self.starts = [start for start, _, _ in entries]
+        self.entries = entries
+        self.longest = max((end - start for start, end, _ in entries), default=None)
+
+    @classmethod
+    def from_owners(cls, owner_intervals):
+        return cls([
+            (start, end, owner)
+            for owner, intervals in owner_intervals.items()
+            for start, end in normalize(intervals)
+        ])
+
+    def covering(self, start, end):
+        if self.longest is None or end - start > self.longest:
+            return []
+        low = bisect_left(self.starts, start - self.longest)
+        high = bisect_right(self.starts, start)
+        return [owner for entry_start, entry_end, owner in self.entries[low:high] if entry_end >= end]
@@ -0,0 +1,52 @@
+import json
+import time
+import urllib.error
+import urllib.request
+
+
+def percentile(sorted_values, fraction):
+    if not sorted_values:
+        return None
+    index = min(len(sorted_values) - 1, int(round(fraction * (len(sorted_values) - 1))))
+    return sorted_values[index]
+
+
+def summarize(latencies, elapsed, errors=0):
+    """Throughput and latency percentiles (milliseconds) of one benchmark phase."""
+    latencies = sorted(latencies)
+    return {
+        "requests": len(latencies),
+        "errors": errors,
+        "seconds": round(elapsed, 3),
+        "throughput_per_second": round(len(latencies) / elapsed, 1) if elapsed else None,
+        "p50_ms": _milliseconds(percentile(latencies, 0.50)),
+        "p95_ms": _milliseconds(percentile(latencies, 0.95)),
+        "p99_ms": _milliseconds(percentile(latencies, 0.99)),
+    }
+
+
+def _milliseconds(seconds):
+    return None if seconds is None else round(seconds * 1000, 2)
+
+
+def request_json(method, url, body=None, token=None, headers=None, timeout=30):
+    """Sends one JSON request; returns (status, parsed body, latency in seconds, response headers)."""
+    data = json.dumps(body).encode() if body is not None else None
+    request = urllib.request.Request(url, data=data, method=method)
+    request.add_header("Content-Type", "application/json")
+    if token:
+        request.add_header("Authorization", f"Bearer {token}")
+    for name, value in (headers or {}).items():
+        request.add_header(name, value)
+    started = time.perf_counter()
+    try:
+        with urllib.request.urlopen(request, timeout=timeout) as response:
+            status, payload, response_headers = response.status, response.read(), response.headers
+    except urllib.error.HTTPError as error:
+        status, payload, response_headers = error.code, error.read(), error.headers
+    latency = time.perf_counter() - started
+    try:
+        parsed = json.loads(payload) if payload else None
+    except ValueError:
+        parsed = None
+    return status, parsed, latency, response_headers
@@ -0,0 +1,209 @@
+import asyncio
+import json
+import time
+import uuid
+from urllib.parse import urlsplit
+
+from django.core.management.base import BaseCommand, CommandError
+
+from scheduler.management.commands._benchmarking import request_json, summarize
+
+
+class Command(BaseCommand):
+    help = (
+        "Measures how many concurrent connections one server worker sustains. For each level of "
+        "--connections it opens that many keep-alive connections at once and has each send "
+        "requests back to back for --duration seconds, then reports throughput, latency "
+        "percentiles and failed requests or connections. Point it at a single worker, e.g. "
+        "`manage.py serve --interface asgi --workers 1`, and run it once with ASYNC_VIEWS=False "
+        "on the server to compare against the sync views."
+    )
+
+    SCENARIOS = ("read", "poll", "write", "signin")
+
+    def add_arguments(self, parser):
+        parser.add_argument("--url", required=True, help="Base URL of a running server, e.g. http://127.0.0.1:8000")
+        parser.add_argument("--connections", default="50,200,800",
+                            help="Comma-separated numbers of concurrent connections to try.")
+        parser.add_argument("--duration", type=float, default=5, help="Seconds spent at each level.")
+        parser.add_argument("--scenario", choices=self.SCENARIOS, default="read",
+                            help="read: full event GET; poll: conditional GET answered 304; write: add and "
+                                 "remove a slot; signin: password sign-in.")
+        parser.add_argument("--timeout", type=float, default=30, help="Seconds before a request counts as failed.")
+
+    def handle(self, *args, **options):
+        try:
+            levels = [int(level) for level in options["connections"].split(",")]
+        except ValueError:
+            raise CommandError("--connections must be comma-separated integers.")
+        base_url = options["url"].rstrip("/")
+        unique_id = self.create_event(base_url)
+
+        results = {
+            "config": {
+                "url": base_url,
+                "scenario": options["scenario"],
+                "duration": options["duration"],
+            },
+            "levels": {},
+        }
+        for connections in levels:
+            results["levels"][connections] = asyncio.run(
+                self.run_level(base_url, unique_id, connections, options)
+            )
+            self.stderr.write(f"{connections} connections: {json.dumps(results['levels'][connections])}")
+        self.stdout.write(json.dumps(results, indent=2))
+
+    def create_event(self, base_url):
+        status, body, _, _ = request_json("POST", f"{base_url}/event/create/", {
+            "name": "bench-connections",
+            "start_time": "00:00",
+            "end_time": "23:59",
+            "event_type": "Days of Week",
+            "days_of_week": [{"day": label} for label in ("دوشنبه", "سه‌شنبه", "چهارشنبه", "پنج‌شنبه", "جمعه", "شنبه", "یکشنبه")],
+        })
+        if status != 201:
+            raise CommandError(f"Could not create benchmark event: {status} {body}")
+        return body["event_link"].rsplit("/", 1)[1]
+
+    async def run_level(self, base_url, unique_id, connections, options):
+        # sign-ups and the first GET of every connection happen before the clock starts
+        pool = [Connection(base_url, unique_id, number, options) for number in range(connections)]
+        prepared = await asyncio.gather(*[connection.prepare() for connection in pool])
+        deadline = time.monotonic() + options["duration"]
+        outcomes = await asyncio.gather(*[
+            connection.run(deadline) for connection, ready in zip(pool, prepared) if ready
+        ])
+        latencies = [latency for connection_latencies, _, _ in outcomes for latency in connection_latencies]
+        errors = sum(errors for _, errors, _ in outcomes)
+        return {
+            **summarize(latencies, options["duration"], errors=errors),
+            "failed_connections": prepared.count(False) + sum(not connected for _, _, connected in outcomes),
+        }
+
+
+class Connection:
+    """One keep-alive HTTP/1.1 connection sending its scenario's requests one after another."""
+
+    DAYS = ("دوشنبه", "سه‌شنبه", "چهارشنبه", "پنج‌شنبه", "جمعه", "شنبه", "یکشنبه")
+
+    def __init__(self, base_url, unique_id, number, options):
+        parts = urlsplit(base_url)
+        self.host = parts.hostname
+        self.port = parts.port or 80
+        self.prefix = f"{parts.path}/event/{unique_id}"
+        self.number = number
+        self.scenario = options["scenario"]
+        self.timeout = options["timeout"]
+        self.name = f"conn-{uuid.uuid4().hex[:12]}"
+        self.token = None
+        self.etag = None
+        self.reader = self.writer = None
+
+    async def connect(self):
+        self.reader, self.writer = await asyncio.wait_for(
+            asyncio.open_connection(self.host, self.port), self.timeout
+        )
+
+    async def prepare(self):
+        """Runs the scenario's setup requests on a connection of their own; returns whether they succeeded.
+
+        The connection is closed afterwards: the server drops keep-alive connections left idle
+        while the other connections are still being prepared.
+        """
+        try:
+            await self.connect()
+            await asyncio.wait_for(self.setup(), self.timeout)
+        except (OSError, asyncio.TimeoutError, asyncio.IncompleteReadError, ValueError):
+            return False
+        finally:
+            if self.writer:
+                self.writer.close()
+        return True
+
+    async def run(self, deadline):
+        """Returns (latencies of successful requests, failed requests, whether it connected)."""
+        latencies = []
+        errors = 0
+        try:
+            await self.connect()
+        except (OSError, asyncio.TimeoutError):
+            return latencies, 1, False
+
+        step = 0
+        try:
+            while time.monotonic() < deadline:
+                method, path, body, expected = self.next_request(step)
+                step += 1
+                started = time.perf_counter()
+                try:
+                    status, _ = await asyncio.wait_for(self.request(method, path, body), self.timeout)
+                except (OSError, asyncio.TimeoutError, asyncio.IncompleteReadError, ValueError):
+                    errors += 1
+                    break
+                if status in expected:
+                    latencies.append(time.perf_counter() - started)
+                else:
+                    errors += 1
+        finally:
+            self.writer.close()
+        return latencies, errors, True
+
+    async def setup(self):
+        if self.scenario in ("write", "signin"):
+            status, body = await self.request("POST", f"{self.prefix}/signin/", {"name": self.name, "password": "bench"})
+            if status != 201:
+                raise ValueError(f"sign-up failed with {status}")
+            self.token = json.loads(body)["access"]
+        elif self.scenario == "poll":
+            _, _ = await self.request("GET", f"{self.prefix}/")
+
+    def next_request(self, step):
+        if self.scenario == "read":
+            return "GET", f"{self.prefix}/", None, (200,)
+        if self.scenario == "poll":
+            return "GET", f"{self.prefix}/", None, (304,)
+        if self.scenario == "signin":
+            return "POST", f"{self.prefix}/signin/", {"name": self.name, "password": "bench"}, (200,)
+        # each connection toggles a slot of its own: add it, then remove it
+        slot = {"day": self.DAYS[self.number % 7], "start_time": f"{self.number // 7 % 24:02d}:00"}
+        if step % 2 == 0:
+            return "POST", f"{self.prefix}/dayofweekavailability/", slot, (201,)
+        return "DELETE", f"{self.prefix}/dayofweekavailability/", slot, (200,)
+
+    async def request(self, method, path, body=None):
+        payload = json.dumps(body).encode() if body is not None else b""
+        lines = [f"{method} {path} HTTP/1.1", f"Host: {self.host}:{self.port}", f"Content-Length: {len(payload)}"]
+        if body is not None:
+            lines.append("Content-Type: application/json")
+        if self.token:
+            lines.append(f"Authorization: Bearer {self.token}")
+        if self.etag:
+            lines.append(f"If-None-Match: {self.etag}")
+        self.writer.write("\r\n".join(lines).encode() + b"\r\n\r\n" + payload)
+        await self.writer.drain()
+
+        status_line = await self.reader.readline()
+        if not status_line:
+            raise ConnectionResetError("server closed the connection")
+        status = int(status_line.split()[1])
+        length = 0
+        chunked = False
+        while (line := await self.reader.readline()) not in (b"\r\n", b""):
+            name, _, value = line.decode("latin-1").partition(":")
+            name = name.strip().lower()
+            if name == "content-length":
+                length = int(value)
+            elif name == "transfer-encoding":
+                chunked = "chunked" in value.lower()
+            elif name == "etag" and self.scenario == "poll":
+                self.etag = value.strip()
+
+        if not chunked:
+            return status, await self.reader.readexactly(length)
+        chunks = []
+        while size := int((await self.reader.readline()).split(b";")[0], 16):
+            chunks.append(await self.reader.readexactly(size))
+            await self.reader.readline()
+        await self.reader.readline()
+        return status, b"".join(chunks)
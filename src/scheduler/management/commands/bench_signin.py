@@ -0,0 +1,71 @@
+import json
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+
+from django.contrib.auth.hashers import PBKDF2PasswordHasher
+from django.core.management.base import BaseCommand
+
+from scheduler.hashers import EventPasswordHasher, hashing_executor
+from scheduler.management.commands._benchmarking import request_json, summarize
+
+
+class Command(BaseCommand):
+    help = (
+        "Measures sign-in throughput under concurrency. Without --url it compares password "
+        "hasher profiles on the hashing pool; with --url it signs attendees up and in against "
+        "a running server."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--requests", type=int, default=200)
+        parser.add_argument("--concurrency", type=int, default=16)
+        parser.add_argument("--url", help="Base URL of a running server, e.g. http://127.0.0.1:8000")
+
+    def handle(self, *args, **options):
+        if options["url"]:
+            results = self.bench_server(options["url"].rstrip("/"), options["requests"], options["concurrency"])
+        else:
+            results = self.bench_hashers(options["requests"], options["concurrency"])
+        self.stdout.write(json.dumps(results, indent=2))
+
+    def bench_hashers(self, requests, concurrency):
+        results = {}
+        for name, hasher in [("django_pbkdf2", PBKDF2PasswordHasher()), ("event_pbkdf2", EventPasswordHasher())]:
+            def sign_in(_):
+                started = time.perf_counter()
+                hashing_executor.submit(hasher.encode, "event-password", hasher.salt()).result()
+                return time.perf_counter() - started
+
+            started = time.perf_counter()
+            with ThreadPoolExecutor(concurrency) as clients:
+                latencies = list(clients.map(sign_in, range(requests)))
+            results[name] = {"iterations": hasher.iterations, **summarize(latencies, time.perf_counter() - started)}
+        return results
+
+    def bench_server(self, base_url, requests, concurrency):
+        status, body, _, _ = request_json("POST", f"{base_url}/event/create/", {
+            "name": "bench-signin",
+            "start_time": "09:00",
+            "end_time": "17:00",
+            "event_type": "Days of Week",
+            "days_of_week": [{"day": "دوشنبه"}],
+        })
+        if status != 201:
+            raise RuntimeError(f"Could not create benchmark event: {status} {body}")
+        signin_url = f"{base_url}/event/{body['event_link'].rsplit('/', 1)[1]}/signin/"
+        names = [f"bench-{uuid.uuid4().hex[:12]}" for _ in range(requests)]
+
+        results = {}
+        for phase, expected in [("sign_up", 201), ("sign_in", 200)]:
+            def sign_in(name):
+                status, _, latency, _ = request_json("POST", signin_url, {"name": name, "password": "event-password"})
+                return status == expected, latency
+
+            started = time.perf_counter()
+            with ThreadPoolExecutor(concurrency) as clients:
+                outcomes = list(clients.map(sign_in, names))
+            elapsed = time.perf_counter() - started
+            latencies = [latency for ok, latency in outcomes if ok]
+            results[phase] = summarize(latencies, elapsed, errors=len(outcomes) - len(latencies))
+        return results
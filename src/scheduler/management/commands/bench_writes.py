@@ -0,0 +1,80 @@
+import json
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from django.core.management.base import BaseCommand
+from django.db import connection, connections
+
+from scheduler.management.commands._benchmarking import summarize
+from scheduler.models import Attendee, DayOfWeekChoices, Event, EventDayOfWeek, EventTypeChoices
+from scheduler.utils import apply_day_of_week_operations
+from scheduler.write_queue import write_queue
+
+
+class Command(BaseCommand):
+    help = (
+        "Compares availability write throughput and latency with concurrent writers, writing "
+        "directly from each thread versus through the coalescing write queue. Uses a throwaway "
+        "event in the configured database. Run once with SQLITE_JOURNAL_MODE=DELETE for the "
+        "rollback-journal baseline."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--writers", type=int, default=50)
+        parser.add_argument("--writes", type=int, default=40, help="Writes per writer.")
+
+    def handle(self, *args, **options):
+        writers, writes = options["writers"], options["writes"]
+        with connection.cursor() as cursor:
+            cursor.execute("PRAGMA journal_mode")
+            journal_mode = cursor.fetchone()[0]
+
+        event = Event.objects.create(
+            name="bench-writes", start_time="00:00", end_time="23:59", event_type=EventTypeChoices.DAYS_OF_WEEK
+        )
+        try:
+            EventDayOfWeek.objects.bulk_create([EventDayOfWeek(event=event, day=day) for day in DayOfWeekChoices.values])
+            attendees = Attendee.objects.bulk_create([
+                Attendee(event=event, name=f"writer-{number}", password="!") for number in range(writers)
+            ])
+            results = {"journal_mode": journal_mode, "writers": writers, "writes_per_writer": writes}
+            for mode in ("direct", "queued"):
+                results[mode] = self.run_writers(event, attendees, writes, queued=mode == "queued")
+            results["queued"]["transactions"] = write_queue.batches
+        finally:
+            event.delete()
+        self.stdout.write(json.dumps(results, indent=2))
+
+    def run_writers(self, event, attendees, writes, queued):
+        errors = []
+        errors_lock = threading.Lock()
+
+        def writer(attendee):
+            latencies = []
+            for number in range(writes):
+                slot = (number % 7, number // 7 % 24)
+                # each slot is added on one pass and removed on the next
+                operations = {slot: number // 168 % 2 == 0}
+                started = time.perf_counter()
+                try:
+                    if queued:
+                        write_queue.submit(apply_day_of_week_operations, event, attendee, operations)
+                    else:
+                        apply_day_of_week_operations(event, attendee, operations)
+                except Exception as error:
+                    with errors_lock:
+                        errors.append(repr(error))
+                    continue
+                latencies.append(time.perf_counter() - started)
+            connections.close_all()
+            return latencies
+
+        write_queue.batches = 0
+        started = time.perf_counter()
+        with ThreadPoolExecutor(len(attendees)) as pool:
+            latencies = [latency for result in pool.map(writer, attendees) for latency in result]
+        summary = summarize(latencies, time.perf_counter() - started, errors=len(errors))
+        if errors:
+            summary["first_error"] = errors[0]
+        return summary
@@ -0,0 +1,27 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from scheduler.models import Event, EventSummary
+from scheduler.utils import get_event_availability_rows, get_event_bitmap_rows, get_slot_groups
+
+
+class Command(BaseCommand):
+    help = "Prints the database query plans of the event-wide availability reads in scheduler/utils.py."
+
+    def add_arguments(self, parser):
+        parser.add_argument("unique_id", nargs="?", help="Event to explain against; defaults to the latest event.")
+
+    def handle(self, *args, **options):
+        events = Event.objects.order_by("-id")
+        event = events.filter(unique_id=options["unique_id"]).first() if options["unique_id"] else events.first()
+        if event is None:
+            raise CommandError("No event to explain against.")
+
+        querysets = {
+            "get_event_availabilities_list": get_event_availability_rows(event),
+            "get_event_slot_counts": get_event_bitmap_rows(event) if event.compact_storage else get_slot_groups(event),
+            "get_event_summary": EventSummary.objects.filter(event=event),
+        }
+        for name, queryset in querysets.items():
+            self.stdout.write(f"{name}:")
+            for line in queryset.explain().splitlines():
+                self.stdout.write(f"  {line}")
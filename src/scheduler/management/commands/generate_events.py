@@ -0,0 +1,153 @@
+import json
+import random
+from datetime import date, time, timedelta
+
+from django.contrib.auth.hashers import make_password
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+
+from scheduler.hashers import hash_password
+from scheduler.models import (
+    Attendee,
+    AttendeeSummary,
+    AvailabilityBitmap,
+    DayOfWeekAvailability,
+    Event,
+    EventDate,
+    EventDayOfWeek,
+    EventSummary,
+    EventTypeChoices,
+    SpecificDateAvailability,
+)
+from scheduler.intervals import normalize
+from scheduler.slots import SlotGrid, iter_bits, pack_bits
+
+
+class Command(BaseCommand):
+    help = (
+        "Generates synthetic events with attendees and availability for load testing. Each "
+        "attendee marks every slot of the grid available with probability --density. Prints "
+        "the generated events as JSON, ready to pass to the loadtest command."
+    )
+
+    TYPES = {
+        "specific": [EventTypeChoices.SPECIFIC_DATES],
+        "days": [EventTypeChoices.DAYS_OF_WEEK],
+        "both": [EventTypeChoices.SPECIFIC_DATES, EventTypeChoices.DAYS_OF_WEEK],
+    }
+
+    def add_arguments(self, parser):
+        parser.add_argument("--type", choices=self.TYPES, default="both")
+        parser.add_argument("--events", type=int, default=1, help="Events per event type.")
+        parser.add_argument("--attendees", type=int, default=50)
+        parser.add_argument("--density", type=float, default=0.3, help="Share of slots each attendee marks, 0 to 1.")
+        parser.add_argument("--days", type=int, default=7, help="Dates (or weekdays, at most 7) per event.")
+        parser.add_argument("--start-hour", type=int, default=9)
+        parser.add_argument("--end-hour", type=int, default=17)
+        parser.add_argument("--timezone", default="Asia/Tehran")
+        parser.add_argument("--compact", action="store_true", help="Use compact bitmap storage.")
+        parser.add_argument("--password", help="Password for every attendee; attendees have none by default.")
+        parser.add_argument("--seed", type=int, default=0)
+
+    def handle(self, *args, **options):
+        if not 0 <= options["density"] <= 1:
+            raise CommandError("--density must be between 0 and 1.")
+        if not 0 <= options["start_hour"] < options["end_hour"] <= 24:
+            raise CommandError("Hours must satisfy 0 <= --start-hour < --end-hour <= 24.")
+        if options["days"] < 1:
+            raise CommandError("--days must be at least 1.")
+
+        rng = random.Random(options["seed"])
+        # one hash shared by every attendee: generating data should not pay for key stretching per row
+        if options["password"]:
+            password = hash_password(options["password"])
+        else:
+            password = make_password(None)
+
+        generated = []
+        for event_type in self.TYPES[options["type"]]:
+            for number in range(options["events"]):
+                with transaction.atomic():
+                    generated.append(self.generate_event(event_type, number, password, rng, options))
+        self.stdout.write(json.dumps(generated, indent=2))
+
+    def generate_event(self, event_type, number, password, rng, options):
+        end_time = time(23, 59) if options["end_hour"] == 24 else time(options["end_hour"])
+        event = Event.objects.create(
+            name=f"synthetic-{EventTypeChoices(event_type).name.lower()}-{number}",
+            start_time=time(options["start_hour"]),
+            end_time=end_time,
+            timezone=options["timezone"],
+            event_type=event_type,
+            compact_storage=options["compact"],
+        )
+        if event_type == EventTypeChoices.SPECIFIC_DATES:
+            first_date = date.today() + timedelta(days=1)
+            EventDate.objects.bulk_create([
+                EventDate(event=event, date=first_date + timedelta(days=offset)) for offset in range(options["days"])
+            ])
+            event_days = {}
+        else:
+            event_days = {
+                event_day.day: event_day
+                for event_day in EventDayOfWeek.objects.bulk_create([
+                    EventDayOfWeek(event=event, day=day) for day in range(min(options["days"], 7))
+                ])
+            }
+
+        attendees = Attendee.objects.bulk_create([
+            Attendee(event=event, name=f"attendee-{index}", password=password, timezone=options["timezone"])
+            for index in range(options["attendees"])
+        ])
+
+        grid = SlotGrid(event)
+        bitmaps = []
+        rows = []
+        summaries = []
+        for attendee in attendees:
+            bits = 0
+            for index in range(grid.size):
+                if rng.random() < options["density"]:
+                    bits |= 1 << index
+            availability_count = bits.bit_count()
+            if event.compact_storage:
+                bitmaps.append(AvailabilityBitmap(attendee=attendee, event=event, bits=pack_bits(bits, grid.size)))
+            elif event_type == EventTypeChoices.SPECIFIC_DATES:
+                # stored intervals are coalesced, as the write paths keep them
+                intervals = normalize(grid.slot_datetimes(index) for index in iter_bits(bits))
+                availability_count = len(intervals)
+                for start_time, end_time in intervals:
+                    rows.append(SpecificDateAvailability(
+                        attendee=attendee, event=event, start_time=start_time, end_time=end_time
+                    ))
+            else:
+                for index in iter_bits(bits):
+                    day, hour = grid.slot(index)
+                    rows.append(DayOfWeekAvailability(
+                        attendee=attendee, event=event, event_day_of_week=event_days[day], start_hour=hour
+                    ))
+            if bits:
+                summaries.append(AttendeeSummary(
+                    attendee=attendee, event=event, slot_count=bits.bit_count(), availability_count=availability_count
+                ))
+
+        AvailabilityBitmap.objects.bulk_create(bitmaps, batch_size=1000)
+        if event_type == EventTypeChoices.SPECIFIC_DATES:
+            SpecificDateAvailability.objects.bulk_create(rows, batch_size=1000)
+        else:
+            DayOfWeekAvailability.objects.bulk_create(rows, batch_size=1000)
+        AttendeeSummary.objects.bulk_create(summaries, batch_size=1000)
+        EventSummary.objects.create(
+            event=event,
+            attendees_with_availability=len(summaries),
+            total_slots=sum(summary.slot_count for summary in summaries),
+        )
+
+        return {
+            "unique_id": str(event.unique_id),
+            "event_type": EventTypeChoices(event_type).label,
+            "compact_storage": event.compact_storage,
+            "attendees": len(attendees),
+            "slots": grid.size,
+            "availability_rows": len(rows),
+        }
@@ -0,0 +1,180 @@
+import json
+import random
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date, datetime, time as dt_time, timedelta
+
+import pytz
+from django.core.management.base import BaseCommand, CommandError
+
+from scheduler.management.commands._benchmarking import request_json, summarize
+from scheduler.models import DayOfWeekChoices, EventTypeChoices
+
+
+class Command(BaseCommand):
+    help = (
+        "Drives a running server with a mix of sign-ins, availability painting and event "
+        "polling, and reports throughput and latency percentiles per endpoint as JSON. The "
+        "sequence of operations is fixed by --seed, so runs against the same data are comparable."
+    )
+
+    OPERATIONS = ("signin", "paint", "poll")
+
+    def add_arguments(self, parser):
+        parser.add_argument("--url", required=True, help="Base URL of a running server, e.g. http://127.0.0.1:8000")
+        parser.add_argument("--event", action="append", required=True, dest="events",
+                            help="Event unique_id to drive; repeat for several events.")
+        parser.add_argument("--requests", type=int, default=1000, help="Total requests across all clients.")
+        parser.add_argument("--concurrency", type=int, default=16)
+        parser.add_argument("--mix", default="signin=1,paint=4,poll=15",
+                            help="Relative weights of the operations.")
+        parser.add_argument("--paint-cells", type=int, default=4, help="Most consecutive cells per paint stroke.")
+        parser.add_argument("--no-etag", action="store_true", help="Poll without If-None-Match.")
+        parser.add_argument("--seed", type=int, default=0)
+
+    def handle(self, *args, **options):
+        weights = self.parse_mix(options["mix"])
+        base_url = options["url"].rstrip("/")
+        events = [self.load_event(base_url, unique_id) for unique_id in options["events"]]
+        # attendee names differ per run so sign-ins are sign-ups on every run, as in the first one
+        run = uuid.uuid4().hex[:8]
+        concurrency = options["concurrency"]
+        per_client = [
+            options["requests"] // concurrency + (client < options["requests"] % concurrency)
+            for client in range(concurrency)
+        ]
+
+        def client(number):
+            rng = random.Random(f"{options['seed']}-{number}")
+            return Client(base_url, events[number % len(events)], f"load-{run}-{number}", rng, options).run(
+                rng.choices(self.OPERATIONS, weights, k=per_client[number])
+            )
+
+        started = time.perf_counter()
+        with ThreadPoolExecutor(concurrency) as pool:
+            outcomes = [outcome for result in pool.map(client, range(concurrency)) for outcome in result]
+        elapsed = time.perf_counter() - started
+
+        results = {
+            "config": {
+                "url": base_url,
+                "events": options["events"],
+                "requests": options["requests"],
+                "concurrency": concurrency,
+                "mix": dict(zip(self.OPERATIONS, weights)),
+                "etag": not options["no_etag"],
+                "seed": options["seed"],
+            },
+            "overall": self.summarize(outcomes, elapsed),
+            "endpoints": {},
+        }
+        for operation in self.OPERATIONS:
+            selected = [outcome for outcome in outcomes if outcome[0] == operation]
+            if selected:
+                results["endpoints"][operation] = self.summarize(selected, elapsed)
+        not_modified = sum(1 for operation, status, _ in outcomes if operation == "poll" and status == 304)
+        if "poll" in results["endpoints"]:
+            results["endpoints"]["poll"]["not_modified"] = not_modified
+        self.stdout.write(json.dumps(results, indent=2))
+
+    def parse_mix(self, mix):
+        weights = dict.fromkeys(self.OPERATIONS, 0)
+        try:
+            for part in mix.split(","):
+                name, weight = part.split("=")
+                if name.strip() not in weights:
+                    raise ValueError
+                weights[name.strip()] = float(weight)
+        except ValueError:
+            raise CommandError(f"--mix must look like 'signin=1,paint=4,poll=15' using {', '.join(self.OPERATIONS)}.")
+        if not any(weights.values()):
+            raise CommandError("--mix needs at least one positive weight.")
+        return [weights[name] for name in self.OPERATIONS]
+
+    def load_event(self, base_url, unique_id):
+        status, body, _, _ = request_json("GET", f"{base_url}/event/{unique_id}/")
+        if status != 200:
+            raise CommandError(f"Could not load event {unique_id}: {status} {body}")
+        return {"unique_id": unique_id, **body["event"]}
+
+    def summarize(self, outcomes, elapsed):
+        latencies = [latency for _, status, latency in outcomes if status < 400]
+        return summarize(latencies, elapsed, errors=len(outcomes) - len(latencies))
+
+
+class Client:
+    """One simulated browser: signs in once, then runs its share of the operation sequence."""
+
+    def __init__(self, base_url, event, name, rng, options):
+        self.event_url = f"{base_url}/event/{event['unique_id']}/"
+        self.name = name
+        self.rng = rng
+        self.paint_cells = max(1, options["paint_cells"])
+        self.use_etag = not options["no_etag"]
+        self.cells = self.event_cells(event)
+        self.slot_hours = len(self.cells[0]) if self.cells else 0
+        self.token = None
+        self.etag = None
+        self.sign_ins = 0
+
+    @staticmethod
+    def event_cells(event):
+        """Request payloads of every cell of the event grid, one list per day."""
+        start_hour = int(event["start_time"][:2])
+        end_hour = int(event["end_time"][:2]) + (event["end_time"][3:5] != "00")
+        hours = range(start_hour, end_hour)
+        if event["event_type"] == EventTypeChoices.SPECIFIC_DATES:
+            zone = pytz.timezone(event["timezone"])
+            cells = []
+            for event_date in sorted(item["date"] for item in event["dates"]):
+                day = date.fromisoformat(event_date)
+                row = []
+                for hour in hours:
+                    start = zone.localize(datetime.combine(day, dt_time(hour)))
+                    end = zone.normalize(start + timedelta(hours=1))
+                    row.append({"start_time": start.isoformat(), "end_time": end.isoformat()})
+                cells.append(row)
+            return cells
+        return [
+            [{"day": DayOfWeekChoices(item["day"]).label, "start_time": f"{hour:02d}:00"} for hour in hours]
+            for item in sorted(event["days_of_week"], key=lambda item: item["day"])
+        ]
+
+    def run(self, operations):
+        outcomes = []
+        if self.signin()[0] >= 400:
+            return [(operation, 599, 0.0) for operation in operations]
+        for operation in operations:
+            status, latency = getattr(self, operation)()
+            outcomes.append((operation, status, latency))
+        return outcomes
+
+    def signin(self):
+        name = self.name if not self.sign_ins else f"{self.name}-{self.sign_ins}"
+        self.sign_ins += 1
+        status, body, latency, _ = request_json("POST", f"{self.event_url}signin/", {"name": name})
+        if status < 400:
+            self.token, self.etag = body["access"], None
+        return status, latency
+
+    def paint(self):
+        """One drag stroke: a run of consecutive cells on one day, all added or all removed."""
+        if not self.cells:
+            return 599, 0.0
+        row = self.rng.choice(self.cells)
+        length = self.rng.randint(1, min(self.paint_cells, self.slot_hours))
+        first = self.rng.randint(0, self.slot_hours - length)
+        action = self.rng.choice(("add", "remove"))
+        operations = [{"action": action, **cell} for cell in row[first:first + length]]
+        status, _, latency, _ = request_json(
+            "POST", f"{self.event_url}availability/batch/", {"operations": operations}, token=self.token
+        )
+        return status, latency
+
+    def poll(self):
+        headers = {"If-None-Match": self.etag} if self.use_etag and self.etag else None
+        status, _, latency, response_headers = request_json("GET", self.event_url, token=self.token, headers=headers)
+        if status == 200:
+            self.etag = response_headers.get("ETag")
+        return status, latency
@@ -0,0 +1,61 @@
+from django.core.management.base import BaseCommand
+
+from scheduler.retention import (
+    PURGE_BATCH_SIZE,
+    analyze,
+    archive_event,
+    enable_incremental_vacuum,
+    get_expired_events,
+    incremental_vacuum,
+    purge_event,
+)
+
+
+class Command(BaseCommand):
+    help = (
+        "Archives the events expired under the retention policy to gzipped fixtures, then deletes "
+        "them in small batches with pauses so other writers keep getting the database. Finishes "
+        "with an incremental VACUUM and a bounded ANALYZE. Restore an event with "
+        "`manage.py loaddata <archive>`."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--dry-run", action="store_true", help="Only list the expired events.")
+        parser.add_argument("--limit", type=int, help="Purge at most this many events.")
+        parser.add_argument("--archive-dir", help="Directory for archives; defaults to EVENT_ARCHIVE_DIR.")
+        parser.add_argument("--no-archive", action="store_true", help="Delete without archiving.")
+        parser.add_argument("--batch-size", type=int, default=PURGE_BATCH_SIZE, help="Rows deleted per transaction.")
+        parser.add_argument("--pause", type=float, default=0.05, help="Seconds to sleep between batches.")
+        parser.add_argument("--vacuum-pages", type=int, default=256,
+                            help="Pages released per incremental vacuum step; 0 skips vacuuming.")
+        parser.add_argument("--enable-incremental-vacuum", action="store_true",
+                            help="Switch the database to auto_vacuum=INCREMENTAL first. Runs one full VACUUM, "
+                                 "which locks the database while it rewrites the file.")
+
+    def handle(self, *args, **options):
+        if options["enable_incremental_vacuum"] and not options["dry_run"]:
+            enable_incremental_vacuum()
+
+        events = get_expired_events()
+        if options["limit"]:
+            events = events[:options["limit"]]
+
+        purged = rows = 0
+        for event in events:
+            if options["dry_run"]:
+                self.stdout.write(f"{event.unique_id}: last date {event.last_date}, last activity {event.last_activity}")
+                purged += 1
+                continue
+            archive = None if options["no_archive"] else archive_event(event, options["archive_dir"])
+            deleted = purge_event(event, options["batch_size"], options["pause"])
+            rows += deleted
+            purged += 1
+            self.stdout.write(f"{event.unique_id}: deleted {deleted} rows" + (f", archived to {archive}" if archive else ""))
+
+        if options["dry_run"]:
+            self.stdout.write(self.style.SUCCESS(f"{purged} events expired."))
+            return
+        freed = incremental_vacuum(options["vacuum_pages"], options["pause"]) if options["vacuum_pages"] else 0
+        if purged:
+            analyze()
+        self.stdout.write(self.style.SUCCESS(f"{purged} events purged, {rows} rows deleted, {freed} pages freed."))
@@ -0,0 +1,33 @@
+from django.core.management.base import BaseCommand
+
+from scheduler.models import Event
+from scheduler.utils import rebuild_event_summary
+
+
+class Command(BaseCommand):
+    help = (
+        "Rebuilds the per-event and per-attendee availability counters from the availability "
+        "rows, reporting every event whose stored counters had drifted."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("unique_ids", nargs="*", help="Events to repair; defaults to every event.")
+        parser.add_argument("--dry-run", action="store_true", help="Only report the events that need repair.")
+
+    def handle(self, *args, **options):
+        events = Event.objects.order_by("id")
+        if options["unique_ids"]:
+            events = events.filter(unique_id__in=options["unique_ids"])
+
+        checked = drifted_events = 0
+        for event in events.iterator():
+            checked += 1
+            stored, rebuilt, drifted = rebuild_event_summary(event, dry_run=options["dry_run"])
+            if drifted:
+                drifted_events += 1
+                self.stdout.write(
+                    f"{event.unique_id}: attendees {stored[0]} -> {rebuilt[0]}, slots {stored[1]} -> {rebuilt[1]}"
+                )
+
+        action = "need repair" if options["dry_run"] else "repaired"
+        self.stdout.write(self.style.SUCCESS(f"{checked} events checked, {drifted_events} {action}."))
@@ -0,0 +1,74 @@
+import multiprocessing
+import os
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connections
+
+
+class Command(BaseCommand):
+    help = (
+        "Serves the project with a pre-forking gunicorn master. The Django app is loaded once in "
+        "the master and forked into the workers. Send SIGHUP for a graceful rolling restart of "
+        "the workers, or SIGUSR2 to re-exec the master when new code is deployed."
+    )
+    # checks import the URLconf, which picks the views from ASYNC_VIEWS; they run in handle()
+    requires_system_checks = []
+
+    def add_arguments(self, parser):
+        parser.add_argument("--interface", choices=["wsgi", "asgi"], default=os.getenv("SERVER_INTERFACE", "asgi"))
+        parser.add_argument("--bind", default=os.getenv("SERVER_BIND", "0.0.0.0:8000"))
+        parser.add_argument("--workers", type=int, default=int(os.getenv("WEB_CONCURRENCY", 0)) or None,
+                            help="Defaults to the number of CPUs (asgi) or 2 * CPUs + 1 (wsgi).")
+        parser.add_argument("--threads", type=int, default=int(os.getenv("SERVER_THREADS", 4)),
+                            help="Threads per worker for the wsgi interface.")
+        parser.add_argument("--timeout", type=int, default=30)
+        parser.add_argument("--graceful-timeout", type=int, default=30)
+        parser.add_argument("--max-requests", type=int, default=int(os.getenv("SERVER_MAX_REQUESTS", 0)),
+                            help="Recycle each worker after this many requests (0 disables).")
+
+    def handle(self, *args, **options):
+        try:
+            from gunicorn.app.base import BaseApplication
+        except ImportError:
+            raise CommandError("The serve command requires gunicorn (and uvicorn for --interface asgi).")
+
+        if "ASYNC_VIEWS" not in os.environ:
+            settings.ASYNC_VIEWS = options["interface"] == "asgi"
+        self.check()
+
+        cpus = multiprocessing.cpu_count()
+        if options["interface"] == "asgi":
+            from when2meet.asgi import application
+            worker_class = "uvicorn.workers.UvicornWorker"
+            workers = options["workers"] or cpus
+        else:
+            from when2meet.wsgi import application
+            worker_class = "gthread"
+            workers = options["workers"] or 2 * cpus + 1
+
+        config = {
+            "bind": options["bind"],
+            "workers": workers,
+            "worker_class": worker_class,
+            "threads": options["threads"],
+            "timeout": options["timeout"],
+            "graceful_timeout": options["graceful_timeout"],
+            "max_requests": options["max_requests"],
+            "max_requests_jitter": options["max_requests"] // 10,
+            "preload_app": True,
+            "accesslog": "-",
+            # connections opened while loading the app must not be shared with forked workers
+            "pre_fork": lambda server, worker: connections.close_all(),
+        }
+
+        class DjangoApplication(BaseApplication):
+            def load_config(self):
+                for key, value in config.items():
+                    self.cfg.set(key, value)
+
+            def load(self):
+                return application
+
+        self.stdout.write(f"Serving {options['interface']} on {options['bind']} with {workers} workers")
+        DjangoApplication().run()
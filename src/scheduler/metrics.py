@@ -0,0 +1,155 @@
+import contextvars
+import threading
+import time
+from bisect import bisect_left
+
+from scheduler.event_cache import event_cache
+from scheduler.realtime import event_hub
+from scheduler.write_queue import write_queue
+
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+QUERY_COUNT_BUCKETS = (0, 1, 2, 3, 5, 10, 20, 50, 100)
+RESPONSE_SIZE_BUCKETS = (256, 1024, 4096, 16384, 65536, 262144, 1048576)
+
+# Query totals of the request running in the current thread or task; None outside a request.
+current_queries = contextvars.ContextVar("current_queries", default=None)
+
+
+class Histogram:
+    """Cumulative-bucket histogram in the Prometheus layout; callers hold the registry lock."""
+
+    def __init__(self, buckets):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.sum = 0
+
+    def observe(self, value):
+        self.counts[bisect_left(self.buckets, value)] += 1
+        self.sum += value
+
+    def render(self, name, labels):
+        lines = []
+        cumulative = 0
+        for bound, count in zip(self.buckets, self.counts):
+            cumulative += count
+            lines.append(f'{name}_bucket{{{labels},le="{bound}"}} {cumulative}')
+        cumulative += self.counts[-1]
+        lines.append(f'{name}_bucket{{{labels},le="+Inf"}} {cumulative}')
+        lines.append(f"{name}_sum{{{labels}}} {self.sum}")
+        lines.append(f"{name}_count{{{labels}}} {cumulative}")
+        return lines
+
+
+class ViewMetrics:
+    def __init__(self):
+        self.latency = Histogram(LATENCY_BUCKETS)
+        self.queries = Histogram(QUERY_COUNT_BUCKETS)
+        self.query_seconds = 0.0
+        self.response_size = Histogram(RESPONSE_SIZE_BUCKETS)
+        self.statuses = {}
+
+
+class MetricsRegistry:
+    """Request metrics of this process, keyed by view name and HTTP method.
+
+    Everything is kept in memory with one short critical section per request. Each server
+    worker has its own registry, so a scrape reports the worker that served it; scrape the
+    workers individually (or run one worker) for exact totals.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._views = {}
+
+    def record(self, view, method, status, seconds, queries, query_seconds, size):
+        with self._lock:
+            metrics = self._views.get((view, method))
+            if metrics is None:
+                metrics = self._views[(view, method)] = ViewMetrics()
+            metrics.latency.observe(seconds)
+            metrics.queries.observe(queries)
+            metrics.query_seconds += query_seconds
+            if size is not None:
+                metrics.response_size.observe(size)
+            metrics.statuses[status] = metrics.statuses.get(status, 0) + 1
+
+    def render(self):
+        with self._lock:
+            views = sorted(self._views.items())
+            lines = [
+                "# HELP when2meet_requests_total Requests handled, by view, method and status.",
+                "# TYPE when2meet_requests_total counter",
+            ]
+            for (view, method), metrics in views:
+                for status, count in sorted(metrics.statuses.items()):
+                    lines.append(f'when2meet_requests_total{{view="{view}",method="{method}",status="{status}"}} {count}')
+
+            for name, kind, help_text in [
+                ("when2meet_request_duration_seconds", "latency", "Request latency in seconds."),
+                ("when2meet_request_queries", "queries", "SQL queries run per request."),
+                ("when2meet_response_size_bytes", "response_size", "Response body size in bytes (non-streaming responses)."),
+            ]:
+                lines.append(f"# HELP {name} {help_text}")
+                lines.append(f"# TYPE {name} histogram")
+                for (view, method), metrics in views:
+                    lines.extend(getattr(metrics, kind).render(name, f'view="{view}",method="{method}"'))
+
+            lines.append("# HELP when2meet_request_query_seconds_total Time spent in SQL queries.")
+            lines.append("# TYPE when2meet_request_query_seconds_total counter")
+            for (view, method), metrics in views:
+                lines.append(
+                    f'when2meet_request_query_seconds_total{{view="{view}",method="{method}"}} {metrics.query_seconds}'
+                )
+        return lines
+
+    def clear(self):
+        with self._lock:
+            self._views.clear()
+
+
+registry = MetricsRegistry()
+
+
+def record_query(execute, sql, params, many, context):
+    """Database execute wrapper that adds each query to the current request's totals."""
+    totals = current_queries.get()
+    if totals is None:
+        return execute(sql, params, many, context)
+    started = time.perf_counter()
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        totals[0] += 1
+        totals[1] += time.perf_counter() - started
+
+
+def install_query_recorder(sender, connection, **kwargs):
+    """connection_created receiver: counts queries on every new database connection."""
+    if record_query not in connection.execute_wrappers:
+        connection.execute_wrappers.append(record_query)
+
+
+def render_sample(name, help_text, kind, value):
+    return [f"# HELP {name} {help_text}", f"# TYPE {name} {kind}", f"{name} {value}"]
+
+
+def render_metrics():
+    """All metrics of this process in the Prometheus text exposition format."""
+    cache = event_cache.stats()
+    lines = registry.render()
+    lines += render_sample("when2meet_event_cache_hits_total", "Event lookups served from the in-process cache.",
+                           "counter", cache["hits"])
+    lines += render_sample("when2meet_event_cache_misses_total", "Event lookups that went to the database.",
+                           "counter", cache["misses"])
+    lines += render_sample("when2meet_event_cache_entries", "Events held in the in-process cache.",
+                           "gauge", cache["size"])
+    lines += render_sample("when2meet_write_queue_batches_total", "Transactions committed by the write queue.",
+                           "counter", write_queue.batches)
+    lines += render_sample("when2meet_write_queue_jobs_total", "Writes applied by the write queue.",
+                           "counter", write_queue.jobs)
+    lines += render_sample("when2meet_write_queue_depth", "Writes waiting for the writer thread.",
+                           "gauge", write_queue.depth())
+    lines += render_sample("when2meet_event_streams", "Open event streams.",
+                           "gauge", event_hub.subscriber_count())
+    return "\n".join(lines) + "\n"
@@ -0,0 +1,64 @@
+import time
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+
+from scheduler.metrics import current_queries, registry
+
+
+class MetricsMiddleware:
+    """Records latency, SQL query count and time, and response size of every request.
+
+    Requests are labelled with the name of the view that handled them; requests that match
+    no URL are grouped as "unmatched" so scans cannot grow the label set.
+    """
+
+    METHODS = {"GET", "HEAD", "POST", "PUT", "PATCH", "DELETE", "OPTIONS"}
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.is_async = iscoroutinefunction(get_response)
+        if self.is_async:
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if self.is_async:
+            return self.__acall__(request)
+        totals = [0, 0.0]
+        token = current_queries.set(totals)
+        started = time.perf_counter()
+        try:
+            response = self.get_response(request)
+        finally:
+            current_queries.reset(token)
+        self.record(request, response, time.perf_counter() - started, totals)
+        return response
+
+    async def __acall__(self, request):
+        totals = [0, 0.0]
+        token = current_queries.set(totals)
+        started = time.perf_counter()
+        try:
+            response = await self.get_response(request)
+        finally:
+            current_queries.reset(token)
+        self.record(request, response, time.perf_counter() - started, totals)
+        return response
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        view = getattr(view_func, "view_class", view_func)
+        request.metrics_view_name = getattr(view, "__name__", type(view).__name__)
+
+    def record(self, request, response, seconds, totals):
+        size = None if response.streaming else len(response.content)
+        registry.record(
+            getattr(request, "metrics_view_name", "unmatched"),
+            request.method if request.method in self.METHODS else "OTHER",
+            response.status_code,
+            seconds,
+            totals[0],
+            totals[1],
+            size,
+        )
@@ -0,0 +1,29 @@
+# Generated by Django 5.1.4 on 2026-10-18 08:02
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('scheduler', '0003_dayofweekavailability_specificdateavailability_and_more'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='event',
+            name='compact_storage',
+            field=models.BooleanField(default=False),
+        ),
+        migrations.CreateModel(
+            name='AvailabilityBitmap',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('bits', models.BinaryField(default=b'')),
+                ('attendee', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, related_name='availability_bitmap', to=settings.AUTH_USER_MODEL)),
+                ('event', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='availability_bitmaps', to='scheduler.event')),
+            ],
+        ),
+    ]
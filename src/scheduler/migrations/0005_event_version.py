@@ -0,0 +1,18 @@
+# Generated by Django 5.1.4 on 2026-10-18 08:05
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('scheduler', '0004_availabilitybitmap'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='event',
+            name='version',
+            field=models.PositiveIntegerField(default=0),
+        ),
+    ]
@@ -0,0 +1,57 @@
+import django.db.models.deletion
+from django.db import migrations, models
+from django.db.models import OuterRef, Subquery
+
+
+def backfill_availability_event(apps, schema_editor):
+    Attendee = apps.get_model('scheduler', 'Attendee')
+    attendee_event = Subquery(Attendee.objects.filter(pk=OuterRef('attendee_id')).values('event_id')[:1])
+    for model_name in ('SpecificDateAvailability', 'DayOfWeekAvailability'):
+        apps.get_model('scheduler', model_name).objects.update(event_id=attendee_event)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('scheduler', '0005_event_version'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='specificdateavailability',
+            name='event',
+            field=models.ForeignKey(db_index=False, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='specific_date_availabilities', to='scheduler.event'),
+        ),
+        migrations.AddField(
+            model_name='dayofweekavailability',
+            name='event',
+            field=models.ForeignKey(db_index=False, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='day_of_week_availabilities', to='scheduler.event'),
+        ),
+        migrations.RunPython(backfill_availability_event, migrations.RunPython.noop),
+        migrations.AlterField(
+            model_name='specificdateavailability',
+            name='event',
+            field=models.ForeignKey(db_index=False, on_delete=django.db.models.deletion.CASCADE, related_name='specific_date_availabilities', to='scheduler.event'),
+        ),
+        migrations.AlterField(
+            model_name='dayofweekavailability',
+            name='event',
+            field=models.ForeignKey(db_index=False, on_delete=django.db.models.deletion.CASCADE, related_name='day_of_week_availabilities', to='scheduler.event'),
+        ),
+        migrations.AddIndex(
+            model_name='specificdateavailability',
+            index=models.Index(fields=['event', 'start_time', 'end_time', 'attendee'], name='specific_avail_event_slot_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='specificdateavailability',
+            index=models.Index(fields=['event', 'attendee'], name='specific_avail_event_att_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='dayofweekavailability',
+            index=models.Index(fields=['event', 'event_day_of_week', 'start_hour', 'attendee'], name='dow_avail_event_slot_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='dayofweekavailability',
+            index=models.Index(fields=['event', 'attendee'], name='dow_avail_event_att_idx'),
+        ),
+    ]
@@ -0,0 +1,40 @@
+from itertools import groupby
+
+from django.db import migrations
+
+from scheduler.intervals import normalize
+
+
+def coalesce_specific_date_availability(apps, schema_editor):
+    SpecificDateAvailability = apps.get_model('scheduler', 'SpecificDateAvailability')
+    rows = SpecificDateAvailability.objects.order_by('attendee_id', 'start_time').values_list(
+        'id', 'attendee_id', 'event_id', 'start_time', 'end_time'
+    )
+    to_delete = []
+    to_create = []
+    for attendee_id, attendee_rows in groupby(rows.iterator(chunk_size=2000), key=lambda row: row[1]):
+        attendee_rows = list(attendee_rows)
+        existing = {(start_time, end_time) for _, _, _, start_time, end_time in attendee_rows}
+        merged = normalize(existing)
+        if len(merged) == len(attendee_rows):
+            continue
+        event_id = attendee_rows[0][2]
+        to_delete.extend(row[0] for row in attendee_rows)
+        to_create.extend(
+            SpecificDateAvailability(attendee_id=attendee_id, event_id=event_id, start_time=start_time, end_time=end_time)
+            for start_time, end_time in merged
+        )
+    for position in range(0, len(to_delete), 500):
+        SpecificDateAvailability.objects.filter(id__in=to_delete[position:position + 500]).delete()
+    SpecificDateAvailability.objects.bulk_create(to_create, batch_size=500)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('scheduler', '0006_availability_event'),
+    ]
+
+    operations = [
+        migrations.RunPython(coalesce_specific_date_availability, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,21 @@
+# Generated by Django 5.1.4 on 2026-10-18 08:32
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('scheduler', '0007_coalesce_specific_date_availability'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='dayofweekavailability',
+            index=models.Index(fields=['event', 'id'], name='dow_avail_event_id_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='specificdateavailability',
+            index=models.Index(fields=['event', 'id'], name='specific_avail_event_id_idx'),
+        ),
+    ]
@@ -0,0 +1,77 @@
+# Generated by Django 5.1.4 on 2026-10-18 08:34
+
+from collections import Counter
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+from django.db.models import Count
+
+from scheduler.slots import interval_slot_count, unpack_bits
+
+
+def fill_availability_summaries(apps, schema_editor):
+    AvailabilityBitmap = apps.get_model('scheduler', 'AvailabilityBitmap')
+    SpecificDateAvailability = apps.get_model('scheduler', 'SpecificDateAvailability')
+    DayOfWeekAvailability = apps.get_model('scheduler', 'DayOfWeekAvailability')
+    AttendeeSummary = apps.get_model('scheduler', 'AttendeeSummary')
+    EventSummary = apps.get_model('scheduler', 'EventSummary')
+
+    counts = Counter()
+    for attendee_id, event_id, bits in AvailabilityBitmap.objects.values_list('attendee_id', 'event_id', 'bits').iterator():
+        counts[attendee_id, event_id] += unpack_bits(bits).bit_count()
+    rows = SpecificDateAvailability.objects.values_list('attendee_id', 'event_id', 'start_time', 'end_time')
+    for attendee_id, event_id, start_time, end_time in rows.iterator(chunk_size=2000):
+        counts[attendee_id, event_id] += interval_slot_count(start_time, end_time)
+    rows = DayOfWeekAvailability.objects.values('attendee_id', 'event_id').annotate(count=Count('id'))
+    for row in rows:
+        counts[row['attendee_id'], row['event_id']] += row['count']
+
+    event_totals = {}
+    for (attendee_id, event_id), count in counts.items():
+        if count:
+            attendees, slots = event_totals.get(event_id, (0, 0))
+            event_totals[event_id] = (attendees + 1, slots + count)
+    AttendeeSummary.objects.bulk_create(
+        [
+            AttendeeSummary(attendee_id=attendee_id, event_id=event_id, slot_count=count)
+            for (attendee_id, event_id), count in counts.items() if count
+        ],
+        batch_size=500,
+    )
+    EventSummary.objects.bulk_create(
+        [
+            EventSummary(event_id=event_id, attendees_with_availability=attendees, total_slots=slots)
+            for event_id, (attendees, slots) in event_totals.items()
+        ],
+        batch_size=500,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('scheduler', '0008_availability_event_id_index'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='AttendeeSummary',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('slot_count', models.PositiveIntegerField(default=0)),
+                ('attendee', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, related_name='summary', to=settings.AUTH_USER_MODEL)),
+                ('event', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='attendee_summaries', to='scheduler.event')),
+            ],
+        ),
+        migrations.CreateModel(
+            name='EventSummary',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('attendees_with_availability', models.PositiveIntegerField(default=0)),
+                ('total_slots', models.PositiveIntegerField(default=0)),
+                ('event', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, related_name='summary', to='scheduler.event')),
+            ],
+        ),
+        migrations.RunPython(fill_availability_summaries, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,19 @@
+# Generated by Django 5.1.4 on 2026-10-18 08:53
+
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('scheduler', '0009_availability_summaries'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='event',
+            name='last_activity',
+            field=models.DateTimeField(db_index=True, default=django.utils.timezone.now),
+        ),
+    ]
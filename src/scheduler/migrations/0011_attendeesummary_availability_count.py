@@ -0,0 +1,72 @@
+# Generated by Django 5.1.4 on 2026-10-18 14:12
+
+from collections import Counter
+
+from django.db import migrations, models
+from django.db.models import Count
+
+from scheduler.slots import interval_slot_count, unpack_bits
+
+
+def fill_availability_counts(apps, schema_editor):
+    """Recounts the summaries from the rows; intervals shorter than a slot had been left out."""
+    AvailabilityBitmap = apps.get_model('scheduler', 'AvailabilityBitmap')
+    SpecificDateAvailability = apps.get_model('scheduler', 'SpecificDateAvailability')
+    DayOfWeekAvailability = apps.get_model('scheduler', 'DayOfWeekAvailability')
+    AttendeeSummary = apps.get_model('scheduler', 'AttendeeSummary')
+    EventSummary = apps.get_model('scheduler', 'EventSummary')
+
+    slots = Counter()
+    availabilities = Counter()
+    for attendee_id, event_id, bits in AvailabilityBitmap.objects.values_list('attendee_id', 'event_id', 'bits').iterator():
+        count = unpack_bits(bits).bit_count()
+        slots[attendee_id, event_id] += count
+        availabilities[attendee_id, event_id] += count
+    rows = SpecificDateAvailability.objects.values_list('attendee_id', 'event_id', 'start_time', 'end_time')
+    for attendee_id, event_id, start_time, end_time in rows.iterator(chunk_size=2000):
+        slots[attendee_id, event_id] += interval_slot_count(start_time, end_time)
+        availabilities[attendee_id, event_id] += 1
+    rows = DayOfWeekAvailability.objects.values('attendee_id', 'event_id').annotate(count=Count('id'))
+    for row in rows:
+        slots[row['attendee_id'], row['event_id']] += row['count']
+        availabilities[row['attendee_id'], row['event_id']] += row['count']
+
+    event_totals = {}
+    for (attendee_id, event_id), count in availabilities.items():
+        if count:
+            attendees, total = event_totals.get(event_id, (0, 0))
+            event_totals[event_id] = (attendees + 1, total + slots[attendee_id, event_id])
+    AttendeeSummary.objects.all().delete()
+    AttendeeSummary.objects.bulk_create(
+        [
+            AttendeeSummary(
+                attendee_id=attendee_id, event_id=event_id, slot_count=slots[attendee_id, event_id], availability_count=count
+            )
+            for (attendee_id, event_id), count in availabilities.items() if count
+        ],
+        batch_size=500,
+    )
+    EventSummary.objects.all().delete()
+    EventSummary.objects.bulk_create(
+        [
+            EventSummary(event_id=event_id, attendees_with_availability=attendees, total_slots=total)
+            for event_id, (attendees, total) in event_totals.items()
+        ],
+        batch_size=500,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('scheduler', '0010_event_last_activity'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='attendeesummary',
+            name='availability_count',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.RunPython(fill_availability_counts, migrations.RunPython.noop),
+    ]
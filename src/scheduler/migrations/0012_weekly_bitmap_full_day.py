@@ -0,0 +1,34 @@
+from django.db import migrations
+
+from scheduler.models import EventTypeChoices
+from scheduler.slots import event_hours, iter_bits, pack_bits, unpack_bits
+
+
+def spread_weekly_bitmaps(apps, schema_editor):
+    """Moves weekly bitmaps from rows of the event's hours to rows of the whole day."""
+    AvailabilityBitmap = apps.get_model('scheduler', 'AvailabilityBitmap')
+    Event = apps.get_model('scheduler', 'Event')
+
+    for event in Event.objects.filter(compact_storage=True, event_type=EventTypeChoices.DAYS_OF_WEEK).prefetch_related('days_of_week'):
+        hours = event_hours(event)
+        if not hours:
+            continue
+        days = len({day.day for day in event.days_of_week.all()})
+        for bitmap in AvailabilityBitmap.objects.filter(event=event):
+            bits = 0
+            for index in iter_bits(unpack_bits(bitmap.bits)):
+                day_position, hour_position = divmod(index, len(hours))
+                bits |= 1 << (day_position * 24 + hours[hour_position])
+            bitmap.bits = pack_bits(bits, days * 24)
+            bitmap.save(update_fields=['bits'])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('scheduler', '0011_attendeesummary_availability_count'),
+    ]
+
+    operations = [
+        migrations.RunPython(spread_weekly_bitmaps, migrations.RunPython.noop),
+    ]
@@ -1,4 +1,5 @@
 from django.db import models
+from django.utils.timezone import now
 from django.conf import settings
 from django.core.exceptions import ValidationError
 from django.conf import settings
@@ -6,6 +7,7 @@ import pytz
 import uuid
 from django.contrib.auth.models import AbstractBaseUser, PermissionsMixin
 from scheduler.managers import AttendeeManager
+from scheduler.hashers import acheck_attendee_password, check_attendee_password
 
 
 class EventTypeChoices(models.IntegerChoices):
@@ -19,6 +21,10 @@ class Event(models.Model):
     timezone = models.CharField(max_length=50, choices=[(tz, tz) for tz in pytz.all_timezones], default="UTC")
     unique_id = models.UUIDField(default=uuid.uuid4, unique=True)
     event_type = models.IntegerField(choices=EventTypeChoices.choices)
+    compact_storage = models.BooleanField(default=False)
+    version = models.PositiveIntegerField(default=0)
+    # Time of the last attendee or availability write; the retention policy purges idle events.
+    last_activity = models.DateTimeField(default=now, db_index=True)
 
     def get_event_link(self):
         return f"{settings.BASE_URL}/{self.unique_id}"
@@ -74,7 +80,15 @@ class Attendee(AbstractBaseUser, PermissionsMixin):
         if self.has_usable_password():
             if not password:
                 return False, "Password required."
-            if not self.check_password(password):
+            if not check_attendee_password(self, password):
+                return False, "Incorrect password."
+        return True, None
+
+    async def avalidate_password(self, password):
+        if self.has_usable_password():
+            if not password:
+                return False, "Password required."
+            if not await acheck_attendee_password(self, password):
                 return False, "Incorrect password."
         return True, None
 
@@ -84,11 +98,18 @@ class Attendee(AbstractBaseUser, PermissionsMixin):
 
 class SpecificDateAvailability(models.Model):
     attendee = models.ForeignKey(Attendee, on_delete=models.CASCADE, related_name="specific_date_availabilities")
+    # Copy of attendee.event so event-wide reads skip the join; the indexes below lead with it.
+    event = models.ForeignKey(Event, on_delete=models.CASCADE, related_name="specific_date_availabilities", db_index=False)
     start_time = models.DateTimeField()
     end_time = models.DateTimeField()
 
     class Meta:
         constraints = [models.UniqueConstraint(fields=['attendee', 'start_time'], name='unique_attendee_specific_date_time')]
+        indexes = [
+            models.Index(fields=['event', 'start_time', 'end_time', 'attendee'], name='specific_avail_event_slot_idx'),
+            models.Index(fields=['event', 'attendee'], name='specific_avail_event_att_idx'),
+            models.Index(fields=['event', 'id'], name='specific_avail_event_id_idx'),
+        ]
 
     def clean(self):
         if self.start_time >= self.end_time:
@@ -100,6 +121,8 @@ class SpecificDateAvailability(models.Model):
 
 class DayOfWeekAvailability(models.Model):
     attendee = models.ForeignKey(Attendee, on_delete=models.CASCADE, related_name="day_of_week_availabilities")
+    # Copy of attendee.event so event-wide reads skip the join; the indexes below lead with it.
+    event = models.ForeignKey(Event, on_delete=models.CASCADE, related_name="day_of_week_availabilities", db_index=False)
     event_day_of_week = models.ForeignKey(EventDayOfWeek, on_delete=models.CASCADE, related_name="availabilities")
     start_hour = models.IntegerField(choices=[(i, f"{i}:00") for i in range(24)])
 
@@ -107,6 +130,11 @@ class DayOfWeekAvailability(models.Model):
         constraints = [
             models.UniqueConstraint(fields=['attendee', 'event_day_of_week', 'start_hour'], name='unique_attendee_day_of_week_time')
         ]
+        indexes = [
+            models.Index(fields=['event', 'event_day_of_week', 'start_hour', 'attendee'], name='dow_avail_event_slot_idx'),
+            models.Index(fields=['event', 'attendee'], name='dow_avail_event_att_idx'),
+            models.Index(fields=['event', 'id'], name='dow_avail_event_id_idx'),
+        ]
 
     def clean(self):
         if self.start_hour < 0 or self.start_hour > 23:
@@ -120,3 +148,39 @@ class DayOfWeekAvailability(models.Model):
     def __str__(self):
         start_time = f"{self.start_hour}:00"
         return f"{self.attendee.name}: {DayOfWeekChoices(self.event_day_of_week.day).label} - {start_time}"
+
+
+class AvailabilityBitmap(models.Model):
+    """Packed availability of one attendee over the event slot grid (compact storage mode)."""
+    attendee = models.OneToOneField(Attendee, on_delete=models.CASCADE, related_name="availability_bitmap")
+    event = models.ForeignKey(Event, on_delete=models.CASCADE, related_name="availability_bitmaps")
+    bits = models.BinaryField(default=b"")
+
+    def __str__(self):
+        return f"{self.attendee.name}: {len(self.bits)} bytes"
+
+
+class EventSummary(models.Model):
+    """Availability totals of an event, kept in step with every availability write."""
+    event = models.OneToOneField(Event, on_delete=models.CASCADE, related_name="summary")
+    attendees_with_availability = models.PositiveIntegerField(default=0)
+    total_slots = models.PositiveIntegerField(default=0)
+
+    def __str__(self):
+        return f"{self.event.name}: {self.attendees_with_availability} attendees, {self.total_slots} slots"
+
+
+class AttendeeSummary(models.Model):
+    """Availability counters of one attendee, kept in step with every availability write.
+
+    ``slot_count`` counts whole slots only; ``availability_count`` counts the stored
+    availabilities (intervals, rows or set bits), so an attendee whose only interval is
+    shorter than a slot still counts as having availability.
+    """
+    attendee = models.OneToOneField(Attendee, on_delete=models.CASCADE, related_name="summary")
+    event = models.ForeignKey(Event, on_delete=models.CASCADE, related_name="attendee_summaries")
+    slot_count = models.PositiveIntegerField(default=0)
+    availability_count = models.PositiveIntegerField(default=0)
+
+    def __str__(self):
+        return f"{self.attendee.name}: {self.slot_count} slots"
@@ -0,0 +1,9 @@
+from rest_framework.pagination import CursorPagination
+
+
+class EventCursorPagination(CursorPagination):
+    """Keyset pagination on the primary key, so every page is one index range scan however deep the client reads."""
+    ordering = "id"
+    page_size = 100
+    page_size_query_param = "page_size"
+    max_page_size = 1000
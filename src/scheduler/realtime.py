@@ -0,0 +1,106 @@
+import asyncio
+import json
+import threading
+from collections import defaultdict
+
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import transaction
+
+
+class Subscriber:
+    """One open stream: a bounded queue owned by the event loop serving the connection."""
+
+    def __init__(self, loop, queue_size):
+        self.loop = loop
+        self.queue = asyncio.Queue(queue_size)
+
+    def deliver(self, message):
+        # A client too slow to drain its queue gets a single resync notice instead of
+        # unbounded buffering; it should then refetch the event.
+        if self.queue.full():
+            while not self.queue.empty():
+                self.queue.get_nowait()
+            message = {"type": "resync"}
+        self.queue.put_nowait(message)
+
+
+class EventHub:
+    """In-process fan-out of availability deltas to every stream open on an event.
+
+    Publishing is thread-safe so sync views running in worker threads can push to
+    subscribers living on the ASGI event loop. No external broker is involved, so
+    subscribers only see writes handled by the same process: deltas are complete only
+    when a single worker serves the app. With more workers, clients have to fall back on
+    the event version that event_stream adds to every message and keep-alive.
+    """
+
+    def __init__(self, queue_size=100):
+        self.queue_size = queue_size
+        self._lock = threading.Lock()
+        self._subscribers = defaultdict(set)
+
+    def subscribe(self, unique_id):
+        subscriber = Subscriber(asyncio.get_running_loop(), self.queue_size)
+        with self._lock:
+            self._subscribers[str(unique_id)].add(subscriber)
+        return subscriber
+
+    def unsubscribe(self, unique_id, subscriber):
+        with self._lock:
+            subscribers = self._subscribers.get(str(unique_id))
+            if subscribers is not None:
+                subscribers.discard(subscriber)
+                if not subscribers:
+                    del self._subscribers[str(unique_id)]
+
+    def subscriber_count(self, unique_id=None):
+        with self._lock:
+            if unique_id is not None:
+                return len(self._subscribers.get(str(unique_id), ()))
+            return sum(len(subscribers) for subscribers in self._subscribers.values())
+
+    def publish(self, unique_id, message):
+        with self._lock:
+            subscribers = list(self._subscribers.get(str(unique_id), ()))
+        for subscriber in subscribers:
+            try:
+                subscriber.loop.call_soon_threadsafe(subscriber.deliver, message)
+            except RuntimeError:
+                # the loop serving this stream has shut down
+                self.unsubscribe(unique_id, subscriber)
+
+
+event_hub = EventHub()
+
+
+def format_sse(message):
+    data = json.dumps(message, cls=DjangoJSONEncoder, ensure_ascii=False)
+    return f"event: {message['type']}\ndata: {data}\n\n"
+
+
+def publish_availability_change(event, attendee, added=(), removed=()):
+    """Queues an availability delta for the event's streams once the write has committed."""
+    if not added and not removed:
+        return
+    message = {
+        "type": "availability",
+        "attendee": attendee.name,
+        "added": list(added),
+        "removed": list(removed),
+    }
+    after_commit(lambda: event_hub.publish(event.unique_id, message))
+
+
+def publish_attendee_joined(event, attendee):
+    message = {"type": "attendee", "attendee": attendee.name}
+    after_commit(lambda: event_hub.publish(event.unique_id, message))
+
+
+def after_commit(callback):
+    try:
+        asyncio.get_running_loop()
+    except RuntimeError:
+        transaction.on_commit(callback)
+    else:
+        # async views never hold a transaction open, so their writes have committed already
+        callback()
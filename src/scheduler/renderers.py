@@ -0,0 +1,15 @@
+from rest_framework.parsers import JSONParser
+from rest_framework.renderers import JSONRenderer
+
+
+COMPACT_MEDIA_TYPE = "application/vnd.when2meet.compact+json"
+
+
+class CompactJSONRenderer(JSONRenderer):
+    """Selects the columnar availability representation, via ``Accept`` or ``?format=compact``."""
+    media_type = COMPACT_MEDIA_TYPE
+    format = "compact"
+
+
+class CompactJSONParser(JSONParser):
+    media_type = COMPACT_MEDIA_TYPE
@@ -0,0 +1,159 @@
+from datetime import timedelta
+import gzip
+import io
+import os
+from pathlib import Path
+import time
+
+from django.conf import settings
+from django.core import serializers
+from django.db import connection, transaction
+from django.db.models import Max, Q
+from django.utils.timezone import now
+
+from scheduler.models import (
+    Event,
+    EventDate,
+    EventDayOfWeek,
+    EventTypeChoices,
+    Attendee,
+    SpecificDateAvailability,
+    DayOfWeekAvailability,
+    AvailabilityBitmap,
+    EventSummary,
+    AttendeeSummary,
+)
+
+
+# Rows per archive query and default rows per purge transaction.
+ARCHIVE_CHUNK_SIZE = 2000
+PURGE_BATCH_SIZE = 500
+
+# Children first, so every purge batch only deletes rows nothing else points to; the
+# schedule goes last so a purge that stops half way still leaves the event expired.
+PURGE_ORDER = (
+    SpecificDateAvailability,
+    DayOfWeekAvailability,
+    AvailabilityBitmap,
+    AttendeeSummary,
+    Attendee,
+    EventSummary,
+    EventDate,
+    EventDayOfWeek,
+)
+
+
+def get_expired_events(at=None):
+    """Events the retention policy lets go, oldest first.
+
+    A specific dates event expires EVENT_RETENTION_DAYS_AFTER_LAST_DATE days after its
+    last date; any event expires after EVENT_RETENTION_INACTIVE_DAYS days without writes.
+    """
+    at = at or now()
+    last_date_cutoff = (at - timedelta(days=settings.EVENT_RETENTION_DAYS_AFTER_LAST_DATE)).date()
+    inactive_cutoff = at - timedelta(days=settings.EVENT_RETENTION_INACTIVE_DAYS)
+    return Event.objects.annotate(last_date=Max("dates__date")).filter(
+        Q(event_type=EventTypeChoices.SPECIFIC_DATES, last_date__lt=last_date_cutoff)
+        | Q(last_activity__lt=inactive_cutoff)
+    ).order_by("last_activity")
+
+
+def get_archive_path(event, directory=None):
+    return Path(directory or settings.EVENT_ARCHIVE_DIR) / f"event-{event.unique_id}.jsonl.gz"
+
+
+def archive_event(event, directory=None):
+    """Writes the event and every row that belongs to it to a gzipped JSON Lines fixture.
+
+    Rows are streamed a chunk at a time. The file is written under a temporary name and
+    renamed once complete, and an existing archive is kept: a purge that stopped half way
+    must not replace the full archive with what is left. ``manage.py loaddata <file>``
+    restores it.
+    """
+    path = get_archive_path(event, directory)
+    if path.exists():
+        return path
+    path.parent.mkdir(parents=True, exist_ok=True)
+    partial = path.with_name(path.name + ".partial")
+    querysets = [
+        Event.objects.filter(pk=event.pk),
+        *(model.objects.filter(event=event) for model in reversed(PURGE_ORDER)),
+    ]
+    with open(partial, "wb") as raw:
+        compressed = gzip.GzipFile(fileobj=raw, mode="wb")
+        with io.TextIOWrapper(compressed, encoding="utf-8") as stream:
+            for queryset in querysets:
+                if queryset.model is Attendee:
+                    queryset = queryset.prefetch_related("groups", "user_permissions")
+                serializers.serialize(
+                    "jsonl", queryset.order_by("pk").iterator(chunk_size=ARCHIVE_CHUNK_SIZE), stream=stream
+                )
+        raw.flush()
+        os.fsync(raw.fileno())
+    os.replace(partial, path)
+    return path
+
+
+def delete_in_batches(queryset, batch_size=PURGE_BATCH_SIZE, pause=0):
+    """Deletes the queryset ``batch_size`` rows per transaction, sleeping ``pause`` seconds between them.
+
+    Each transaction holds SQLite's write lock only for one small batch, so other writers
+    get in between. Returns the number of rows deleted.
+    """
+    deleted = 0
+    while True:
+        with transaction.atomic():
+            ids = list(queryset.values_list("pk", flat=True)[:batch_size])
+            if ids:
+                deleted += queryset.model.objects.filter(pk__in=ids).delete()[0]
+        if len(ids) < batch_size:
+            return deleted
+        time.sleep(pause)
+
+
+def purge_event(event, batch_size=PURGE_BATCH_SIZE, pause=0):
+    """Deletes the event in bounded batches instead of one cascading delete; returns the rows deleted."""
+    deleted = 0
+    for model in PURGE_ORDER:
+        deleted += delete_in_batches(model.objects.filter(event=event), batch_size, pause)
+    deleted += Event.objects.filter(pk=event.pk).delete()[0]
+    return deleted
+
+
+def incremental_vacuum(pages, pause=0):
+    """Returns free SQLite pages to the filesystem ``pages`` at a time; returns the pages freed.
+
+    Only has an effect once the database uses auto_vacuum=INCREMENTAL.
+    """
+    if connection.vendor != "sqlite":
+        return 0
+    freed = 0
+    with connection.cursor() as cursor:
+        cursor.execute("PRAGMA auto_vacuum")
+        if cursor.fetchone()[0] != 2:
+            return 0
+        while True:
+            cursor.execute("PRAGMA freelist_count")
+            free = cursor.fetchone()[0]
+            if not free:
+                return freed
+            cursor.execute(f"PRAGMA incremental_vacuum({int(pages)})")
+            cursor.fetchall()
+            freed += min(free, pages)
+            time.sleep(pause)
+
+
+def enable_incremental_vacuum():
+    """Switches the database to auto_vacuum=INCREMENTAL; rewrites the whole file once with VACUUM."""
+    with connection.cursor() as cursor:
+        cursor.execute("PRAGMA auto_vacuum=INCREMENTAL")
+        cursor.execute("VACUUM")
+
+
+def analyze():
+    """Refreshes the query planner statistics, sampling a bounded number of rows per index."""
+    if connection.vendor != "sqlite":
+        return
+    with connection.cursor() as cursor:
+        cursor.execute("PRAGMA analysis_limit=1000")
+        cursor.execute("ANALYZE")
@@ -1,3 +1,4 @@
+from django.db import transaction
 from rest_framework import serializers
 from scheduler.models import (
     Event,
@@ -36,6 +37,25 @@ class EventDayOfWeekSerializer(serializers.ModelSerializer):
         return super().to_internal_value(data)
 
 
+class EventListSerializer(serializers.ListSerializer):
+    def create(self, validated_data):
+        """Creates every event, then all their dates and days, with one bulk insert per table."""
+        schedules = [(item.pop('dates', []), item.pop('days_of_week', [])) for item in validated_data]
+        with transaction.atomic():
+            events = Event.objects.bulk_create([Event(**item) for item in validated_data])
+            EventDate.objects.bulk_create([
+                EventDate(event=event, **date_data)
+                for event, (dates_data, _) in zip(events, schedules)
+                for date_data in dates_data
+            ])
+            EventDayOfWeek.objects.bulk_create([
+                EventDayOfWeek(event=event, **day_data)
+                for event, (_, days_data) in zip(events, schedules)
+                for day_data in days_data
+            ])
+        return events
+
+
 class EventSerializer(serializers.ModelSerializer):
     dates = EventDateSerializer(many=True, required=False)
     days_of_week = EventDayOfWeekSerializer(many=True, required=False)
@@ -44,8 +64,9 @@ class EventSerializer(serializers.ModelSerializer):
         model = Event
         fields = [
             'id', 'name', 'start_time', 'end_time', 'timezone',
-            'event_type', 'dates', 'days_of_week'
+            'event_type', 'compact_storage', 'dates', 'days_of_week'
         ]
+        list_serializer_class = EventListSerializer
 
     def get_event_type_label(self, obj):
         return EventTypeChoices(obj.event_type).label
@@ -67,7 +88,6 @@ class EventSerializer(serializers.ModelSerializer):
         if data['start_time'] >= data['end_time']:
             raise serializers.ValidationError("Start time must be before the end time.")
         event_type = data.get('event_type', EventTypeChoices.SPECIFIC_DATES)
-        print(event_type)
         dates = data.get('dates', [])
         days = data.get('days_of_week', [])
         if event_type == EventTypeChoices.SPECIFIC_DATES and days:
@@ -79,12 +99,10 @@ class EventSerializer(serializers.ModelSerializer):
     def create(self, validated_data):
         dates_data = validated_data.pop('dates', [])
         days_data = validated_data.pop('days_of_week', [])
-        event = Event.objects.create(**validated_data)
-        for date_data in dates_data:
-            EventDate.objects.create(event=event, **date_data)
-        for day_data in days_data:
-            e = EventDayOfWeek.objects.create(event=event, **day_data)
-            print(e)
+        with transaction.atomic():
+            event = Event.objects.create(**validated_data)
+            EventDate.objects.bulk_create([EventDate(event=event, **date_data) for date_data in dates_data])
+            EventDayOfWeek.objects.bulk_create([EventDayOfWeek(event=event, **day_data) for day_data in days_data])
         return event
 
 
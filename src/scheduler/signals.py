@@ -0,0 +1,43 @@
+from django.db.models import F
+from django.db.models.signals import post_delete, post_save, pre_delete
+from django.dispatch import receiver
+
+from scheduler.event_cache import event_cache
+from scheduler.models import Attendee, AttendeeSummary, Event, EventDate, EventDayOfWeek, EventSummary
+
+
+@receiver([post_save, post_delete], sender=Event)
+def invalidate_cached_event(sender, instance, created=False, **kwargs):
+    event_cache.invalidate(str(instance.unique_id))
+    if kwargs["signal"] is post_save and not created:
+        Event.objects.filter(pk=instance.pk).update(version=F("version") + 1)
+
+
+@receiver([post_save, post_delete], sender=EventDate)
+@receiver([post_save, post_delete], sender=EventDayOfWeek)
+def invalidate_cached_event_schedule(sender, instance, **kwargs):
+    if sender.event.is_cached(instance):
+        unique_id = instance.event.unique_id
+    else:
+        unique_id = Event.objects.filter(pk=instance.event_id).values_list("unique_id", flat=True).first()
+    if unique_id is not None:
+        event_cache.invalidate(str(unique_id))
+        Event.objects.filter(pk=instance.event_id).update(version=F("version") + 1)
+
+
+@receiver(pre_delete, sender=Attendee)
+def release_attendee_summary(sender, instance, **kwargs):
+    """Takes a deleted attendee's counters out of the event's summary before the cascade drops them."""
+    counts = AttendeeSummary.objects.filter(attendee_id=instance.pk).values_list(
+        "slot_count", "availability_count"
+    ).first()
+    if counts is not None:
+        slot_count, availability_count = counts
+        EventSummary.objects.filter(event_id=instance.event_id).update(
+            attendees_with_availability=F("attendees_with_availability") - int(availability_count > 0),
+            total_slots=F("total_slots") - slot_count,
+        )
+    unique_id = Event.objects.filter(pk=instance.event_id).values_list("unique_id", flat=True).first()
+    if unique_id is not None:
+        event_cache.invalidate(str(unique_id))
+        Event.objects.filter(pk=instance.event_id).update(version=F("version") + 1)
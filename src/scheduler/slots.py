@@ -0,0 +1,140 @@
+from datetime import datetime, time, timedelta
+import pytz
+
+from scheduler.models import EventTypeChoices, DayOfWeekChoices
+
+
+SLOT_LENGTH = timedelta(hours=1)
+
+
+def interval_slot_count(start_time, end_time):
+    """Number of whole slots in a stored specific-date interval."""
+    return (end_time - start_time) // SLOT_LENGTH
+
+
+def event_hours(event):
+    """The hours from the event's start time up to its end time, a partial last hour included."""
+    end_hour = event.end_time.hour
+    if event.end_time.minute or event.end_time.second:
+        end_hour += 1
+    return list(range(event.start_time.hour, end_hour))
+
+
+class SlotGrid:
+    """Hourly slot grid of an event: one row per date (or weekday), one column per hour.
+
+    Slot ``i`` of an attendee bitmap is bit ``i`` of a Python int, laid out day by day.
+    Weekly slots may start at any hour of an event day, so their rows span the whole day.
+    """
+
+    def __init__(self, event):
+        self.event = event
+        self.timezone = pytz.timezone(event.timezone)
+        if event.event_type == EventTypeChoices.SPECIFIC_DATES:
+            self.days = sorted({event_date.date for event_date in event.dates.all()})
+            self.hours = event_hours(event)
+        else:
+            self.days = sorted({day.day for day in event.days_of_week.all()})
+            self.hours = list(range(24))
+
+        self._day_index = {day: i for i, day in enumerate(self.days)}
+        self.size = len(self.days) * len(self.hours)
+        self.full_mask = (1 << self.size) - 1
+
+    def index(self, day, hour):
+        day_position = self._day_index.get(day)
+        if day_position is None or hour not in self.hours:
+            return None
+        return day_position * len(self.hours) + hour - self.hours[0]
+
+    def slot(self, index):
+        day_position, hour_position = divmod(index, len(self.hours))
+        return self.days[day_position], self.hours[hour_position]
+
+    def index_for_datetime(self, value):
+        if value.tzinfo is None:
+            value = pytz.UTC.localize(value)
+        local = value.astimezone(self.timezone)
+        if local.minute or local.second:
+            return None
+        return self.index(local.date(), local.hour)
+
+    def slot_datetimes(self, index):
+        day, hour = self.slot(index)
+        start = self.timezone.localize(datetime.combine(day, time(hour)))
+        return start, self.timezone.normalize(start + SLOT_LENGTH)
+
+    def window_start_mask(self, length):
+        """Bits of every slot where a window of ``length`` slots fits without crossing into the next day."""
+        width = len(self.hours)
+        if length > width:
+            return 0
+        day_mask = (1 << (width - length + 1)) - 1
+        mask = 0
+        for day_position in range(len(self.days)):
+            mask |= day_mask << (day_position * width)
+        return mask
+
+    def day_label(self, day):
+        if self.event.event_type == EventTypeChoices.SPECIFIC_DATES:
+            return day.isoformat()
+        return DayOfWeekChoices(day).label
+
+
+def iter_bits(bits):
+    """Yields the index of every set bit, lowest first."""
+    while bits:
+        lowest = bits & -bits
+        yield lowest.bit_length() - 1
+        bits ^= lowest
+
+
+def window_starts(bits, length):
+    """Returns the bits where ``length`` consecutive slots starting there are all set.
+
+    Doubles the covered span on each step, so it costs O(log length) whole-grid operations.
+    """
+    covered, span = bits, 1
+    while span < length and covered:
+        step = min(span, length - span)
+        covered &= covered >> step
+        span += step
+    return covered
+
+
+def pack_bits(bits, size):
+    if not bits:
+        return b""
+    return bits.to_bytes((size + 7) // 8, "little")
+
+
+def unpack_bits(data):
+    if not data:
+        return 0
+    return int.from_bytes(bytes(data), "little")
+
+
+def count_slots(bitmaps, size):
+    """Returns how many bitmaps have each slot set.
+
+    The bitmaps are summed as a bit-sliced binary counter: ``counters[i]`` holds bit ``i`` of
+    every slot's count at once, so each addition is a handful of whole-grid integer operations
+    instead of a loop over slots.
+    """
+    counters = []
+    for bits in bitmaps:
+        carry = bits
+        for position, counter in enumerate(counters):
+            if not carry:
+                break
+            counters[position] = counter ^ carry
+            carry &= counter
+        if carry:
+            counters.append(carry)
+
+    counts = [0] * size
+    for position, counter in enumerate(counters):
+        weight = 1 << position
+        for index in iter_bits(counter):
+            counts[index] += weight
+    return counts
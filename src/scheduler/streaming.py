@@ -0,0 +1,58 @@
+from asgiref.sync import sync_to_async
+from django.core.handlers.asgi import ASGIRequest
+from django.http import StreamingHttpResponse
+from rest_framework.utils.encoders import JSONEncoder
+
+
+# Bytes of encoded items gathered before a chunk is handed to the server.
+STREAM_BUFFER_SIZE = 64 * 1024
+
+
+def iter_json(fields, stream_key, items, buffer_size=STREAM_BUFFER_SIZE):
+    """Yields a JSON object: ``fields`` encoded up front, then ``stream_key`` as an array of ``items``.
+
+    The head is yielded before the first item is read, so the client gets its first byte
+    before the database is queried. Items are encoded one at a time and flushed in chunks
+    of about ``buffer_size`` bytes; only one chunk is ever held in memory. The encoding
+    matches the DRF JSON renderer.
+    """
+    encoder = JSONEncoder(ensure_ascii=False, separators=(",", ":"))
+    head = encoder.encode(fields)[:-1]
+    if fields:
+        head += ","
+    yield f"{head}{encoder.encode(stream_key)}:[".encode()
+
+    buffer = []
+    size = 0
+    separator = ""
+    for item in items:
+        chunk = separator + encoder.encode(item)
+        separator = ","
+        buffer.append(chunk)
+        size += len(chunk)
+        if size >= buffer_size:
+            yield "".join(buffer).encode()
+            buffer = []
+            size = 0
+    buffer.append("]}")
+    yield "".join(buffer).encode()
+
+
+async def aiter_in_thread(chunks):
+    """Drives a sync iterator from the event loop one chunk at a time.
+
+    Each step runs on the request's thread, the same one that ran the view, so database
+    access inside the iterator keeps using that thread's connection.
+    """
+    chunks = iter(chunks)
+    next_chunk = sync_to_async(next, thread_sensitive=True)
+    done = object()
+    while (chunk := await next_chunk(chunks, done)) is not done:
+        yield chunk
+
+
+def streaming_json_response(request, chunks, headers=None):
+    # ASGI would otherwise read a sync iterator to the end before sending anything
+    if isinstance(getattr(request, "_request", request), ASGIRequest):
+        chunks = aiter_in_thread(chunks)
+    return StreamingHttpResponse(chunks, content_type="application/json", headers=headers)
@@ -1,3 +1,1010 @@
-from django.test import TestCase
+import asyncio
+import base64
+from datetime import date, datetime, time, timedelta
+import gzip
+from io import StringIO
+import json
+from pathlib import Path
+from tempfile import TemporaryDirectory
+from unittest import mock
 
-# Create your tests here.
+import pytz
+from django.core.management import call_command
+from django.test import TestCase, TransactionTestCase, override_settings
+from django.db.models import F
+from django.http import Http404
+from django.utils.timezone import now
+from rest_framework.renderers import JSONRenderer
+
+from scheduler.event_cache import event_cache
+from scheduler.renderers import COMPACT_MEDIA_TYPE
+from scheduler.streaming import iter_json
+from scheduler.write_queue import WriteQueue
+from scheduler.ics import fold, iter_calendar
+from scheduler.intervals import intersect, normalize, subtract, union
+from scheduler.management.commands import purge_events
+from scheduler.retention import get_archive_path, get_expired_events
+from scheduler.models import (
+    Event,
+    EventDate,
+    EventDayOfWeek,
+    EventTypeChoices,
+    DayOfWeekChoices,
+    Attendee,
+    SpecificDateAvailability,
+    DayOfWeekAvailability,
+    EventSummary,
+    AttendeeSummary,
+)
+from scheduler.slots import SlotGrid, count_slots, interval_slot_count
+from scheduler.utils import (
+    apply_specific_date_intervals,
+    create_attendee,
+    decode_bits,
+    encode_bits,
+    get_attendee_bitmap,
+    get_event_by_unique_id,
+    get_event_summary,
+    rebuild_event_summary,
+)
+
+
+DAY = date(2030, 1, 7)
+
+
+def at(hour, minute=0):
+    return pytz.UTC.localize(datetime.combine(DAY, time(hour, minute)))
+
+
+def create_event(event_type=EventTypeChoices.SPECIFIC_DATES, compact_storage=False, days=(DAY,)):
+    event = Event.objects.create(
+        name="Planning",
+        start_time=time(0),
+        end_time=time(23, 59),
+        timezone="UTC",
+        event_type=event_type,
+        compact_storage=compact_storage,
+    )
+    if event_type == EventTypeChoices.SPECIFIC_DATES:
+        EventDate.objects.bulk_create([EventDate(event=event, date=day) for day in days])
+    else:
+        EventDayOfWeek.objects.bulk_create([EventDayOfWeek(event=event, day=day) for day in range(7)])
+    return event
+
+
+def specific(action, start, end):
+    return {"action": action, "start_time": start.isoformat(), "end_time": end.isoformat()}
+
+
+def weekly(action, day, hour):
+    return {"action": action, "day": DayOfWeekChoices(day).label, "start_time": f"{hour:02d}:00"}
+
+
+class APITestCase(TestCase):
+    """Signs an attendee up through the API and sends authenticated JSON requests."""
+
+    def sign_up(self, event, name="ana"):
+        response = self.client.post(
+            f"/event/{event.unique_id}/signin/", {"name": name}, content_type="application/json"
+        )
+        self.assertEqual(response.status_code, 201)
+        self.token = response.json()["access"]
+        return event.attendees.get(name=name)
+
+    def send(self, method, event, path, data):
+        return getattr(self.client, method)(
+            f"/event/{event.unique_id}/{path}", data, content_type="application/json",
+            HTTP_AUTHORIZATION=f"Bearer {self.token}",
+        )
+
+    def batch(self, event, *operations):
+        response = self.send("post", event, "availability/batch/", {"operations": list(operations)})
+        self.assertEqual(response.status_code, 200)
+        body = response.json()
+        return body["created"], body["deleted"], body["unchanged"]
+
+    def replace(self, event, *slots):
+        response = self.send("put", event, "availability/batch/", {"slots": list(slots)})
+        self.assertEqual(response.status_code, 200)
+        body = response.json()
+        return body["created"], body["deleted"]
+
+
+class IntervalTests(TestCase):
+    def test_normalize_merges_overlapping_and_adjacent(self):
+        self.assertEqual(normalize([(5, 7), (1, 3), (2, 4), (4, 5), (9, 10)]), [(1, 7), (9, 10)])
+
+    def test_normalize_keeps_contained_intervals_inside(self):
+        self.assertEqual(normalize([(1, 10), (2, 3), (4, 12)]), [(1, 12)])
+
+    def test_union_joins_touching_intervals(self):
+        self.assertEqual(union([(1, 3)], [(3, 5)]), [(1, 5)])
+        self.assertEqual(union([(1, 3)], [(4, 5)]), [(1, 3), (4, 5)])
+
+    def test_subtract_splits_and_trims(self):
+        self.assertEqual(subtract([(0, 10)], [(2, 3), (5, 6)]), [(0, 2), (3, 5), (6, 10)])
+        self.assertEqual(subtract([(0, 10)], [(-5, 2), (8, 15)]), [(2, 8)])
+        self.assertEqual(subtract([(0, 10)], [(0, 10)]), [])
+
+    def test_subtract_ignores_adjacent_intervals(self):
+        self.assertEqual(subtract([(2, 4)], [(0, 2), (4, 6)]), [(2, 4)])
+
+    def test_intersect(self):
+        self.assertEqual(intersect([(0, 4), (6, 10)], [(3, 7)]), [(3, 4), (6, 7)])
+        self.assertEqual(intersect([(0, 2)], [(2, 4)]), [])
+
+
+class SlotGridTests(TestCase):
+    def test_specific_dates_span_the_event_hours(self):
+        event = create_event(days=(DAY, DAY + timedelta(days=2)))
+        Event.objects.filter(pk=event.pk).update(start_time=time(9), end_time=time(17, 30))
+        event.refresh_from_db()
+        grid = SlotGrid(event)
+        self.assertEqual(grid.hours, list(range(9, 18)))
+        self.assertEqual(grid.size, 18)
+        self.assertEqual(grid.index(DAY, 9), 0)
+        self.assertEqual(grid.index(DAY + timedelta(days=2), 10), 10)
+        self.assertEqual(grid.slot(10), (DAY + timedelta(days=2), 10))
+        self.assertIsNone(grid.index(DAY, 8))
+        self.assertIsNone(grid.index(DAY + timedelta(days=1), 9))
+        self.assertEqual(grid.index_for_datetime(at(10)), 1)
+        self.assertIsNone(grid.index_for_datetime(at(10, 30)))
+        self.assertEqual(grid.slot_datetimes(1), (at(10), at(11)))
+
+    def test_weekly_rows_span_the_whole_day(self):
+        event = create_event(EventTypeChoices.DAYS_OF_WEEK)
+        Event.objects.filter(pk=event.pk).update(start_time=time(9), end_time=time(17))
+        event.refresh_from_db()
+        grid = SlotGrid(event)
+        self.assertEqual(grid.hours, list(range(24)))
+        self.assertEqual(grid.index(2, 7), 55)
+        self.assertEqual(grid.slot(55), (2, 7))
+
+    def test_count_slots_adds_up_every_bitmap(self):
+        self.assertEqual(count_slots([0b0111, 0b0110, 0b1100, 0], 5), [1, 2, 3, 1, 0])
+
+
+class CompactStorageTests(APITestCase):
+    def test_single_slot_writes_answer_like_row_storage(self):
+        for compact_storage in (False, True):
+            event = create_event(compact_storage=compact_storage)
+            self.sign_up(event)
+            interval = {"start_time": at(10).isoformat(), "end_time": at(11).isoformat()}
+            self.send("post", event, "availability/", {"start_time": at(9).isoformat(), "end_time": at(10).isoformat()})
+            response = self.send("post", event, "availability/", interval)
+            self.assertEqual(response.status_code, 201)
+            availability = response.json()["availability"]
+            stored = (datetime.fromisoformat(availability["start_time"]), datetime.fromisoformat(availability["end_time"]))
+            self.assertEqual(stored, (at(9), at(11)))
+            self.assertEqual(self.send("post", event, "availability/", interval).status_code, 200)
+            self.assertEqual(self.send("delete", event, "availability/", interval).status_code, 200)
+            self.assertEqual(self.send("delete", event, "availability/", interval).status_code, 404)
+
+    def test_weekly_slots_outside_the_event_hours_are_kept(self):
+        for compact_storage in (False, True):
+            event = create_event(EventTypeChoices.DAYS_OF_WEEK, compact_storage=compact_storage)
+            Event.objects.filter(pk=event.pk).update(start_time=time(9), end_time=time(17))
+            self.sign_up(event)
+            slot = {"day": DayOfWeekChoices(0).label, "start_time": "07:00"}
+            response = self.send("post", event, "dayofweekavailability/", slot)
+            self.assertEqual(response.status_code, 201)
+            self.assertEqual(response.json()["availability"]["day_of_week"]["day"], 0)
+            self.assertEqual(response.json()["availability"]["start_hour"], "07:00")
+            self.assertEqual(self.send("post", event, "dayofweekavailability/", slot).status_code, 200)
+            self.assertEqual(self.send("delete", event, "dayofweekavailability/", slot).status_code, 200)
+            self.assertEqual(self.send("delete", event, "dayofweekavailability/", slot).status_code, 404)
+
+    def test_bitmap_writes_keep_the_summary_and_heatmap(self):
+        event = create_event(compact_storage=True)
+        attendee = self.sign_up(event)
+        self.batch(event, specific("add", at(9), at(12)), specific("remove", at(10), at(11)))
+        self.assertEqual(get_attendee_bitmap(attendee), 1 << 9 | 1 << 11)
+        self.assertEqual(get_event_summary(event), (1, 2))
+        self.sign_up(event, "bob")
+        self.batch(event, specific("add", at(11), at(13)))
+        counts = self.client.get(f"/event/{event.unique_id}/heatmap/").json()["heatmap"]["counts"][0]
+        self.assertEqual(counts[9:14], [1, 0, 2, 1, 0])
+
+
+class EventCacheTests(TestCase):
+    def setUp(self):
+        event_cache.clear()
+
+    @override_settings(EVENT_VERSION_MAX_AGE=0)
+    def test_event_changed_by_another_worker_is_loaded_again(self):
+        event = create_event()
+        cached = get_event_by_unique_id(event.unique_id)
+        self.assertIs(get_event_by_unique_id(event.unique_id), cached)
+
+        # the queryset updates send no signals, as if another worker had made them
+        EventDate.objects.filter(event=event).update(date=DAY + timedelta(days=1))
+        Event.objects.filter(pk=event.pk).update(version=F("version") + 1)
+        reloaded = get_event_by_unique_id(event.unique_id)
+        self.assertEqual(reloaded.version, cached.version + 1)
+        self.assertEqual([event_date.date for event_date in reloaded.dates.all()], [DAY + timedelta(days=1)])
+
+    @override_settings(EVENT_VERSION_MAX_AGE=0)
+    def test_purged_event_is_not_found(self):
+        event = create_event()
+        get_event_by_unique_id(event.unique_id)
+        Event.objects.filter(pk=event.pk).delete()
+        with self.assertRaises(Http404):
+            get_event_by_unique_id(event.unique_id)
+
+
+class FieldSelectionTests(APITestCase):
+    def get(self, event, query):
+        return self.client.get(f"/event/{event.unique_id}/?{query}", HTTP_AUTHORIZATION=f"Bearer {self.token}")
+
+    def test_only_the_named_fields_are_returned(self):
+        event = create_event()
+        self.sign_up(event)
+        self.send("post", event, "availability/", {"start_time": at(9).isoformat(), "end_time": at(10).isoformat()})
+        body = self.get(event, "fields=total_available_slots,attendee_availabilities").json()
+        self.assertEqual(set(body), {"total_available_slots", "attendee_availabilities"})
+        self.assertEqual(body["total_available_slots"], 1)
+        self.assertEqual(len(body["attendee_availabilities"]), 1)
+        self.assertEqual(set(self.get(event, "fields=event&include=heatmap").json()), {"event", "heatmap"})
+
+    def test_fields_the_representation_lacks_are_rejected(self):
+        event = create_event()
+        self.sign_up(event)
+        self.assertEqual(self.get(event, "fields=event,unknown").status_code, 400)
+        self.assertEqual(self.get(event, "fields=availability").status_code, 400)
+        self.assertEqual(self.get(event, "fields=attendee_bitmap").status_code, 400)
+        self.assertEqual(self.get(event, "format=compact&fields=all_event_availabilities").status_code, 400)
+        self.assertEqual(self.get(event, "format=compact&fields=attendee_availabilities").status_code, 400)
+        body = self.get(event, "format=compact&fields=availability,attendee_bitmap").json()
+        self.assertEqual(set(body), {"availability", "attendee_bitmap"})
+
+
+class PasswordHasherTests(TestCase):
+    def test_attendees_get_the_event_hasher_and_staff_the_default(self):
+        event = create_event()
+        attendee = create_attendee(event, "ana", "secret")
+        self.assertTrue(attendee.password.startswith("event_pbkdf2_sha256$"))
+        self.assertEqual(attendee.validate_password("secret"), (True, None))
+
+        admin = Attendee.objects.create_superuser(name="admin", event=event, password="secret")
+        self.assertTrue(admin.password.startswith("pbkdf2_sha256$"))
+        self.assertEqual(admin.validate_password("secret"), (True, None))
+        admin.refresh_from_db()
+        self.assertTrue(admin.password.startswith("pbkdf2_sha256$"))
+
+
+class HeatmapTests(APITestCase):
+    def heatmap(self, event):
+        response = self.client.get(f"/event/{event.unique_id}/heatmap/")
+        self.assertEqual(response.status_code, 200)
+        return response.json()
+
+    def test_counts_attendees_per_slot(self):
+        event = create_event()
+        self.sign_up(event)
+        self.batch(event, specific("add", at(9), at(12)))
+        self.sign_up(event, "bob")
+        self.batch(event, specific("add", at(10), at(11)), specific("add", at(14), at(14, 30)))
+        body = self.heatmap(event)
+        self.assertEqual(body["attendees_with_availability_count"], 2)
+        heatmap = body["heatmap"]
+        self.assertEqual(heatmap["days"], [DAY.isoformat()])
+        self.assertEqual(len(heatmap["hours"]), 24)
+        self.assertEqual(heatmap["counts"][0][8:15], [0, 1, 2, 1, 0, 0, 0])
+        self.assertEqual(heatmap["max_count"], 2)
+
+    def test_days_of_week(self):
+        event = create_event(EventTypeChoices.DAYS_OF_WEEK)
+        self.sign_up(event)
+        self.batch(event, weekly("add", 0, 9), weekly("add", 3, 9))
+        self.sign_up(event, "bob")
+        self.batch(event, weekly("add", 3, 9))
+        heatmap = self.heatmap(event)["heatmap"]
+        self.assertEqual(heatmap["days"], [DayOfWeekChoices(day).label for day in range(7)])
+        self.assertEqual([counts[9] for counts in heatmap["counts"]], [1, 0, 0, 2, 0, 0, 0])
+
+    def test_follows_writes(self):
+        event = create_event()
+        self.sign_up(event)
+        self.assertEqual(self.heatmap(event)["heatmap"]["max_count"], 0)
+        self.batch(event, specific("add", at(9), at(10)))
+        self.assertEqual(self.heatmap(event)["heatmap"]["counts"][0][9], 1)
+
+
+class EventETagTests(APITestCase):
+    def get(self, event, **headers):
+        return self.client.get(f"/event/{event.unique_id}/", HTTP_AUTHORIZATION=f"Bearer {self.token}", **headers)
+
+    def test_unchanged_event_answers_not_modified(self):
+        event = create_event()
+        self.sign_up(event)
+        response = self.get(event)
+        self.assertEqual(response.status_code, 200)
+        etag = response["ETag"]
+        response = self.get(event, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(response["ETag"], etag)
+
+    def test_write_changes_the_etag(self):
+        event = create_event()
+        self.sign_up(event)
+        etag = self.get(event)["ETag"]
+        self.send("post", event, "availability/", {"start_time": at(9).isoformat(), "end_time": at(10).isoformat()})
+        response = self.get(event, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response["ETag"], etag)
+        self.assertEqual(len(response.json()["attendee_availabilities"]), 1)
+
+    def test_etag_differs_per_attendee_and_query(self):
+        event = create_event()
+        self.sign_up(event)
+        etag = self.get(event)["ETag"]
+        self.assertNotEqual(self.client.get(f"/event/{event.unique_id}/")["ETag"], etag)
+        projected = self.client.get(
+            f"/event/{event.unique_id}/?timezone=Asia/Tehran", HTTP_AUTHORIZATION=f"Bearer {self.token}"
+        )
+        self.assertNotEqual(projected["ETag"], etag)
+        self.sign_up(event, "bob")
+        self.assertNotEqual(self.get(event)["ETag"], etag)
+
+
+class BestTimesTests(APITestCase):
+    def best_times(self, event, query):
+        response = self.client.get(f"/event/{event.unique_id}/best-times/?{query}")
+        self.assertEqual(response.status_code, 200)
+        return [
+            (datetime.fromisoformat(best["start_time"]).hour, best["count"], sorted(best["attendees"]))
+            for best in response.json()["best_times"]
+        ]
+
+    def create_event(self, compact_storage=False):
+        event = create_event(compact_storage=compact_storage)
+        for name, start, end in [("ana", 9, 12), ("bob", 10, 12), ("cara", 10, 11), ("dan", 15, 16)]:
+            self.sign_up(event, name)
+            self.batch(event, specific("add", at(start), at(end)))
+        return event
+
+    def test_windows_are_ranked_by_count_then_time(self):
+        for compact_storage in (False, True):
+            event = self.create_event(compact_storage)
+            self.assertEqual(self.best_times(event, "duration=60&limit=4"), [
+                (10, 3, ["ana", "bob", "cara"]), (11, 2, ["ana", "bob"]), (9, 1, ["ana"]), (15, 1, ["dan"]),
+            ])
+
+    def test_longer_windows_need_every_slot(self):
+        event = self.create_event()
+        self.assertEqual(self.best_times(event, "duration=120"), [(10, 2, ["ana", "bob"]), (9, 1, ["ana"])])
+        self.assertEqual(self.best_times(event, "duration=90&limit=1"), [(10, 2, ["ana", "bob"])])
+
+    def test_invalid_query(self):
+        event = create_event()
+        self.assertEqual(self.client.get(f"/event/{event.unique_id}/best-times/?duration=0").status_code, 400)
+        self.assertEqual(self.client.get(f"/event/{event.unique_id}/best-times/?limit=x").status_code, 400)
+
+
+class TimezoneProjectionTests(APITestCase):
+    def test_offsets_follow_a_dst_change(self):
+        # Europe/Berlin leaves summer time at 01:00 UTC on 2030-10-27
+        days = [date(2030, 10, 26), date(2030, 10, 27), date(2030, 10, 28)]
+        event = create_event(days=days)
+        self.sign_up(event)
+        utc = [
+            (datetime(2030, 10, 26, 10), datetime(2030, 10, 26, 11)),
+            (datetime(2030, 10, 27, 0), datetime(2030, 10, 27, 2)),
+            (datetime(2030, 10, 28, 10), datetime(2030, 10, 28, 11)),
+        ]
+        self.batch(event, *(specific("add", pytz.UTC.localize(start), pytz.UTC.localize(end)) for start, end in utc))
+
+        response = self.client.get(
+            f"/event/{event.unique_id}/?timezone=Europe/Berlin", HTTP_AUTHORIZATION=f"Bearer {self.token}"
+        )
+        body = response.json()
+        self.assertEqual(body["display_timezone"], "Europe/Berlin")
+        projected = [
+            (str(avail["start_time"]), str(avail["end_time"])) for avail in body["all_event_availabilities"]
+        ]
+        self.assertEqual(sorted(projected), [
+            ("2030-10-26T12:00:00+02:00", "2030-10-26T13:00:00+02:00"),
+            ("2030-10-27T02:00:00+02:00", "2030-10-27T03:00:00+01:00"),
+            ("2030-10-28T11:00:00+01:00", "2030-10-28T12:00:00+01:00"),
+        ])
+        self.assertEqual(sorted(projected), sorted(
+            (str(avail["start_time"]), str(avail["end_time"])) for avail in body["attendee_availabilities"]
+        ))
+
+
+class WriteQueueTests(TransactionTestCase):
+    def submit_all(self, write_queue, *jobs):
+        async def submit():
+            return await asyncio.gather(*(write_queue.asubmit(*job) for job in jobs), return_exceptions=True)
+        return asyncio.run(submit())
+
+    def test_queued_writes_share_one_batch(self):
+        event = create_event()
+        write_queue = WriteQueue(max_batch=10, max_delay=0.5)
+        attendees = self.submit_all(write_queue, *((create_attendee, event, name) for name in ("ana", "bob", "cara")))
+        self.assertEqual([attendee.name for attendee in attendees], ["ana", "bob", "cara"])
+        self.assertEqual((write_queue.batches, write_queue.jobs), (1, 3))
+        self.assertEqual(event.attendees.count(), 3)
+
+    def test_failing_job_only_rolls_back_itself(self):
+        event = create_event()
+
+        def create_and_fail(name):
+            create_attendee(event, name)
+            raise ValueError(name)
+
+        write_queue = WriteQueue(max_batch=10, max_delay=0.5)
+        results = self.submit_all(
+            write_queue, (create_attendee, event, "ana"), (create_and_fail, "bob"), (create_attendee, event, "cara")
+        )
+        self.assertIsInstance(results[1], ValueError)
+        self.assertEqual(write_queue.batches, 1)
+        self.assertEqual(set(event.attendees.values_list("name", flat=True)), {"ana", "cara"})
+
+
+class StreamingTests(APITestCase):
+    def test_chunks_join_into_the_rendered_json(self):
+        items = [{"id": index, "start_time": at(index), "name": "آنا"} for index in range(5)]
+        fields = {"event": {"name": "Planning"}, "count": 5}
+        streamed = b"".join(iter_json(fields, "items", items, buffer_size=1))
+        self.assertEqual(streamed, JSONRenderer().render({**fields, "items": items}))
+        self.assertEqual(b"".join(iter_json({}, "items", [])), b'{"items":[]}')
+
+    def test_streamed_event_matches_the_plain_response(self):
+        event = create_event()
+        self.sign_up(event)
+        self.batch(event, specific("add", at(9), at(11)), specific("add", at(13), at(14)))
+        self.sign_up(event, "bob")
+        self.batch(event, specific("add", at(10), at(12)))
+        for query in ("", "timezone=Asia/Tehran&"):
+            plain = self.client.get(f"/event/{event.unique_id}/?{query}", HTTP_AUTHORIZATION=f"Bearer {self.token}")
+            streamed = self.client.get(
+                f"/event/{event.unique_id}/?{query}stream=1", HTTP_AUTHORIZATION=f"Bearer {self.token}"
+            )
+            self.assertTrue(streamed.streaming)
+            self.assertEqual(json.loads(b"".join(streamed.streaming_content)), plain.json())
+
+
+class CompactFormatTests(APITestCase):
+    def get_compact(self, event):
+        response = self.client.get(
+            f"/event/{event.unique_id}/", HTTP_ACCEPT=COMPACT_MEDIA_TYPE, HTTP_AUTHORIZATION=f"Bearer {self.token}"
+        )
+        self.assertEqual(response["Content-Type"], COMPACT_MEDIA_TYPE)
+        return json.loads(response.content)
+
+    def put_bits(self, event, bits):
+        response = self.client.put(
+            f"/event/{event.unique_id}/availability/batch/", json.dumps({"bits": bits}),
+            content_type=COMPACT_MEDIA_TYPE, HTTP_AUTHORIZATION=f"Bearer {self.token}",
+        )
+        self.assertEqual(response.status_code, 200)
+        body = response.json()
+        return body["created"], body["deleted"]
+
+    def test_bits_round_trip(self):
+        grid = SlotGrid(create_event(days=(DAY, DAY + timedelta(days=1))))
+        for bits in (0, 1, 1 << 9 | 1 << 30, grid.full_mask):
+            self.assertEqual(decode_bits(grid, encode_bits(grid, bits)), bits)
+        with self.assertRaises(ValueError):
+            decode_bits(grid, "not base64!")
+        with self.assertRaises(ValueError):
+            decode_bits(grid, base64.b64encode((1 << grid.size).to_bytes(7, "little")).decode())
+
+    def test_rendered_bitmap_parses_back_to_the_same_availability(self):
+        for compact_storage in (False, True):
+            event = create_event(compact_storage=compact_storage)
+            self.sign_up(event)
+            self.batch(event, specific("add", at(9), at(11)), specific("add", at(14), at(15)))
+            body = self.get_compact(event)
+            self.assertEqual(body["availability"]["attendees"], ["ana"])
+            self.assertEqual(body["availability"]["bitmaps"], [body["attendee_bitmap"]])
+            self.assertEqual(decode_bits(SlotGrid(event), body["attendee_bitmap"]), 1 << 9 | 1 << 10 | 1 << 14)
+
+            self.assertEqual(self.put_bits(event, body["attendee_bitmap"]), (0, 0))
+            self.assertEqual(self.put_bits(event, encode_bits(SlotGrid(event), 1 << 9)), (0, 2))
+            self.assertEqual(decode_bits(SlotGrid(event), self.get_compact(event)["attendee_bitmap"]), 1 << 9)
+
+
+class BulkCreateTests(TestCase):
+    def event_data(self, index, event_type=EventTypeChoices.SPECIFIC_DATES):
+        data = {
+            "name": f"Event {index}", "start_time": "09:00", "end_time": "17:00", "timezone": "UTC",
+            "event_type": event_type.label,
+        }
+        if event_type == EventTypeChoices.DAYS_OF_WEEK:
+            return {**data, "days_of_week": [{"day": DayOfWeekChoices(day).label} for day in (0, 2)]}
+        return {**data, "dates": [{"date": (DAY + timedelta(days=day)).isoformat()} for day in (0, 1)]}
+
+    def bulk_create(self, events):
+        return self.client.post("/event/bulk-create/", {"events": events}, content_type="application/json")
+
+    def test_fifty_events_take_one_insert_per_table(self):
+        # the savepoint, the events, their dates and the release
+        with self.assertNumQueries(4):
+            response = self.bulk_create([self.event_data(index) for index in range(50)])
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(len(response.json()["events"]), 50)
+        self.assertEqual(EventDate.objects.count(), 100)
+
+        weekly = [self.event_data(index, EventTypeChoices.DAYS_OF_WEEK) for index in range(50)]
+        with self.assertNumQueries(4):
+            self.assertEqual(self.bulk_create(weekly).status_code, 201)
+        self.assertEqual(EventDayOfWeek.objects.count(), 100)
+
+    def test_one_invalid_event_creates_none(self):
+        response = self.bulk_create([self.event_data(0), {**self.event_data(1), "end_time": "08:00"}])
+        self.assertEqual(response.status_code, 400)
+        self.assertFalse(Event.objects.exists())
+
+
+class CalendarTests(APITestCase):
+    def render(self, event, windows):
+        text = b"".join(iter_calendar(event, windows, pytz.UTC.localize(datetime(2030, 1, 1)))).decode()
+        return text.replace("\r\n ", "").split("\r\n")
+
+    def test_vtimezone_lists_the_offset_changes_of_the_window(self):
+        event = create_event()
+        event.timezone = "Europe/Berlin"
+        zone = pytz.timezone(event.timezone)
+        start = zone.localize(datetime(2030, 10, 26, 10))
+        lines = self.render(event, [
+            {"start": start, "end": zone.localize(datetime(2030, 10, 28, 11)), "description": "Best time."},
+        ])
+        self.assertIn("DTSTART;TZID=Europe/Berlin:20301026T100000", lines)
+        self.assertIn("DTEND;TZID=Europe/Berlin:20301028T110000", lines)
+        vtimezone = lines[lines.index("BEGIN:VTIMEZONE"):lines.index("END:VTIMEZONE") + 1]
+        self.assertIn("TZID:Europe/Berlin", vtimezone)
+        self.assertIn("BEGIN:STANDARD", vtimezone)
+        standard = vtimezone[vtimezone.index("BEGIN:STANDARD"):]
+        self.assertEqual(standard[1:4], ["DTSTART:20301027T030000", "TZOFFSETFROM:+0200", "TZOFFSETTO:+0100"])
+        self.assertNotIn("RRULE", "".join(lines))
+
+    def test_weekly_windows_recur(self):
+        event = create_event(EventTypeChoices.DAYS_OF_WEEK)
+        start = pytz.UTC.localize(datetime(2030, 1, 9, 9))
+        lines = self.render(event, [
+            {"start": start, "end": start + timedelta(hours=1), "weekly": True, "description": "Best time."},
+        ])
+        self.assertIn("RRULE:FREQ=WEEKLY;BYDAY=WE", lines)
+        self.assertIn("TZID:UTC", lines)
+
+    def test_long_lines_fold_between_characters(self):
+        line = "DESCRIPTION:" + "زمان " * 40
+        folded = fold(line)
+        self.assertTrue(all(len(part) <= 75 for part in folded.split(b"\r\n")))
+        self.assertEqual(folded.decode().replace("\r\n ", ""), line + "\r\n")
+
+    def test_calendar_of_the_best_time(self):
+        event = create_event()
+        self.sign_up(event)
+        self.batch(event, specific("add", at(9), at(11)))
+        response = self.client.get(f"/event/{event.unique_id}/calendar.ics?duration=120")
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response["Content-Type"], "text/calendar; charset=utf-8")
+        lines = response.content.decode().split("\r\n")
+        self.assertEqual(lines[0], "BEGIN:VCALENDAR")
+        self.assertIn("DTSTART;TZID=UTC:20300107T090000", lines)
+        self.assertIn("DTEND;TZID=UTC:20300107T110000", lines)
+        revalidated = self.client.get(
+            f"/event/{event.unique_id}/calendar.ics?duration=120", HTTP_IF_NONE_MATCH=response["ETag"]
+        )
+        self.assertEqual(revalidated.status_code, 304)
+
+
+class SpecificDateIntervalTests(TestCase):
+    def setUp(self):
+        self.event = create_event()
+        self.attendee = create_attendee(self.event, "ana")
+
+    def stored(self):
+        return list(
+            SpecificDateAvailability.objects.filter(attendee=self.attendee)
+            .order_by("start_time").values_list("start_time", "end_time")
+        )
+
+    def apply(self, *changes):
+        return apply_specific_date_intervals(self.attendee, changes)
+
+    def test_add_merges_with_overlapping_and_adjacent_rows(self):
+        self.apply(((at(9), at(10)), True), ((at(11), at(12)), True))
+        added = self.apply(((at(10), at(11)), True)).created
+        self.assertEqual(self.stored(), [(at(9), at(12))])
+        self.assertEqual(added, [{"start_time": at(10), "end_time": at(11)}])
+
+    def test_add_over_existing_interval_reports_only_new_time(self):
+        self.apply(((at(12), at(13)), True))
+        added, removed, _, _ = self.apply(((at(9), at(17)), True))
+        self.assertEqual(self.stored(), [(at(9), at(17))])
+        self.assertEqual(
+            added,
+            [{"start_time": at(9), "end_time": at(12)}, {"start_time": at(13), "end_time": at(17)}],
+        )
+        self.assertEqual(removed, [])
+
+    def test_remove_splits_an_interval(self):
+        self.apply(((at(9), at(17)), True))
+        removed = self.apply(((at(12), at(13)), False)).deleted
+        self.assertEqual(self.stored(), [(at(9), at(12)), (at(13), at(17))])
+        self.assertEqual(removed, [{"start_time": at(12), "end_time": at(13)}])
+
+    def test_remove_trims_the_edges(self):
+        self.apply(((at(9), at(12)), True))
+        removed = self.apply(((at(8), at(10)), False), ((at(11), at(14)), False)).deleted
+        self.assertEqual(self.stored(), [(at(10), at(11))])
+        self.assertEqual(
+            removed,
+            [{"start_time": at(9), "end_time": at(10)}, {"start_time": at(11), "end_time": at(12)}],
+        )
+
+    def test_unchanged_writes_nothing(self):
+        self.apply(((at(9), at(12)), True))
+        self.assertEqual(self.apply(((at(10), at(11)), True), ((at(13), at(14)), False)), ([], [], 0, 0))
+        self.assertEqual(self.stored(), [(at(9), at(12))])
+
+
+    def test_slots_are_counted_on_the_stored_rows(self):
+        self.apply(((at(9), at(11)), True))
+        changes = self.apply(((at(9, 30), at(10)), False))
+        self.assertEqual((changes.created_slots, changes.deleted_slots), (0, 1))
+        changes = self.apply(((at(9, 30), at(10)), True))
+        self.assertEqual((changes.created_slots, changes.deleted_slots), (1, 0))
+
+
+class AvailabilityBatchCountTests(APITestCase):
+    def test_counts_are_slots_for_coalesced_rows(self):
+        event = create_event()
+        self.sign_up(event)
+        self.assertEqual(self.batch(event, specific("add", at(12), at(13))), (1, 0, 0))
+        self.assertEqual(self.batch(event, specific("add", at(9), at(17))), (7, 0, 1))
+        self.assertEqual(self.batch(event, specific("remove", at(10), at(13))), (0, 3, 0))
+
+    def test_counts_match_between_row_and_compact_storage(self):
+        for compact_storage in (False, True):
+            event = create_event(compact_storage=compact_storage)
+            self.sign_up(event)
+            self.batch(event, specific("add", at(12), at(13)))
+            with self.subTest(compact_storage=compact_storage):
+                self.assertEqual(
+                    self.batch(event, *[
+                        specific("add", at(hour), at(hour + 1)) for hour in range(9, 17)
+                    ]),
+                    (7, 0, 1),
+                )
+                self.assertEqual(
+                    self.batch(event, specific("remove", at(9), at(10)), specific("remove", at(20), at(21))),
+                    (0, 1, 1),
+                )
+
+    def test_sub_slot_split_counts_the_slot_it_breaks(self):
+        event = create_event()
+        self.sign_up(event)
+        self.batch(event, specific("add", at(9), at(12)))
+        self.assertEqual(self.batch(event, specific("remove", at(10), at(10, 30))), (0, 1, 0))
+        self.assertEqual(self.batch(event, specific("add", at(10), at(10, 30))), (1, 0, 0))
+        self.assertEqual(self.replace(event, {"start_time": at(9).isoformat(), "end_time": at(11, 30).isoformat()}), (0, 1))
+
+    def test_counts_add_up_to_the_requested_slots(self):
+        event = create_event()
+        self.sign_up(event)
+        self.batch(event, specific("add", at(8), at(11)))
+        created, deleted, unchanged = self.batch(
+            event, specific("add", at(9), at(13)), specific("remove", at(7), at(9))
+        )
+        self.assertEqual((created, deleted), (2, 1))
+        self.assertEqual(created + deleted + unchanged, 6)
+
+
+class SummaryTests(APITestCase):
+    """The summary counters must always match a recount from the availability rows."""
+
+    def recount(self, event):
+        counts = {}
+        if event.event_type == EventTypeChoices.SPECIFIC_DATES:
+            rows = SpecificDateAvailability.objects.filter(event=event).values_list("attendee_id", "start_time", "end_time")
+            for attendee_id, start_time, end_time in rows:
+                slots, availabilities = counts.get(attendee_id, (0, 0))
+                counts[attendee_id] = (slots + interval_slot_count(start_time, end_time), availabilities + 1)
+        else:
+            for attendee_id in DayOfWeekAvailability.objects.filter(event=event).values_list("attendee_id", flat=True):
+                slots, availabilities = counts.get(attendee_id, (0, 0))
+                counts[attendee_id] = (slots + 1, availabilities + 1)
+        return counts
+
+    def assertSummaryMatchesRows(self, event, expected):
+        counts = self.recount(event)
+        self.assertEqual(get_event_summary(event), expected)
+        self.assertEqual(get_event_summary(event), (len(counts), sum(slots for slots, _ in counts.values())))
+        stored = {
+            attendee_id: (slots, availabilities)
+            for attendee_id, slots, availabilities in AttendeeSummary.objects.filter(event=event).exclude(
+                slot_count=0, availability_count=0
+            ).values_list("attendee_id", "slot_count", "availability_count")
+        }
+        self.assertEqual(stored, counts)
+
+    def test_add_and_remove(self):
+        event = create_event()
+        self.sign_up(event)
+        self.batch(event, specific("add", at(9), at(12)), specific("add", at(14), at(15)))
+        self.assertSummaryMatchesRows(event, (1, 4))
+        self.batch(event, specific("remove", at(10), at(11)))
+        self.assertSummaryMatchesRows(event, (1, 3))
+        self.batch(event, specific("add", at(10), at(11)))
+        self.assertSummaryMatchesRows(event, (1, 4))
+        self.batch(event, specific("remove", at(0), at(23)))
+        self.assertSummaryMatchesRows(event, (0, 0))
+
+    def test_sub_hour_interval_counts_the_attendee(self):
+        event = create_event()
+        self.sign_up(event)
+        self.batch(event, specific("add", at(9), at(9, 30)))
+        self.assertSummaryMatchesRows(event, (1, 0))
+        self.batch(event, specific("add", at(11), at(12)))
+        self.assertSummaryMatchesRows(event, (1, 1))
+        self.batch(event, specific("remove", at(11), at(12)))
+        self.assertSummaryMatchesRows(event, (1, 0))
+        self.batch(event, specific("remove", at(9), at(9, 30)))
+        self.assertSummaryMatchesRows(event, (0, 0))
+
+    def test_sub_slot_split_recounts_the_stored_rows(self):
+        event = create_event()
+        self.sign_up(event)
+        self.batch(event, specific("add", at(9), at(11)))
+        self.batch(event, specific("remove", at(9, 30), at(10)))
+        self.assertSummaryMatchesRows(event, (1, 1))
+        self.assertFalse(rebuild_event_summary(event, dry_run=True)[2])
+        self.batch(event, specific("add", at(9, 30), at(10)))
+        self.assertSummaryMatchesRows(event, (1, 2))
+        self.replace(
+            event,
+            {"start_time": at(9).isoformat(), "end_time": at(9, 45).isoformat()},
+            {"start_time": at(10, 15).isoformat(), "end_time": at(11).isoformat()},
+        )
+        self.assertSummaryMatchesRows(event, (1, 0))
+        self.assertFalse(rebuild_event_summary(event, dry_run=True)[2])
+
+    def test_put_replace(self):
+        event = create_event()
+        self.sign_up(event)
+        self.replace(event, {"start_time": at(9).isoformat(), "end_time": at(11).isoformat()})
+        self.assertSummaryMatchesRows(event, (1, 2))
+        self.replace(
+            event,
+            {"start_time": at(10).isoformat(), "end_time": at(12).isoformat()},
+            {"start_time": at(13).isoformat(), "end_time": at(13, 30).isoformat()},
+        )
+        self.assertSummaryMatchesRows(event, (1, 2))
+        self.replace(event, {"start_time": at(13).isoformat(), "end_time": at(13, 30).isoformat()})
+        self.assertSummaryMatchesRows(event, (1, 0))
+        self.replace(event)
+        self.assertSummaryMatchesRows(event, (0, 0))
+
+    def test_days_of_week(self):
+        event = create_event(EventTypeChoices.DAYS_OF_WEEK)
+        self.sign_up(event)
+        self.batch(event, weekly("add", 0, 9), weekly("add", 0, 10), weekly("add", 3, 9))
+        self.assertSummaryMatchesRows(event, (1, 3))
+        self.batch(event, weekly("remove", 0, 9))
+        self.assertSummaryMatchesRows(event, (1, 2))
+        self.replace(event, {"day": DayOfWeekChoices(5).label, "start_time": "08:00"})
+        self.assertSummaryMatchesRows(event, (1, 1))
+
+    def test_attendee_deletion(self):
+        event = create_event()
+        ana = self.sign_up(event)
+        self.batch(event, specific("add", at(9), at(9, 30)))
+        self.sign_up(event, "bob")
+        self.batch(event, specific("add", at(9), at(12)))
+        self.assertSummaryMatchesRows(event, (2, 3))
+        ana.delete()
+        self.assertSummaryMatchesRows(event, (1, 3))
+        event.attendees.get(name="bob").delete()
+        self.assertSummaryMatchesRows(event, (0, 0))
+
+    def test_repair_detects_and_fixes_drift(self):
+        event = create_event()
+        attendee = self.sign_up(event)
+        self.batch(event, specific("add", at(9), at(11)), specific("add", at(13), at(13, 30)))
+        self.assertEqual(rebuild_event_summary(event), ((1, 2), (1, 2), False))
+
+        AttendeeSummary.objects.filter(attendee=attendee).update(slot_count=0, availability_count=0)
+        EventSummary.objects.filter(event=event).update(attendees_with_availability=0, total_slots=0)
+        self.assertEqual(rebuild_event_summary(event, dry_run=True), ((0, 0), (1, 2), True))
+        self.assertEqual(get_event_summary(event), (0, 0))
+
+        # a repair is not activity: retention still sees the last write
+        Event.objects.filter(pk=event.pk).update(last_activity=now() - timedelta(days=40))
+        event.refresh_from_db()
+        self.assertEqual(rebuild_event_summary(event), ((0, 0), (1, 2), True))
+        self.assertSummaryMatchesRows(event, (1, 2))
+        repaired = Event.objects.get(pk=event.pk)
+        self.assertEqual((repaired.version, repaired.last_activity), (event.version + 1, event.last_activity))
+        self.assertEqual(rebuild_event_summary(event), ((1, 2), (1, 2), False))
+
+    def test_repair_detects_drift_in_attendee_counters_only(self):
+        event = create_event()
+        attendee = self.sign_up(event)
+        self.batch(event, specific("add", at(9), at(9, 30)))
+        AttendeeSummary.objects.filter(attendee=attendee).update(availability_count=0)
+        self.assertTrue(rebuild_event_summary(event)[2])
+        self.assertSummaryMatchesRows(event, (1, 0))
+
+    def test_repair_summaries_command(self):
+        event = create_event()
+        self.sign_up(event)
+        self.batch(event, specific("add", at(9), at(10)))
+        EventSummary.objects.filter(event=event).update(total_slots=5)
+        output = StringIO()
+        call_command("repair_summaries", "--dry-run", stdout=output)
+        self.assertIn(f"{event.unique_id}: attendees 1 -> 1, slots 5 -> 1", output.getvalue())
+        self.assertIn("1 events checked, 1 need repair.", output.getvalue())
+        call_command("repair_summaries", stdout=StringIO())
+        self.assertSummaryMatchesRows(event, (1, 1))
+
+
+class ReplaceAvailabilityTests(APITestCase):
+    def interval(self, start, end):
+        return {"start_time": start.isoformat(), "end_time": end.isoformat()}
+
+    def day_slot(self, day, hour):
+        return {"day": DayOfWeekChoices(day).label, "start_time": f"{hour:02d}:00"}
+
+    def stored(self, attendee):
+        if attendee.event.event_type == EventTypeChoices.SPECIFIC_DATES:
+            return set(SpecificDateAvailability.objects.filter(attendee=attendee).values_list("start_time", "end_time"))
+        return set(DayOfWeekAvailability.objects.filter(attendee=attendee).values_list("event_day_of_week__day", "start_hour"))
+
+    def test_specific_dates_add_and_remove_in_one_put(self):
+        for compact_storage in (False, True):
+            event = create_event(compact_storage=compact_storage)
+            attendee = self.sign_up(event)
+            with self.subTest(compact_storage=compact_storage):
+                self.assertEqual(self.replace(event, self.interval(at(9), at(11))), (2, 0))
+                self.assertEqual(self.replace(event, self.interval(at(10), at(13))), (2, 1))
+                if not compact_storage:
+                    self.assertEqual(self.stored(attendee), {(at(10), at(13))})
+
+    def test_days_of_week_add_and_remove_in_one_put(self):
+        for compact_storage in (False, True):
+            event = create_event(EventTypeChoices.DAYS_OF_WEEK, compact_storage=compact_storage)
+            attendee = self.sign_up(event)
+            with self.subTest(compact_storage=compact_storage):
+                self.assertEqual(self.replace(event, self.day_slot(0, 9), self.day_slot(0, 10)), (2, 0))
+                self.assertEqual(self.replace(event, self.day_slot(0, 10), self.day_slot(1, 9)), (1, 1))
+                if not compact_storage:
+                    self.assertEqual(self.stored(attendee), {(0, 10), (1, 9)})
+
+    def test_repeated_put_writes_nothing(self):
+        cases = [
+            (EventTypeChoices.SPECIFIC_DATES, [self.interval(at(9), at(11)), self.interval(at(14), at(14, 30))]),
+            (EventTypeChoices.DAYS_OF_WEEK, [self.day_slot(0, 9), self.day_slot(3, 17)]),
+        ]
+        for event_type, slots in cases:
+            event = create_event(event_type)
+            attendee = self.sign_up(event)
+            with self.subTest(event_type=event_type):
+                self.replace(event, *slots)
+                stored = self.stored(attendee)
+                version = Event.objects.get(pk=event.pk).version
+                response = self.send("put", event, "availability/batch/", {"slots": slots})
+                self.assertEqual(response.status_code, 200)
+                self.assertEqual(
+                    response.json(),
+                    {"message": "Availability is already up to date.", "created": 0, "deleted": 0},
+                )
+                self.assertEqual(self.stored(attendee), stored)
+                self.assertEqual(Event.objects.get(pk=event.pk).version, version)
+
+    def test_put_replaces_only_the_signed_in_attendee(self):
+        event = create_event()
+        ana = self.sign_up(event)
+        self.replace(event, self.interval(at(9), at(10)))
+        bob = self.sign_up(event, "bob")
+        self.replace(event, self.interval(at(12), at(13)))
+        self.assertEqual(self.stored(ana), {(at(9), at(10))})
+        self.assertEqual(self.stored(bob), {(at(12), at(13))})
+
+
+@override_settings(EVENT_RETENTION_DAYS_AFTER_LAST_DATE=30, EVENT_RETENTION_INACTIVE_DAYS=180)
+class RetentionTests(TestCase):
+    def setUp(self):
+        self.now = now()
+        self.today = self.now.date()
+
+    def create_event(self, event_type=EventTypeChoices.SPECIFIC_DATES, days_ago=(), inactive_days=0):
+        event = create_event(event_type, days=[self.today - timedelta(days=days) for days in days_ago])
+        Event.objects.filter(pk=event.pk).update(last_activity=self.now - timedelta(days=inactive_days))
+        return event
+
+    def expired(self):
+        return set(get_expired_events(self.now).values_list("pk", flat=True))
+
+    def test_specific_dates_expire_after_their_last_date(self):
+        old = self.create_event(days_ago=[31])
+        boundary = self.create_event(days_ago=[30])
+        recent = self.create_event(days_ago=[29])
+        spanning = self.create_event(days_ago=[60, 5])
+        self.assertEqual(self.expired(), {old.pk})
+        for event in (boundary, recent, spanning):
+            self.assertNotIn(event.pk, self.expired())
+
+    def test_any_event_expires_after_inactivity(self):
+        weekly_inactive = self.create_event(EventTypeChoices.DAYS_OF_WEEK, inactive_days=181)
+        weekly_active = self.create_event(EventTypeChoices.DAYS_OF_WEEK, inactive_days=179)
+        upcoming_inactive = self.create_event(days_ago=[-10], inactive_days=181)
+        self.assertEqual(self.expired(), {weekly_inactive.pk, upcoming_inactive.pk})
+        self.assertNotIn(weekly_active.pk, self.expired())
+
+    def test_expired_events_are_ordered_oldest_activity_first(self):
+        newer = self.create_event(days_ago=[40], inactive_days=1)
+        older = self.create_event(days_ago=[40], inactive_days=20)
+        self.assertEqual(list(get_expired_events(self.now).values_list("pk", flat=True)), [older.pk, newer.pk])
+
+
+@override_settings(EVENT_RETENTION_DAYS_AFTER_LAST_DATE=30, EVENT_RETENTION_INACTIVE_DAYS=180)
+class PurgeEventsCommandTests(TestCase):
+    def setUp(self):
+        directory = TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.archive_dir = directory.name
+        today = now().date()
+        self.expired = self.create_event(today - timedelta(days=45))
+        self.kept = self.create_event(today + timedelta(days=3))
+
+    def create_event(self, day):
+        event = create_event(days=(day,))
+        for name in ("ana", "bob"):
+            attendee = create_attendee(event, name)
+            start = pytz.UTC.localize(datetime.combine(day, time(9)))
+            apply_specific_date_intervals(attendee, [((start, start + timedelta(hours=2)), True)])
+        return event
+
+    def purge(self, *args):
+        output = StringIO()
+        call_command("purge_events", "--archive-dir", self.archive_dir, "--pause", "0", *args, stdout=output)
+        return output.getvalue()
+
+    def archived_models(self, event):
+        with gzip.open(get_archive_path(event, self.archive_dir), "rt", encoding="utf-8") as archive:
+            return [json.loads(line)["model"] for line in archive]
+
+    def test_only_expired_events_are_purged(self):
+        output = self.purge()
+        self.assertIn("1 events purged", output)
+        self.assertFalse(Event.objects.filter(pk=self.expired.pk).exists())
+        for model in (Attendee, SpecificDateAvailability, EventDate, EventSummary, AttendeeSummary):
+            self.assertFalse(model.objects.filter(event_id=self.expired.pk).exists(), model)
+        self.assertTrue(Event.objects.filter(pk=self.kept.pk).exists())
+        self.assertEqual(self.kept.attendees.count(), 2)
+        self.assertEqual(SpecificDateAvailability.objects.filter(event=self.kept).count(), 2)
+        self.assertEqual(get_event_summary(self.kept), (2, 4))
+
+    def test_archive_is_written_before_any_row_is_deleted(self):
+        def purge_after_checking_archive(event, *args):
+            models = self.archived_models(event)
+            self.assertEqual(models.count("scheduler.specificdateavailability"), 2)
+            self.assertEqual(models.count("scheduler.attendee"), 2)
+            self.assertEqual(SpecificDateAvailability.objects.filter(event=event).count(), 2)
+            return purge_event(event, *args)
+
+        purge_event = purge_events.purge_event
+        with mock.patch.object(purge_events, "purge_event", side_effect=purge_after_checking_archive) as purge:
+            self.purge()
+        purge.assert_called_once()
+        self.assertEqual(self.archived_models(self.expired)[0], "scheduler.event")
+
+    def test_archive_restores_the_event(self):
+        self.purge()
+        call_command("loaddata", str(get_archive_path(self.expired, self.archive_dir)), verbosity=0)
+        self.assertEqual(Event.objects.get(pk=self.expired.pk).attendees.count(), 2)
+        self.assertEqual(SpecificDateAvailability.objects.filter(event_id=self.expired.pk).count(), 2)
+
+    def test_dry_run_deletes_and_archives_nothing(self):
+        output = self.purge("--dry-run")
+        self.assertIn(str(self.expired.unique_id), output)
+        self.assertNotIn(str(self.kept.unique_id), output)
+        self.assertIn("1 events expired.", output)
+        self.assertTrue(Event.objects.filter(pk=self.expired.pk).exists())
+        self.assertEqual(SpecificDateAvailability.objects.filter(event=self.expired).count(), 2)
+        self.assertEqual(list(Path(self.archive_dir).iterdir()), [])
@@ -0,0 +1,38 @@
+from bisect import bisect_right
+from datetime import datetime, timedelta, timezone as dt_timezone
+import hashlib
+import json
+import pytz
+
+
+# Encoded once per process; the catalog only changes when pytz is upgraded.
+TIMEZONE_CATALOG = json.dumps(list(pytz.all_timezones), separators=(",", ":")).encode()
+TIMEZONE_CATALOG_HASH = hashlib.sha256(TIMEZONE_CATALOG).hexdigest()[:16]
+TIMEZONE_CATALOG_MAX_AGE = 60 * 60 * 24 * 365
+
+
+class OffsetTable:
+    """UTC offsets of one zone between two instants, precomputed from its transition table.
+
+    Converting a value is a bisect plus an addition, instead of a pytz ``localize`` or
+    ``astimezone`` round trip per value.
+    """
+
+    def __init__(self, zone, start, end):
+        transitions = getattr(zone, "_utc_transition_times", None)
+        if not transitions:
+            self.transitions = [datetime.min]
+            self.offsets = [zone.utcoffset(None) or timedelta(0)]
+        else:
+            start = start.astimezone(pytz.UTC).replace(tzinfo=None)
+            end = end.astimezone(pytz.UTC).replace(tzinfo=None)
+            first = max(bisect_right(transitions, start) - 1, 0)
+            last = max(bisect_right(transitions, end), first + 1)
+            self.transitions = transitions[first:last]
+            self.offsets = [utc_offset for utc_offset, _, _ in zone._transition_info[first:last]]
+        self.tzinfos = [dt_timezone(offset) for offset in self.offsets]
+
+    def to_local(self, value):
+        utc = value.astimezone(pytz.UTC).replace(tzinfo=None)
+        position = max(bisect_right(self.transitions, utc) - 1, 0)
+        return (utc + self.offsets[position]).replace(tzinfo=self.tzinfos[position])
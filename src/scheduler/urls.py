@@ -1,17 +1,52 @@
+from django.conf import settings
 from django.urls import path
+from scheduler.async_views import (
+    AsyncDayOfWeekAvailabilityView,
+    AsyncEventView,
+    AsyncSignInEventView,
+    AsyncSpecificDateAvailabilityView,
+)
 from scheduler.views import (
     EventView,
     EventOptionView,
     SignInEventView,
     SpecificDateAvailabilityView,
-    DayOfWeekAvailabilityView
+    DayOfWeekAvailabilityView,
+    EventHeatmapView,
+    AvailabilityBatchView,
+    TimezoneCatalogView,
+    event_stream,
+    BestTimesView,
+    AvailabilityExportView,
+    AvailableAttendeesView,
+    EventBulkCreateView,
+    EventAttendeesView,
+    EventAvailabilitiesView,
+    EventCalendarView,
 )
 
+if settings.ASYNC_VIEWS:
+    EventView = AsyncEventView
+    SignInEventView = AsyncSignInEventView
+    SpecificDateAvailabilityView = AsyncSpecificDateAvailabilityView
+    DayOfWeekAvailabilityView = AsyncDayOfWeekAvailabilityView
+
 urlpatterns = [
     path('create/', EventView.as_view(), name='create-event'),
+    path('bulk-create/', EventBulkCreateView.as_view(), name='bulk-create-event'),
     path('options/', EventOptionView.as_view(), name='event-options'),
+    path('timezones/<str:catalog_hash>/', TimezoneCatalogView.as_view(), name='timezone-catalog'),
     path('<uuid:unique_id>/signin/', SignInEventView.as_view(), name='sign-in'),
     path('<uuid:unique_id>/availability/', SpecificDateAvailabilityView.as_view(), name='attendee_availability'),
     path('<uuid:unique_id>/', EventView.as_view(), name='create-event'),
-    path('<uuid:unique_id>/dayofweekavailability/', DayOfWeekAvailabilityView.as_view(), name='day_of_week_availability')
+    path('<uuid:unique_id>/dayofweekavailability/', DayOfWeekAvailabilityView.as_view(), name='day_of_week_availability'),
+    path('<uuid:unique_id>/heatmap/', EventHeatmapView.as_view(), name='event-heatmap'),
+    path('<uuid:unique_id>/availability/batch/', AvailabilityBatchView.as_view(), name='availability-batch'),
+    path('<uuid:unique_id>/availability/export/', AvailabilityExportView.as_view(), name='availability-export'),
+    path('<uuid:unique_id>/attendees/', EventAttendeesView.as_view(), name='event-attendees'),
+    path('<uuid:unique_id>/availabilities/', EventAvailabilitiesView.as_view(), name='event-availabilities'),
+    path('<uuid:unique_id>/available/', AvailableAttendeesView.as_view(), name='available-attendees'),
+    path('<uuid:unique_id>/best-times/', BestTimesView.as_view(), name='best-times'),
+    path('<uuid:unique_id>/calendar.ics', EventCalendarView.as_view(), name='event-calendar'),
+    path('<uuid:unique_id>/stream/', event_stream, name='event-stream'),
 ]
\ No newline at end of file
@@ -1,3 +1,5 @@
+from django.http import Http404
+from asgiref.sync import sync_to_async
 from django.shortcuts import get_object_or_404
 from scheduler.models import (
     Event,
@@ -6,55 +8,249 @@ from scheduler.models import (
     DayOfWeekAvailability,
     EventDayOfWeek,
     EventTypeChoices,
+    DayOfWeekChoices,
+    AvailabilityBitmap,
+    EventSummary,
+    AttendeeSummary,
 )
-from rest_framework.authtoken.models import Token
+from scheduler.slots import (
+    SlotGrid,
+    SLOT_LENGTH,
+    interval_slot_count,
+    iter_bits,
+    pack_bits,
+    unpack_bits,
+    count_slots,
+    window_starts,
+)
+import heapq
+from scheduler.timezones import OffsetTable
+from scheduler.intervals import IntervalIndex, intersect, normalize, subtract, union
+from scheduler.ics import iter_calendar
+from django.db import transaction
+from django.utils.timezone import is_naive, make_aware, now
 from rest_framework_simplejwt.tokens import RefreshToken
-from collections import Counter
-from datetime import datetime
+from collections import defaultdict, namedtuple
+from django.db.models import Count, F
+from django.core.cache import cache
+from django.conf import settings
+from django.utils.http import parse_etags, quote_etag
+import hashlib
+import time as time_module
+from scheduler.event_cache import event_cache
+from scheduler.hashers import ahash_password, hash_password
+from django.contrib.auth.hashers import make_password
+from datetime import datetime, time, timedelta
 import pytz
+import base64
+import binascii
+from itertools import islice
+
 
+# Rows fetched per database round trip when walking an event's availabilities.
+AVAILABILITY_CHUNK_SIZE = 2000
 
 def get_event_by_unique_id(unique_id):
-    return  get_object_or_404(Event, unique_id=unique_id)
+    """Returns the event with its dates and days of week loaded, from the in-process cache when possible.
+
+    The version of a cached event is re-read at most every EVENT_VERSION_MAX_AGE seconds. Every
+    write, including a change to the event's dates or days made by another worker, bumps it, so a
+    cached event whose version moved is dropped and loaded again.
+    """
+    key = str(unique_id)
+    event = event_cache.get(key)
+    if event is not None and time_module.monotonic() - event.version_checked_at > settings.EVENT_VERSION_MAX_AGE:
+        version = Event.objects.filter(pk=event.pk).values_list("version", flat=True).first()
+        if version == event.version:
+            event.version_checked_at = time_module.monotonic()
+        else:
+            event_cache.invalidate(key)
+            event = None
+    if event is None:
+        event = get_object_or_404(Event.objects.prefetch_related("dates", "days_of_week"), unique_id=unique_id)
+        event.version_checked_at = time_module.monotonic()
+        event_cache.set(key, event)
+    return event
+
+async def aget_event_by_unique_id(unique_id):
+    """Like get_event_by_unique_id; a cached event with a fresh version never leaves the event loop."""
+    event = event_cache.get(str(unique_id))
+    if event is not None and time_module.monotonic() - event.version_checked_at <= settings.EVENT_VERSION_MAX_AGE:
+        return event
+    return await sync_to_async(get_event_by_unique_id)(unique_id)
+
+def bump_event_version(event):
+    """Invalidates every cached response of the event; call after any attendee or availability write."""
+    Event.objects.filter(pk=event.pk).update(version=F("version") + 1, last_activity=now())
+    expire_cached_event_version(event)
+
+def refresh_event_version(event):
+    """bump_event_version for maintenance writes, which must not count as activity on the event."""
+    Event.objects.filter(pk=event.pk).update(version=F("version") + 1)
+    expire_cached_event_version(event)
+
+def expire_cached_event_version(event):
+    cached_event = event_cache.peek(str(event.unique_id))
+    if cached_event is not None:
+        cached_event.version_checked_at = float("-inf")
+
+def get_cached_event_data(event, name, compute):
+    """Returns ``compute()`` cached under the current event version."""
+    key = f"event:{event.unique_id}:{event.version}:{name}"
+    data = cache.get(key)
+    if data is None:
+        data = compute()
+        cache.set(key, data, settings.EVENT_CACHE_TIMEOUT)
+    return data
+
+def get_event_etag(event, *variant):
+    digest = hashlib.md5(repr((event.version, *variant)).encode()).hexdigest()
+    return quote_etag(f"{event.unique_id.hex}-{digest}")
+
+def etag_matches(request, etag):
+    return etag in parse_etags(request.headers.get("If-None-Match", ""))
 
 def get_attendee_by_event_and_name(event: Event, name: str):
     return Attendee.objects.filter(event=event, name=name).first()
 
 def create_attendee(event: Event, name: str, password="", timezone="UTC"):
-    attendee =  Attendee.objects.create(event=event, name=name, timezone=timezone)
-    if password:
-        attendee.set_password(password)
-    else:
-        attendee.set_unusable_password()
-    attendee.save()
+    # hash before the insert so sign-up is a single write
+    encoded_password = hash_password(password) if password else make_password(None)
+    return insert_attendee(event, name, encoded_password, timezone)
+
+async def acreate_attendee(event: Event, name: str, password="", timezone="UTC"):
+    # the password is hashed on the pool; only the insert needs a thread
+    encoded_password = await ahash_password(password) if password else make_password(None)
+    return await sync_to_async(insert_attendee)(event, name, encoded_password, timezone)
+
+def insert_attendee(event, name, encoded_password, timezone):
+    attendee = Attendee.objects.create(event=event, name=name, timezone=timezone, password=encoded_password)
+    bump_event_version(event)
     return attendee
 
 
-def create_specific_date_availability(attendee: Attendee, start_time, end_time):
-    if end_time <= start_time:
-        raise ValueError("End time must be after start time.")
+def delete_availability(event, availability):
+    if isinstance(availability, SpecificDateAvailability):
+        slot_count = interval_slot_count(availability.start_time, availability.end_time)
+    else:
+        slot_count = 1
+    with transaction.atomic():
+        availability.delete()
+        adjust_availability_summary(event, availability.attendee_id, -slot_count, -1)
+        bump_event_version(event)
 
-    availability = SpecificDateAvailability.objects.create(
-        attendee=attendee,
-        start_time=start_time,
-        end_time=end_time
+def adjust_availability_summary(event, attendee_id, slot_delta, availability_delta):
+    """Adds ``slot_delta`` slots and ``availability_delta`` stored availabilities to the counters.
+
+    An attendee counts towards the event's attendees with availability while they have any
+    stored availability, even one shorter than a slot. Call inside the availability write's
+    transaction so the counters commit with it. The summary rows are created by the first
+    write; a missing row means nothing is available.
+    """
+    if not slot_delta and not availability_delta:
+        return
+    old_count = AttendeeSummary.objects.select_for_update().filter(
+        attendee_id=attendee_id
+    ).values_list("availability_count", flat=True).first()
+    if old_count is None:
+        old_count = 0
+        AttendeeSummary.objects.create(
+            attendee_id=attendee_id,
+            event=event,
+            slot_count=max(slot_delta, 0),
+            availability_count=max(availability_delta, 0),
+        )
+    else:
+        AttendeeSummary.objects.filter(attendee_id=attendee_id).update(
+            slot_count=F("slot_count") + slot_delta,
+            availability_count=F("availability_count") + availability_delta,
+        )
+    attendees_delta = (old_count + availability_delta > 0) - (old_count > 0)
+    updated = EventSummary.objects.filter(event=event).update(
+        attendees_with_availability=F("attendees_with_availability") + attendees_delta,
+        total_slots=F("total_slots") + slot_delta,
+    )
+    if not updated:
+        EventSummary.objects.create(
+            event=event, attendees_with_availability=max(attendees_delta, 0), total_slots=max(slot_delta, 0)
         )
 
-    return availability
+def get_attendee_availability_counts(event):
+    """Recounts the summaries from the availability rows: {attendee id: (slots, stored availabilities)}.
+
+    Attendees without any stored availability are left out.
+    """
+    if event.compact_storage:
+        rows = AvailabilityBitmap.objects.filter(event=event).values_list("attendee_id", "bits")
+        counts = {attendee_id: (unpack_bits(bits).bit_count(),) * 2 for attendee_id, bits in rows.iterator()}
+    elif event.event_type == EventTypeChoices.SPECIFIC_DATES:
+        counts = {}
+        rows = SpecificDateAvailability.objects.filter(event=event).values_list("attendee_id", "start_time", "end_time")
+        for attendee_id, start_time, end_time in rows.iterator(chunk_size=AVAILABILITY_CHUNK_SIZE):
+            slots, availabilities = counts.get(attendee_id, (0, 0))
+            counts[attendee_id] = (slots + interval_slot_count(start_time, end_time), availabilities + 1)
+    else:
+        counts = {
+            attendee_id: (count, count)
+            for attendee_id, count in DayOfWeekAvailability.objects.filter(event=event).values("attendee_id").annotate(
+                count=Count("id")
+            ).values_list("attendee_id", "count")
+        }
+    return {attendee_id: count for attendee_id, count in counts.items() if count[1]}
+
+def rebuild_event_summary(event, dry_run=False):
+    """Rewrites the event's summary counters from its availability rows if they have drifted.
+
+    Returns the stored and rebuilt (attendees with availability, total slots), and whether
+    any counter, per-attendee ones included, had drifted.
+    """
+    with transaction.atomic():
+        counts = get_attendee_availability_counts(event)
+        rebuilt = (len(counts), sum(slots for slots, _ in counts.values()))
+        stored = get_event_summary(event)
+        stored_counts = {
+            attendee_id: (slots, availabilities)
+            for attendee_id, slots, availabilities in AttendeeSummary.objects.filter(event=event).exclude(
+                slot_count=0, availability_count=0
+            ).values_list("attendee_id", "slot_count", "availability_count")
+        }
+        drifted = stored_counts != counts or stored != rebuilt
+        if drifted and not dry_run:
+            AttendeeSummary.objects.filter(event=event).delete()
+            AttendeeSummary.objects.bulk_create([
+                AttendeeSummary(attendee_id=attendee_id, event=event, slot_count=slots, availability_count=availabilities)
+                for attendee_id, (slots, availabilities) in counts.items()
+            ])
+            EventSummary.objects.update_or_create(
+                event=event, defaults={"attendees_with_availability": rebuilt[0], "total_slots": rebuilt[1]}
+            )
+            refresh_event_version(event)
+    return stored, rebuilt, drifted
+
+def get_event_summary(event):
+    """Returns (attendees with availability, total slots) with a single-row lookup."""
+    summary = EventSummary.objects.filter(event=event).values_list(
+        "attendees_with_availability", "total_slots"
+    ).first()
+    return summary or (0, 0)
 
 def get_existing_specific_date_availability(attendee: Attendee, start_time, end_time):
+    """Returns the stored interval that covers [start_time, end_time), if any."""
     return SpecificDateAvailability.objects.filter(
         attendee=attendee,
-        start_time=start_time,
-        end_time=end_time
+        start_time__lte=start_time,
+        end_time__gte=end_time
         ).first()
 
+def ensure_aware(value):
+    return make_aware(value) if is_naive(value) else value
+
 def get_existing_days_of_week_availability(attendee: Attendee, day, start_hour):
     return DayOfWeekAvailability.objects.filter(
         attendee=attendee,
         start_hour=start_hour,
         event_day_of_week__day=day,
-        event_day_of_week__event=attendee.event,
+        event_id=attendee.event_id,
         ).first()
 
 def get_jwt_token(attendee):
@@ -71,69 +267,691 @@ def get_jwt_token(attendee):
 
 def get_attendee_availabilitiy_list(attendee):
     event = attendee.event
-    if event.event_type == EventTypeChoices.SPECIFIC_DATES:
-        attendee_availabilities = SpecificDateAvailability.objects.filter(attendee=attendee)
-        return [{"id": avail.id, "start_time": avail.start_time, "end_time": avail.end_time}
-                for avail in attendee_availabilities]
-    elif event.event_type == EventTypeChoices.DAYS_OF_WEEK:
-        attendee_availabilities = DayOfWeekAvailability.objects.filter(attendee=attendee).prefetch_related('event_day_of_week')
-        return [{"id": avail.id, "day": avail.event_day_of_week.get_day_label(), "start_time": avail.get_formated_start_hour()}
-                for avail in attendee_availabilities]
-    else:
+    if event.compact_storage:
+        grid = SlotGrid(event)
+        return get_bitmap_availabilities_list(grid, get_attendee_bitmap(attendee))
+    return format_attendee_availability_rows(event, get_attendee_availability_rows(attendee))
+
+def get_attendee_availability_rows(attendee):
+    if attendee.event.event_type == EventTypeChoices.SPECIFIC_DATES:
+        return SpecificDateAvailability.objects.filter(attendee=attendee).values_list("id", "start_time", "end_time")
+    elif attendee.event.event_type == EventTypeChoices.DAYS_OF_WEEK:
+        return DayOfWeekAvailability.objects.filter(attendee=attendee).values_list(
+            "id", "event_day_of_week__day", "start_hour"
+        )
+    return None
+
+def format_attendee_availability_rows(event, rows):
+    if rows is None:
         return []
+    if event.event_type == EventTypeChoices.SPECIFIC_DATES:
+        return [{"id": avail_id, "start_time": start_time, "end_time": end_time} for avail_id, start_time, end_time in rows]
+    return [
+        {"id": avail_id, "day": DayOfWeekChoices(day).label, "start_time": f"{start_hour:02d}:00"}
+        for avail_id, day, start_hour in rows
+    ]
 
 
 
 def get_event_availabilities_list(event):
-    if event.event_type == EventTypeChoices.SPECIFIC_DATES:
-        all_event_availabilities =  SpecificDateAvailability.objects.filter(attendee__event=event)
-        return [
-                {"attendee": avail.attendee.name,
-                "id": avail.id, "start_time": avail.start_time,
-                "end_time": avail.end_time}
-                for avail in all_event_availabilities
-            ]
-    elif event.event_type == EventTypeChoices.DAYS_OF_WEEK:
-        all_event_availabilities = DayOfWeekAvailability.objects.filter(attendee__event=event).prefetch_related('event_day_of_week')
-        return [
-                {"attendee": avail.attendee.name,
-                "id": avail.id, "day": avail.event_day_of_week.get_day_label(),
-                "start_time": avail.get_formated_start_hour()}
-                for avail in all_event_availabilities
-            ]
+    return list(iter_event_availabilities(event))
+
+def iter_event_availabilities(event, chunk_size=AVAILABILITY_CHUNK_SIZE):
+    """Yields every availability of the event, reading the database ``chunk_size`` rows at a time."""
+    rows = get_event_availability_rows(event).iterator(chunk_size=chunk_size)
+    return format_availability_rows(event, rows)
+
+
+def get_event_availability_rows(event):
+    """The rows behind the event's availabilities as a values() queryset, ordered by id for keyset pagination.
+
+    For compact storage there is one row (bitmap) per attendee.
+    """
+    if event.compact_storage:
+        rows = AvailabilityBitmap.objects.filter(event=event).values("id", "attendee__name", "bits")
+    elif event.event_type == EventTypeChoices.SPECIFIC_DATES:
+        rows = SpecificDateAvailability.objects.filter(event=event).values("id", "attendee__name", "start_time", "end_time")
     else:
-        return []
+        rows = DayOfWeekAvailability.objects.filter(event=event).values(
+            "id", "attendee__name", "event_day_of_week_id", "start_hour"
+        )
+    return rows.order_by("id")
 
 
-def get_attendees_availability_count(event):
-    """Returns the unique count of attendees with at least one Availability for the event."""
-    if event.event_type == EventTypeChoices.SPECIFIC_DATES:
-        return SpecificDateAvailability.objects.filter(
-        attendee__event=event
-    ).values('attendee').distinct().count()
-    elif event.event_type == EventTypeChoices.DAYS_OF_WEEK:
-        return DayOfWeekAvailability.objects.filter(
-        attendee__event=event
-    ).values('attendee').distinct().count()
+def format_availability_rows(event, rows):
+    """Yields the all_event_availabilities dicts of rows from get_event_availability_rows."""
+    if event.compact_storage:
+        grid = SlotGrid(event)
+        for row in rows:
+            for avail in get_bitmap_availabilities_list(grid, unpack_bits(row["bits"])):
+                yield {"attendee": row["attendee__name"], **avail}
+    elif event.event_type == EventTypeChoices.SPECIFIC_DATES:
+        for row in rows:
+            yield {"attendee": row["attendee__name"], "id": row["id"], "start_time": row["start_time"], "end_time": row["end_time"]}
     else:
-        return []
+        day_labels = {event_day.id: event_day.get_day_label() for event_day in event.days_of_week.all()}
+        for row in rows:
+            yield {
+                "attendee": row["attendee__name"], "id": row["id"],
+                "day": day_labels[row["event_day_of_week_id"]], "start_time": f"{row['start_hour']:02d}:00",
+            }
 
 
+def get_attendees_availability_count(event):
+    """Returns the unique count of attendees with at least one Availability for the event."""
+    return get_event_summary(event)[0]
 
 def create_day_of_week_availability(event, attendee, day_number, start_hour):
     event_day_of_week = EventDayOfWeek.objects.filter(event=event, day=day_number).first()
-    return DayOfWeekAvailability.objects.create(
-        attendee=attendee,
-        event_day_of_week=event_day_of_week,
-        start_hour=start_hour
-    )
+    with transaction.atomic():
+        availability = DayOfWeekAvailability.objects.create(
+            attendee=attendee,
+            event=event,
+            event_day_of_week=event_day_of_week,
+            start_hour=start_hour
+        )
+        adjust_availability_summary(event, attendee.id, 1, 1)
+        bump_event_version(event)
+    return availability
 
 def get_existing_day_availability(attendee, day_number, start_hour):
-    event_day_of_week = EventDayOfWeek.objects.filter(event=attendee.event, day=day_number).last()
-    return DayOfWeekAvailability.objects.filter(
+    # the day of week comes along for the response, in the same query
+    return DayOfWeekAvailability.objects.select_related("event_day_of_week").filter(
         attendee=attendee,
-        event_day_of_week=event_day_of_week,
+        event_day_of_week__event_id=attendee.event_id,
+        event_day_of_week__day=day_number,
         start_hour=start_hour
     ).first()
 
+def get_attendee_bitmap(attendee):
+    bitmap = AvailabilityBitmap.objects.filter(attendee=attendee).values_list("bits", flat=True).first()
+    return unpack_bits(bitmap)
+
+def get_event_bitmaps(event):
+    """Returns (attendee name, bits) for every attendee with a bitmap, in one query."""
+    return [(name, unpack_bits(bits)) for name, bits in get_event_bitmap_rows(event)]
+
+def get_event_bitmap_rows(event):
+    return AvailabilityBitmap.objects.filter(event=event).values_list("attendee__name", "bits")
+
+def update_attendee_bitmap(attendee, grid, add=0, remove=0):
+    """Sets the ``add`` bits and clears the ``remove`` bits with a single row write.
+
+    Returns the (old, new) bitmaps so callers can tell what actually changed.
+    """
+    with transaction.atomic():
+        bitmap = AvailabilityBitmap.objects.select_for_update().filter(attendee=attendee).first()
+        old_bits = unpack_bits(bitmap.bits) if bitmap else 0
+        new_bits = ((old_bits | add) & ~remove) & grid.full_mask
+        if new_bits != old_bits:
+            if bitmap is None:
+                bitmap = AvailabilityBitmap(attendee=attendee, event_id=attendee.event_id)
+            bitmap.bits = pack_bits(new_bits, grid.size)
+            bitmap.save()
+            delta = new_bits.bit_count() - old_bits.bit_count()
+            adjust_availability_summary(grid.event, attendee.id, delta, delta)
+            bump_event_version(grid.event)
+    return old_bits, new_bits
+
+def get_bitmap_availabilities_list(grid, bits):
+    """Expands a bitmap into the same dicts the row based lists return; ``id`` is the slot index."""
+    if grid.event.event_type == EventTypeChoices.SPECIFIC_DATES:
+        availabilities = []
+        for index in iter_bits(bits):
+            start_time, end_time = grid.slot_datetimes(index)
+            availabilities.append({"id": index, "start_time": start_time, "end_time": end_time})
+        return availabilities
+    availabilities = []
+    for index in iter_bits(bits):
+        day, hour = grid.slot(index)
+        availabilities.append({"id": index, "day": grid.day_label(day), "start_time": f"{hour:02d}:00"})
+    return availabilities
+
+def get_bitmap_interval(grid, bits, requested):
+    """The run of consecutive ``bits`` slots around the ``requested`` ones, shaped like a stored interval.
+
+    ``id`` is the index of the run's first slot.
+    """
+    first = (requested & -requested).bit_length() - 1
+    last = requested.bit_length() - 1
+    start_time, end_time = grid.slot_datetimes(first)[0], grid.slot_datetimes(last)[1]
+    while first > 0 and bits >> (first - 1) & 1 and grid.slot_datetimes(first - 1)[1] == start_time:
+        first -= 1
+        start_time = grid.slot_datetimes(first)[0]
+    while last < grid.size - 1 and bits >> (last + 1) & 1 and grid.slot_datetimes(last + 1)[0] == end_time:
+        last += 1
+        end_time = grid.slot_datetimes(last)[1]
+    return {"id": first, "start_time": start_time, "end_time": end_time}
+
+def get_specific_date_bits(grid, start_time, end_time):
+    """Returns the bitmap of grid slots covering [start_time, end_time), or None if it is off the grid."""
+    bits = 0
+    slot_start = start_time
+    while slot_start < end_time:
+        index = grid.index_for_datetime(slot_start)
+        if index is None:
+            return None
+        bits |= 1 << index
+        slot_start += SLOT_LENGTH
+    return bits
+
+def get_interval_bits(grid, start_time, end_time):
+    """Returns the bitmap of grid slots lying entirely inside [start_time, end_time).
+
+    Unlike get_specific_date_bits this accepts any interval, such as a coalesced multi-hour
+    row; the parts that do not fill a grid slot are ignored.
+    """
+    if not grid.size:
+        return 0
+    start_time = max(ensure_aware(start_time), grid.slot_datetimes(0)[0])
+    end_time = min(ensure_aware(end_time), grid.slot_datetimes(grid.size - 1)[1])
+    local = start_time.astimezone(grid.timezone)
+    slot_start = local.replace(minute=0, second=0, microsecond=0)
+    if slot_start < local:
+        slot_start += SLOT_LENGTH
+    bits = 0
+    while slot_start + SLOT_LENGTH <= end_time:
+        index = grid.index_for_datetime(slot_start)
+        if index is not None:
+            bits |= 1 << index
+        slot_start += SLOT_LENGTH
+    return bits
+
+def get_event_day_of_week(event, day_number):
+    return next(event_day for event_day in event.days_of_week.all() if event_day.day == day_number)
+
+def get_day_of_week_bits(grid, day_number, start_hour):
+    index = grid.index(day_number, start_hour)
+    if index is None:
+        return None
+    return 1 << index
+
+def get_event_slot_counts(event, grid):
+    """Returns the number of available attendees for every slot of the grid."""
+    if event.compact_storage:
+        return count_slots((bits for _, bits in get_event_bitmaps(event)), grid.size)
+    return count_slot_groups(event, grid, get_slot_groups(event))
+
+def get_slot_groups(event):
+    """Row availabilities grouped by slot, with the number of attendees in each."""
+    if event.event_type == EventTypeChoices.SPECIFIC_DATES:
+        return SpecificDateAvailability.objects.filter(
+            event=event
+        ).values('start_time', 'end_time').annotate(count=Count('id'))
+    return DayOfWeekAvailability.objects.filter(
+        event=event
+    ).values('event_day_of_week', 'start_hour').annotate(count=Count('id'))
+
+def count_slot_groups(event, grid, slot_groups):
+    counts = [0] * grid.size
+    if event.event_type == EventTypeChoices.SPECIFIC_DATES:
+        for group in slot_groups:
+            bits = get_interval_bits(grid, group['start_time'], group['end_time'])
+            for index in iter_bits(bits):
+                counts[index] += group['count']
+    elif event.event_type == EventTypeChoices.DAYS_OF_WEEK:
+        event_days = {event_day.id: event_day.day for event_day in event.days_of_week.all()}
+        for group in slot_groups:
+            index = grid.index(event_days.get(group['event_day_of_week']), group['start_hour'])
+            if index is not None:
+                counts[index] += group['count']
+    return counts
+
+def get_event_heatmap(event):
+    grid = SlotGrid(event)
+    return format_heatmap(grid, get_event_slot_counts(event, grid))
+
+def format_heatmap(grid, counts):
+    width = len(grid.hours)
+    return {
+        "days": [grid.day_label(day) for day in grid.days],
+        "hours": [f"{hour:02d}:00" for hour in grid.hours],
+        "counts": [counts[position:position + width] for position in range(0, grid.size, width)],
+        "max_count": max(counts, default=0),
+    }
+
+
+DAY_NUMBERS = {label: value for value, label in DayOfWeekChoices.choices}
+
+def parse_specific_date_slot(data):
+    """Returns (start_time, end_time) from a request item, raising ValueError with a client message."""
+    start_time_str = data.get("start_time")
+    end_time_str = data.get("end_time")
+    if not start_time_str or not end_time_str:
+        raise ValueError("Start time and end time are required.")
+    try:
+        start_time = datetime.fromisoformat(start_time_str)
+        end_time = datetime.fromisoformat(end_time_str)
+    except (TypeError, ValueError):
+        raise ValueError("Invalid date format. Use ISO 8601 format (YYYY-MM-DDTHH:MM:SS).")
+    start_time, end_time = ensure_aware(start_time), ensure_aware(end_time)
+    if end_time <= start_time:
+        raise ValueError("End time must be after start time.")
+    return start_time, end_time
+
+def parse_day_of_week_slot(data):
+    """Returns (day_number, start_hour) from a request item, raising ValueError with a client message."""
+    day_name = data.get("day")
+    start_time_str = data.get("start_time")
+    if not day_name or not start_time_str:
+        raise ValueError("Day and start time are required.")
+    day_number = DAY_NUMBERS.get(day_name)
+    if day_number is None:
+        raise ValueError("Invalid day name. Use Persian days (e.g., 'جمعه').")
+    try:
+        start_hour = int(str(start_time_str).split(":")[0])
+    except ValueError:
+        raise ValueError("Invalid start time format. Use 'HH:MM'.")
+    if not (0 <= start_hour <= 23):
+        raise ValueError("Start hour must be between 0 and 23.")
+    return day_number, start_hour
+
+def format_specific_date_slot(start_time, end_time):
+    return {"start_time": start_time, "end_time": end_time}
+
+def format_day_of_week_slot(day_number, start_hour):
+    return {"day": DayOfWeekChoices(day_number).label, "start_time": f"{start_hour:02d}:00"}
+
+# What a batch write changed: the created and deleted availabilities, as published, and
+# the number of whole slots gained and lost.
+AvailabilityChanges = namedtuple("AvailabilityChanges", "created deleted created_slots deleted_slots")
+
+def count_interval_slots(intervals):
+    return sum(interval_slot_count(start_time, end_time) for start_time, end_time in intervals)
+
+def get_specific_date_changes(before, after, added, removed):
+    """AvailabilityChanges of a rewrite of the stored intervals ``before`` into ``after``.
+
+    Slots are counted on the stored rows, the way the summary counters count them, not on
+    the ``added`` and ``removed`` pieces: trimming or splitting a row by less than a slot
+    still loses a slot once a leftover is shorter than one. The slots of the time kept by
+    both are subtracted from each side, so created minus deleted is the counters' change.
+    """
+    kept = count_interval_slots(intersect(normalize(before), normalize(after)))
+    return AvailabilityChanges(
+        [format_specific_date_slot(start_time, end_time) for start_time, end_time in added],
+        [format_specific_date_slot(start_time, end_time) for start_time, end_time in removed],
+        count_interval_slots(after) - kept,
+        count_interval_slots(before) - kept,
+    )
+
+def adjust_specific_date_summary(attendee, created_rows, deleted_rows):
+    """Moves the summary counters by the rows written and the {(start_time, end_time): id} deleted.
+
+    Slots are counted per stored row, the way rebuild_event_summary recounts them: a
+    removal shorter than a slot can still cost a slot once it splits a row.
+    """
+    adjust_availability_summary(
+        attendee.event,
+        attendee.id,
+        sum(interval_slot_count(row.start_time, row.end_time) for row in created_rows)
+        - sum(interval_slot_count(start_time, end_time) for start_time, end_time in deleted_rows),
+        len(created_rows) - len(deleted_rows),
+    )
+
+def apply_specific_date_operations(attendee, slots):
+    """Applies {(start_time, end_time): available} for row storage; see apply_specific_date_intervals."""
+    return apply_specific_date_intervals(attendee, slots.items())
+
+def apply_specific_date_intervals(attendee, changes):
+    """Applies ``[((start_time, end_time), available), ...]`` in order to the attendee's intervals.
+
+    Stored intervals stay coalesced: an addition merges with every interval it overlaps or
+    touches and a removal trims or splits the intervals it hits. Only the rows touching the
+    changed span are read and rewritten, in one transaction. Returns AvailabilityChanges
+    with the pieces of time that were actually added and removed.
+    """
+    changes = list(changes)
+    if not changes:
+        return AvailabilityChanges([], [], 0, 0)
+    span_start = min(start_time for (start_time, _), _ in changes)
+    span_end = max(end_time for (_, end_time), _ in changes)
+
+    with transaction.atomic():
+        rows = {
+            (start_time, end_time): avail_id
+            for avail_id, start_time, end_time in SpecificDateAvailability.objects.filter(
+                attendee=attendee, start_time__lte=span_end, end_time__gte=span_start
+            ).values_list("id", "start_time", "end_time")
+        }
+        coverage = normalize(rows)
+        added = []
+        removed = []
+        for interval, available in changes:
+            if available:
+                added += subtract([interval], coverage)
+                coverage = union(coverage, [interval])
+            else:
+                removed += intersect([interval], coverage)
+                coverage = subtract(coverage, [interval])
+
+        kept = set(coverage)
+        deleted_rows = {interval: avail_id for interval, avail_id in rows.items() if interval not in kept}
+        to_create = [
+            SpecificDateAvailability(attendee=attendee, event_id=attendee.event_id, start_time=start_time, end_time=end_time)
+            for start_time, end_time in coverage if (start_time, end_time) not in rows
+        ]
+        if deleted_rows:
+            SpecificDateAvailability.objects.filter(id__in=deleted_rows.values()).delete()
+        SpecificDateAvailability.objects.bulk_create(to_create)
+        if to_create or deleted_rows:
+            adjust_specific_date_summary(attendee, to_create, deleted_rows)
+            bump_event_version(attendee.event)
+    return get_specific_date_changes(rows, coverage, added, removed)
+
+def apply_day_of_week_operations(event, attendee, slots):
+    """Applies {(day_number, start_hour): available} for row storage with one bulk insert and one delete.
+
+    Returns the AvailabilityChanges.
+    """
+    event_days = {event_day.day: event_day.id for event_day in event.days_of_week.all()}
+    existing = get_day_of_week_availability_ids(event, attendee)
+
+    to_create = []
+    to_delete = []
+    created_slots = []
+    deleted_slots = []
+    for (day_number, start_hour), available in slots.items():
+        avail_id = existing.get((day_number, start_hour))
+        if available and avail_id is None:
+            to_create.append(DayOfWeekAvailability(
+                attendee=attendee,
+                event=event,
+                event_day_of_week_id=event_days[day_number],
+                start_hour=start_hour,
+            ))
+            created_slots.append(format_day_of_week_slot(day_number, start_hour))
+        elif not available and avail_id is not None:
+            to_delete.append(avail_id)
+            deleted_slots.append(format_day_of_week_slot(day_number, start_hour))
+
+    with transaction.atomic():
+        DayOfWeekAvailability.objects.bulk_create(to_create)
+        DayOfWeekAvailability.objects.filter(id__in=to_delete).delete()
+        if to_create or to_delete:
+            delta = len(to_create) - len(to_delete)
+            adjust_availability_summary(event, attendee.id, delta, delta)
+            bump_event_version(event)
+    return AvailabilityChanges(created_slots, deleted_slots, len(created_slots), len(deleted_slots))
+
+def get_day_of_week_availability_ids(event, attendee):
+    """Returns {(day_number, start_hour): availability id} for the attendee's stored slots."""
+    return {
+        (day, start_hour): avail_id
+        for avail_id, day, start_hour in DayOfWeekAvailability.objects.filter(
+            attendee=attendee, event=event
+        ).values_list("id", "event_day_of_week__day", "start_hour")
+    }
+
+def get_specific_date_replacement(attendee, intervals):
+    """Diffs the attendee's stored intervals against the desired ``intervals`` with one read.
+
+    Returns the stored {(start_time, end_time): availability id}, the desired intervals
+    normalized, and the pieces of time the replacement would add and remove.
+    """
+    rows = {
+        (start_time, end_time): avail_id
+        for avail_id, start_time, end_time in SpecificDateAvailability.objects.filter(
+            attendee=attendee
+        ).values_list("id", "start_time", "end_time")
+    }
+    desired = normalize(intervals)
+    coverage = normalize(rows)
+    return rows, desired, subtract(desired, coverage), subtract(coverage, desired)
+
+def replace_specific_date_intervals(attendee, intervals):
+    """Makes the attendee's stored intervals cover exactly ``intervals``.
+
+    Rows that already match are left alone; only rows for changed intervals are deleted
+    and inserted, in one transaction. Returns AvailabilityChanges with the pieces of time
+    added and removed, which are empty when the stored availability already matches.
+    """
+    with transaction.atomic():
+        rows, desired, added, removed = get_specific_date_replacement(attendee, intervals)
+        if added or removed:
+            kept = set(desired)
+            deleted_rows = {interval: avail_id for interval, avail_id in rows.items() if interval not in kept}
+            to_create = [
+                SpecificDateAvailability(attendee=attendee, event_id=attendee.event_id, start_time=start_time, end_time=end_time)
+                for start_time, end_time in desired if (start_time, end_time) not in rows
+            ]
+            SpecificDateAvailability.objects.filter(id__in=deleted_rows.values()).delete()
+            SpecificDateAvailability.objects.bulk_create(to_create)
+            adjust_specific_date_summary(attendee, to_create, deleted_rows)
+            bump_event_version(attendee.event)
+    if not added and not removed:
+        return AvailabilityChanges([], [], 0, 0)
+    return get_specific_date_changes(rows, desired, added, removed)
+
+def get_day_of_week_replacement(event, attendee, slots):
+    """Returns {(day_number, start_hour): available} for the slots whose state must change
+    so that exactly ``slots`` are stored; empty when nothing differs."""
+    existing = get_day_of_week_availability_ids(event, attendee).keys()
+    changes = dict.fromkeys(existing - slots, False)
+    changes.update(dict.fromkeys(slots - existing, True))
+    return changes
+
+def replace_day_of_week_slots(event, attendee, slots):
+    """Makes the attendee's stored slots exactly ``slots``; returns the AvailabilityChanges."""
+    with transaction.atomic():
+        changes = get_day_of_week_replacement(event, attendee, slots)
+        if not changes:
+            return AvailabilityChanges([], [], 0, 0)
+        return apply_day_of_week_operations(event, attendee, changes)
+
+def replace_attendee_bitmap(attendee, grid, bits):
+    """Makes the attendee's bitmap exactly ``bits``; returns the AvailabilityChanges."""
+    return apply_bitmap_operations(attendee, grid, bits, grid.full_mask & ~bits)
+
+def apply_bitmap_operations(attendee, grid, add, remove):
+    """Returns the AvailabilityChanges, like the row based variants."""
+    old_bits, new_bits = update_attendee_bitmap(attendee, grid, add=add, remove=remove)
+    created = new_bits & ~old_bits
+    deleted = old_bits & ~new_bits
+    return AvailabilityChanges(
+        get_bitmap_availabilities_list(grid, created),
+        get_bitmap_availabilities_list(grid, deleted),
+        created.bit_count(),
+        deleted.bit_count(),
+    )
+
+def get_event_attendee_bitmaps(event, grid):
+    """Returns (attendee name, bits) for every attendee with availability, whatever the storage mode."""
+    if event.compact_storage:
+        return [(name, bits) for name, bits in get_event_bitmaps(event) if bits]
+    return build_attendee_bitmaps(event, grid, get_attendee_slot_rows(event))
+
+def get_attendee_slot_rows(event):
+    if event.event_type == EventTypeChoices.SPECIFIC_DATES:
+        return SpecificDateAvailability.objects.filter(
+            event=event
+        ).values_list('attendee__name', 'start_time', 'end_time')
+    return DayOfWeekAvailability.objects.filter(
+        event=event
+    ).values_list('attendee__name', 'event_day_of_week__day', 'start_hour')
+
+def build_attendee_bitmaps(event, grid, rows):
+    bitmaps = {}
+    if event.event_type == EventTypeChoices.SPECIFIC_DATES:
+        slot_bits = {}
+        for name, start_time, end_time in rows:
+            if (start_time, end_time) not in slot_bits:
+                slot_bits[start_time, end_time] = get_interval_bits(grid, start_time, end_time)
+            bitmaps[name] = bitmaps.get(name, 0) | slot_bits[start_time, end_time]
+    elif event.event_type == EventTypeChoices.DAYS_OF_WEEK:
+        for name, day, start_hour in rows:
+            bitmaps[name] = bitmaps.get(name, 0) | (get_day_of_week_bits(grid, day, start_hour) or 0)
+    return list(bitmaps.items())
+
+def encode_bits(grid, bits):
+    return base64.b64encode(pack_bits(bits, grid.size)).decode()
+
+def decode_bits(grid, value):
+    """Parses a base64 bitmap over the grid, raising ValueError with a client message."""
+    if not isinstance(value, str):
+        raise ValueError("Bitmaps must be base64 strings.")
+    try:
+        bits = unpack_bits(base64.b64decode(value, validate=True))
+    except binascii.Error:
+        raise ValueError("Bitmaps must be base64 strings.")
+    if bits >> grid.size:
+        raise ValueError("Bitmap has slots outside the event time grid.")
+    return bits
+
+def get_compact_availability(event):
+    """Columnar availability: the grid once, then one base64 bitmap per attendee.
+
+    Bit ``i`` of a bitmap (little-endian bytes) is slot ``i`` of the grid, day by day and
+    hour by hour in the event timezone. Row availabilities that do not fall on the grid are left out.
+    """
+    grid = SlotGrid(event)
+    return format_compact_availability(grid, get_event_attendee_bitmaps(event, grid))
+
+def format_compact_availability(grid, bitmaps):
+    return {
+        "grid": {
+            "days": [grid.day_label(day) for day in grid.days],
+            "hours": [f"{hour:02d}:00" for hour in grid.hours],
+            "timezone": grid.event.timezone,
+            "slot_minutes": int(SLOT_LENGTH.total_seconds() // 60),
+        },
+        "attendees": [name for name, _ in bitmaps],
+        "bitmaps": [encode_bits(grid, bits) for _, bits in bitmaps],
+    }
+
+def get_bitmap_slots(grid, bits):
+    """Row storage slot keys of the set bits: (start_time, end_time) or (day number, start hour)."""
+    if grid.event.event_type == EventTypeChoices.SPECIFIC_DATES:
+        return [grid.slot_datetimes(index) for index in iter_bits(bits)]
+    return [grid.slot(index) for index in iter_bits(bits)]
+
+def get_event_interval_index(event):
+    """IntervalIndex over every attendee's availability of a specific dates event, in POSIX seconds."""
+    owner_intervals = defaultdict(list)
+    if event.compact_storage:
+        grid = SlotGrid(event)
+        for name, bits in get_event_bitmaps(event):
+            for index in iter_bits(bits):
+                start_time, end_time = grid.slot_datetimes(index)
+                owner_intervals[name].append((start_time.timestamp(), end_time.timestamp()))
+    else:
+        rows = SpecificDateAvailability.objects.filter(event=event).values_list("attendee__name", "start_time", "end_time")
+        for name, start_time, end_time in rows.iterator(chunk_size=AVAILABILITY_CHUNK_SIZE):
+            owner_intervals[name].append((start_time.timestamp(), end_time.timestamp()))
+    return IntervalIndex.from_owners(owner_intervals)
+
+def get_available_attendees(event, start_time, end_time):
+    """Names of the attendees available for all of [start_time, end_time).
+
+    The index lives on the in-process cached event and is rebuilt when the event version moves.
+    """
+    cached = getattr(event, "interval_index", None)
+    if cached is None or cached[0] != event.version:
+        cached = (event.version, get_event_interval_index(event))
+        event.interval_index = cached
+    return sorted(cached[1].covering(ensure_aware(start_time).timestamp(), ensure_aware(end_time).timestamp()))
+
+def get_best_times(event, length, limit):
+    """Returns the ``limit`` windows of ``length`` slots with the most fully available attendees."""
+    grid = SlotGrid(event)
+    best_times = []
+    for index, count, attendees in get_best_windows(grid, length, limit):
+        day, hour = grid.slot(index)
+        best_time = {
+            "day": grid.day_label(day),
+            "start_time": f"{hour:02d}:00",
+            "end_time": f"{(hour + length) % 24:02d}:00",
+            "count": count,
+            "attendees": attendees,
+        }
+        if event.event_type == EventTypeChoices.SPECIFIC_DATES:
+            best_time["start_time"] = grid.slot_datetimes(index)[0]
+            best_time["end_time"] = grid.slot_datetimes(index + length - 1)[1]
+        best_times.append(best_time)
+    return best_times
+
+def get_best_windows(grid, length, limit):
+    """Returns (first slot index, count, attendee names) of the best windows, best first.
+
+    Ties go to the earliest window. Each attendee's bitmap is reduced to the window starts they
+    fully cover and the reduced bitmaps are counted together, so the cost stays linear in the grid.
+    """
+    valid_starts = grid.window_start_mask(length)
+    windows = [
+        (name, window_starts(bits, length) & valid_starts)
+        for name, bits in get_event_attendee_bitmaps(grid.event, grid)
+    ]
+    counts = count_slots((bits for _, bits in windows), grid.size)
+    best = heapq.nsmallest(
+        limit,
+        (index for index in range(grid.size) if counts[index]),
+        key=lambda index: (-counts[index], index),
+    )
+    return [
+        (index, counts[index], [name for name, bits in windows if bits >> index & 1])
+        for index in best
+    ]
+
+def get_week_start(event):
+    """Monday of the current week in the event timezone, where weekly calendar entries start."""
+    today = datetime.now(pytz.timezone(event.timezone)).date()
+    return today - timedelta(days=today.weekday())
+
+def get_calendar_window(grid, index, length, week_start, description):
+    """The iCalendar window of ``length`` slots from slot ``index``; weekly on days of week events."""
+    if grid.event.event_type == EventTypeChoices.SPECIFIC_DATES:
+        start = grid.slot_datetimes(index)[0]
+        return {"start": start, "end": grid.slot_datetimes(index + length - 1)[1], "description": description}
+    day, hour = grid.slot(index)
+    return get_weekly_calendar_window(grid.event, day, hour, length, week_start, description)
+
+def get_weekly_calendar_window(event, day_number, start_hour, length, week_start, description):
+    zone = pytz.timezone(event.timezone)
+    start = zone.localize(datetime.combine(week_start + timedelta(days=day_number), time(start_hour)))
+    end = zone.normalize(start + length * SLOT_LENGTH)
+    return {"start": start, "end": end, "weekly": True, "description": description}
+
+def render_event_calendar(event, windows):
+    return b"".join(iter_calendar(event, windows, datetime.now(pytz.UTC)))
+
+def iter_projected_availabilities(event, availabilities, zone_name, chunk_size=AVAILABILITY_CHUNK_SIZE):
+    """Lazy ``project_availabilities`` over an iterable, projecting ``chunk_size`` items at a time."""
+    availabilities = iter(availabilities)
+    while chunk := list(islice(availabilities, chunk_size)):
+        yield from project_availabilities(event, chunk, zone_name)
+
+def project_availabilities(event, availabilities, zone_name):
+    """Re-expresses availabilities in ``zone_name``.
+
+    Specific date slots go through one offset table covering their time range. Days-of-week
+    hour slots are shifted through the current week, converting each distinct slot once.
+    """
+    if not availabilities:
+        return []
+    zone = pytz.timezone(zone_name)
+
+    if event.event_type == EventTypeChoices.SPECIFIC_DATES:
+        start_times = [avail["start_time"] for avail in availabilities]
+        table = OffsetTable(zone, min(start_times) - timedelta(days=1), max(start_times) + timedelta(days=1))
+        return [
+            {**avail, "start_time": table.to_local(avail["start_time"]), "end_time": table.to_local(avail["end_time"])}
+            for avail in availabilities
+        ]
 
+    event_zone = pytz.timezone(event.timezone)
+    today = datetime.now(event_zone).date()
+    week_start = today - timedelta(days=today.weekday())
+    projected_slots = {}
+    projected = []
+    for avail in availabilities:
+        slot = (avail["day"], avail["start_time"])
+        if slot not in projected_slots:
+            day_number = DAY_NUMBERS[avail["day"]]
+            start_hour = int(avail["start_time"].split(":")[0])
+            local = event_zone.localize(datetime.combine(week_start + timedelta(days=day_number), time(start_hour)))
+            viewer = local.astimezone(zone)
+            viewer_day = (viewer.date() - week_start).days % 7
+            projected_slots[slot] = (DayOfWeekChoices(viewer_day).label, viewer.strftime("%H:%M"))
+        day_label, start_time = projected_slots[slot]
+        projected.append({**avail, "day": day_label, "start_time": start_time})
+    return projected
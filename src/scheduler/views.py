@@ -8,27 +8,111 @@ from rest_framework_simplejwt.authentication import JWTAuthentication
 from scheduler.authentication import CustomJWTAuthentication
 from datetime import datetime
 import pytz
+import hmac
+import asyncio
+from django.conf import settings
+from django.db import connection, DatabaseError
+from django.db.models.functions import Coalesce
+from django.http import HttpResponse, JsonResponse, StreamingHttpResponse
+from django.shortcuts import redirect
+from django.urls import reverse
+from rest_framework.settings import api_settings
+from scheduler.models import Attendee, Event, EventTypeChoices
+from scheduler.slots import SlotGrid, SLOT_LENGTH, interval_slot_count
+from scheduler.timezones import TIMEZONE_CATALOG, TIMEZONE_CATALOG_HASH, TIMEZONE_CATALOG_MAX_AGE
+from scheduler.write_queue import submit_write
+from scheduler.realtime import event_hub, format_sse, publish_availability_change, publish_attendee_joined
+from scheduler.metrics import render_metrics
+from scheduler.streaming import iter_json, streaming_json_response
+from scheduler.pagination import EventCursorPagination
+from scheduler.renderers import CompactJSONParser, CompactJSONRenderer
 
 from scheduler.utils import(
     get_event_by_unique_id,
     get_attendee_by_event_and_name,
     create_attendee,
-    create_specific_date_availability,
     get_existing_specific_date_availability,
     get_jwt_token,
     get_attendee_availabilitiy_list,
     get_event_availabilities_list,
     get_attendees_availability_count,
+    get_event_summary,
     create_day_of_week_availability,
     get_existing_day_availability,
     get_existing_days_of_week_availability,
+    update_attendee_bitmap,
+    get_specific_date_bits,
+    get_day_of_week_bits,
+    get_event_heatmap,
+    parse_specific_date_slot,
+    parse_day_of_week_slot,
+    apply_specific_date_operations,
+    apply_specific_date_intervals,
+    AvailabilityChanges,
+    ensure_aware,
+    get_available_attendees,
+    apply_day_of_week_operations,
+    apply_bitmap_operations,
+    delete_availability,
+    get_cached_event_data,
+    get_event_etag,
+    etag_matches,
+    format_day_of_week_slot,
+    get_bitmap_availabilities_list,
+    get_bitmap_interval,
+    get_event_day_of_week,
+    get_best_times,
+    project_availabilities,
+    iter_event_availabilities,
+    iter_projected_availabilities,
+    get_compact_availability,
+    get_event_availability_rows,
+    format_availability_rows,
+    decode_bits,
+    get_bitmap_slots,
+    get_attendee_bitmap,
+    get_specific_date_replacement,
+    replace_specific_date_intervals,
+    get_day_of_week_replacement,
+    replace_day_of_week_slots,
+    replace_attendee_bitmap,
+    get_best_windows,
+    get_week_start,
+    get_calendar_window,
+    get_weekly_calendar_window,
+    render_event_calendar,
 )
 
 
 
+def get_timezone_catalog_reference():
+    return {
+        "hash": TIMEZONE_CATALOG_HASH,
+        "url": reverse("timezone-catalog", args=[TIMEZONE_CATALOG_HASH]),
+    }
+
+
+def check_event_attendee(attendee, event):
+    """Returns an error response unless the attendee belongs to the event."""
+    if attendee.event_id != event.id:
+        return Response(
+            {"error": "You are not authorized to modify availability for this event."},
+            status=status.HTTP_403_FORBIDDEN
+        )
+    return None
+
+
+def outside_grid_response():
+    return Response(
+        {"error": "Availability is outside the event time grid."},
+        status=status.HTTP_400_BAD_REQUEST
+    )
+
+
 class EventView(APIView):
     authentication_classes = [CustomJWTAuthentication]
     permission_classes = [IsAuthenticated]
+    renderer_classes = [*api_settings.DEFAULT_RENDERER_CLASSES, CompactJSONRenderer]
 
 
     def get_authenticators(self):
@@ -50,58 +134,317 @@ class EventView(APIView):
             }, status=status.HTTP_201_CREATED)
         return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
 
+    SUMMARY_FIELDS = {
+        "event": lambda event: EventSerializer(event).data,
+        "attendees_with_availability_count": get_attendees_availability_count,
+        "total_available_slots": lambda event: get_event_summary(event)[1],
+        "timezone_catalog": lambda event: get_timezone_catalog_reference(),
+    }
+    FIELDS = {
+        *SUMMARY_FIELDS, "all_event_availabilities", "availability", "attendee_timezone",
+        "attendee_availabilities", "attendee_bitmap", "heatmap",
+    }
+    # the fields only the other representation has
+    JSON_ONLY_FIELDS = {"all_event_availabilities", "attendee_availabilities"}
+    COMPACT_ONLY_FIELDS = {"availability", "attendee_bitmap"}
+
     def get(self, request, unique_id):
         event = get_event_by_unique_id(unique_id)
         if not event:
             return Response({"error": "Event not found."}, status=status.HTTP_404_NOT_FOUND)
 
-        event_serializer = EventSerializer(event)
-        time_zones = pytz.all_timezones
+        attendee = request.user if request.user.is_authenticated else None
+        options = self.get_read_options(request)
+        if isinstance(options, Response):
+            return options
 
-        attendee = request.user
-        attendee_availabilities = []
+        headers = self.get_read_headers(request, event, attendee, options)
+        if etag_matches(request, headers["ETag"]):
+            return Response(status=status.HTTP_304_NOT_MODIFIED, headers=headers)
+        return self.read_response(request, event, attendee, options, headers)
+
+    def get_read_data(self, event, attendee, options):
+        """Gathers the requested parts of a GET, each from the cache of the current event version."""
+        include, display_timezone, compact, stream, fields = options
 
-        if request.user.is_authenticated:
-            attendee = request.user
-            attendee_availabilities = get_attendee_availabilitiy_list(attendee)
-            attendee_timezone = attendee.timezone if attendee.timezone else "Asia/Tehran"
+        def wants(name):
+            return fields is None or name in fields
+
+        if fields is None:
+            response_data = dict(get_cached_event_data(event, "summary", lambda: {
+                name: compute(event) for name, compute in self.SUMMARY_FIELDS.items()
+            }))
         else:
-            attendee_availabilities = []
-            attendee_timezone = "Asia/Tehran"
+            response_data = {
+                name: get_cached_event_data(event, f"field:{name}", lambda compute=compute: compute(event))
+                for name, compute in self.SUMMARY_FIELDS.items() if name in fields
+            }
+        stream = stream and wants("all_event_availabilities")
+        if compact and (wants("availability") or wants("attendee_bitmap")):
+            availability = get_cached_event_data(event, "compact", lambda: get_compact_availability(event))
+            if wants("availability"):
+                response_data["availability"] = availability
+        elif not compact and not stream and wants("all_event_availabilities"):
+            response_data["all_event_availabilities"] = get_cached_event_data(
+                event, "availabilities", lambda: get_event_availabilities_list(event)
+            )
 
-        all_event_availabilities = get_event_availabilities_list(event)
+        if wants("attendee_timezone"):
+            if attendee:
+                response_data["attendee_timezone"] = attendee.timezone if attendee.timezone else "Asia/Tehran"
+            else:
+                response_data["attendee_timezone"] = "Asia/Tehran"
+        if compact:
+            if wants("attendee_bitmap"):
+                bitmaps = dict(zip(availability["attendees"], availability["bitmaps"]))
+                response_data["attendee_bitmap"] = bitmaps.get(attendee.name, "") if attendee else ""
+        elif wants("attendee_availabilities"):
+            if attendee:
+                response_data["attendee_availabilities"] = get_cached_event_data(
+                    event, f"attendee:{attendee.id}", lambda: get_attendee_availabilitiy_list(attendee)
+                )
+            else:
+                response_data["attendee_availabilities"] = []
+
+        if "heatmap" in include.split(",") or (fields is not None and "heatmap" in fields):
+            response_data["heatmap"] = get_cached_event_data(event, "heatmap", lambda: get_event_heatmap(event))
+        return response_data
+
+    def get_read_options(self, request):
+        """Validates the query of a GET; returns (include, display_timezone, compact, stream, fields) or an error response."""
+        include = request.query_params.get("include", "")
+        display_timezone = request.query_params.get("timezone")
+        # the compact form is always on the event's own grid, small enough not to need streaming
+        compact = request.accepted_renderer.format == CompactJSONRenderer.format
+        stream = not compact and request.query_params.get("stream") in ("1", "true")
+        if compact:
+            display_timezone = None
+        if display_timezone and display_timezone not in pytz.all_timezones_set:
+            return Response({"error": "Unknown timezone."}, status=status.HTTP_400_BAD_REQUEST)
+
+        # ?fields= limits the response to the named keys; the others are never computed
+        fields = request.query_params.get("fields")
+        if fields is not None:
+            fields = set(filter(None, fields.split(",")))
+            available = self.FIELDS - (self.JSON_ONLY_FIELDS if compact else self.COMPACT_ONLY_FIELDS)
+            unknown = fields - available
+            if unknown:
+                return Response(
+                    {"error": f"Unknown fields: {', '.join(sorted(unknown))}. Use any of {', '.join(sorted(available))}."},
+                    status=status.HTTP_400_BAD_REQUEST
+                )
+            if "heatmap" in include.split(","):
+                fields.add("heatmap")
+        return include, display_timezone, compact, stream, fields
+
+    def get_read_headers(self, request, event, attendee, options):
+        include, display_timezone, compact, stream, fields = options
+        etag = get_event_etag(
+            event, attendee.id if attendee else None, include, display_timezone, stream,
+            request.accepted_renderer.format, sorted(fields) if fields is not None else None
+        )
+        return {"ETag": etag, "Cache-Control": "private, no-cache", "Vary": "Authorization, Accept"}
+
+    def read_response(self, request, event, attendee, options, headers):
+        """Gathers the data, projects it into the display timezone and renders or streams it."""
+        include, display_timezone, compact, stream, fields = options
+        response_data = self.get_read_data(event, attendee, options)
+        if display_timezone:
+            response_data["display_timezone"] = display_timezone
+            if "all_event_availabilities" in response_data:
+                shared = response_data["all_event_availabilities"]
+                response_data["all_event_availabilities"] = get_cached_event_data(
+                    event, f"tz:{display_timezone}", lambda: project_availabilities(event, shared, display_timezone)
+                )
+            if attendee and "attendee_availabilities" in response_data:
+                mine = response_data["attendee_availabilities"]
+                response_data["attendee_availabilities"] = get_cached_event_data(
+                    event, f"attendee:{attendee.id}:tz:{display_timezone}",
+                    lambda: project_availabilities(event, mine, display_timezone)
+                )
+
+        if stream and (fields is None or "all_event_availabilities" in fields):
+            # the full list is never built: rows go from the database cursor to the socket
+            availabilities = iter_event_availabilities(event)
+            if display_timezone:
+                availabilities = iter_projected_availabilities(event, availabilities, display_timezone)
+            return streaming_json_response(
+                request, iter_json(response_data, "all_event_availabilities", availabilities), headers=headers
+            )
+        return Response(response_data, status=status.HTTP_200_OK, headers=headers)
 
 
-        response_data = {
-            "event": event_serializer.data,
-            "attendees_with_availability_count": get_attendees_availability_count(event),
-            "timezone_options": time_zones,
-            "attendee_timezone": attendee_timezone,
-            "attendee_availabilities": attendee_availabilities,
-            "all_event_availabilities": all_event_availabilities,
+class EventAttendeesView(APIView):
+    """Cursor-paginated attendees of an event, with their number of available slots."""
+    permission_classes = [AllowAny]
+    authentication_classes = []
+
+    def get(self, request, unique_id):
+        event = get_event_by_unique_id(unique_id)
+        if not event:
+            return Response({"error": "Event not found."}, status=status.HTTP_404_NOT_FOUND)
+
+        paginator = EventCursorPagination()
+        attendees = Attendee.objects.filter(event=event).values(
+            "id", "name", slot_count=Coalesce("summary__slot_count", 0)
+        )
+        page = paginator.paginate_queryset(attendees, request, view=self)
+        return paginator.get_paginated_response(page)
+
+
+class EventAvailabilitiesView(APIView):
+    """Cursor-paginated all_event_availabilities, for loading large events progressively.
+
+    With compact storage a page holds the availabilities of ``page_size`` attendees.
+    """
+    permission_classes = [AllowAny]
+    authentication_classes = []
+
+    def get(self, request, unique_id):
+        event = get_event_by_unique_id(unique_id)
+        if not event:
+            return Response({"error": "Event not found."}, status=status.HTTP_404_NOT_FOUND)
+
+        display_timezone = request.query_params.get("timezone")
+        if display_timezone and display_timezone not in pytz.all_timezones_set:
+            return Response({"error": "Unknown timezone."}, status=status.HTTP_400_BAD_REQUEST)
+
+        paginator = EventCursorPagination()
+        page = paginator.paginate_queryset(get_event_availability_rows(event), request, view=self)
+        availabilities = list(format_availability_rows(event, page))
+        if display_timezone:
+            availabilities = project_availabilities(event, availabilities, display_timezone)
+        return paginator.get_paginated_response(availabilities)
+
+
+class AvailabilityExportView(APIView):
+    """Every availability of an event as a streamed JSON download, bounded in memory for any event size."""
+    permission_classes = [AllowAny]
+    authentication_classes = []
+
+    def get(self, request, unique_id):
+        event = get_event_by_unique_id(unique_id)
+        if not event:
+            return Response({"error": "Event not found."}, status=status.HTTP_404_NOT_FOUND)
+
+        display_timezone = request.query_params.get("timezone")
+        if display_timezone and display_timezone not in pytz.all_timezones_set:
+            return Response({"error": "Unknown timezone."}, status=status.HTTP_400_BAD_REQUEST)
+
+        etag = get_event_etag(event, "export", display_timezone)
+        headers = {
+            "ETag": etag,
+            "Cache-Control": "no-cache",
+            "Content-Disposition": f'attachment; filename="event-{event.unique_id}-availability.json"',
         }
-        return Response(response_data, status=status.HTTP_200_OK)
+        if etag_matches(request, etag):
+            return Response(status=status.HTTP_304_NOT_MODIFIED, headers=headers)
+
+        fields = {"event": EventSerializer(event).data}
+        availabilities = iter_event_availabilities(event)
+        if display_timezone:
+            fields["display_timezone"] = display_timezone
+            availabilities = iter_projected_availabilities(event, availabilities, display_timezone)
+        return streaming_json_response(request, iter_json(fields, "availabilities", availabilities), headers=headers)
+
+
+class EventBulkCreateView(APIView):
+    """Creates many events in one request; all are validated before any is written."""
+    permission_classes = [AllowAny]
+    authentication_classes = []
+
+    MAX_EVENTS = 200
+
+    def post(self, request):
+        events_data = request.data.get("events")
+        if not isinstance(events_data, list) or not events_data:
+            return Response(
+                {"error": "A non-empty list of events is required."},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        if len(events_data) > self.MAX_EVENTS:
+            return Response(
+                {"error": f"At most {self.MAX_EVENTS} events can be created per request."},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        serializer = EventSerializer(data=events_data, many=True)
+        if not serializer.is_valid():
+            return Response({"errors": serializer.errors}, status=status.HTTP_400_BAD_REQUEST)
+        events = serializer.save()
+        return Response({
+            'message': f'{len(events)} events created successfully!',
+            'events': [
+                {'name': event.name, 'unique_id': event.unique_id, 'event_link': event.get_event_link()}
+                for event in events
+            ],
+        }, status=status.HTTP_201_CREATED)
 
 
+class EventHeatmapView(APIView):
+    permission_classes = [AllowAny]
 
+    def get(self, request, unique_id):
+        event = get_event_by_unique_id(unique_id)
+        if not event:
+            return Response({"error": "Event not found."}, status=status.HTTP_404_NOT_FOUND)
 
+        return Response({
+            "attendees_with_availability_count": get_attendees_availability_count(event),
+            "heatmap": get_cached_event_data(event, "heatmap", lambda: get_event_heatmap(event)),
+        }, status=status.HTTP_200_OK)
 
 
 class EventOptionView(APIView):
     def get(self, request):
         # TODO
         time_slots = [f"{hour % 12 or 12}:00 {'AM' if hour < 12 else 'PM'}" for hour in range(24)]
-        time_zones = pytz.all_timezones
         return Response({
                 "date_options": ["specific_dates", "days_of_week"],
                 "time_options": {
                     "no_earlier_than": time_slots,
                     "no_later_than": time_slots
                 },
-                "time_zones": time_zones
+                "timezone_catalog": get_timezone_catalog_reference(),
             })
 
 
+class ReadinessView(APIView):
+    permission_classes = [AllowAny]
+    authentication_classes = []
+
+    def get(self, request):
+        try:
+            with connection.cursor() as cursor:
+                cursor.execute("SELECT 1")
+        except DatabaseError:
+            return Response({"status": "unavailable"}, status=status.HTTP_503_SERVICE_UNAVAILABLE)
+        return Response({"status": "ready"}, status=status.HTTP_200_OK)
+
+
+def metrics(request):
+    """Prometheus text exposition of this worker's request, cache and write-queue metrics."""
+    token = request.headers.get("Authorization", "").removeprefix("Bearer ")
+    token_matches = bool(settings.METRICS_TOKEN) and hmac.compare_digest(token, settings.METRICS_TOKEN)
+    if not token_matches and request.META.get("REMOTE_ADDR") not in settings.METRICS_ALLOWED_IPS:
+        return HttpResponse(status=status.HTTP_403_FORBIDDEN)
+    return HttpResponse(render_metrics(), content_type="text/plain; version=0.0.4; charset=utf-8")
+
+
+class TimezoneCatalogView(APIView):
+    permission_classes = [AllowAny]
+    authentication_classes = []
+
+    def get(self, request, catalog_hash):
+        if catalog_hash != TIMEZONE_CATALOG_HASH:
+            return redirect("timezone-catalog", TIMEZONE_CATALOG_HASH)
+
+        response = HttpResponse(TIMEZONE_CATALOG, content_type="application/json")
+        response["Cache-Control"] = f"public, max-age={TIMEZONE_CATALOG_MAX_AGE}, immutable"
+        response["ETag"] = f'"{TIMEZONE_CATALOG_HASH}"'
+        return response
+
+
 class SignInEventView(APIView):
     authentication_classes = [CustomJWTAuthentication]
 
@@ -117,16 +460,19 @@ class SignInEventView(APIView):
         attendee = get_attendee_by_event_and_name(event, name)
 
         if attendee:
-            valid, error = attendee.validate_password(password)
-            if not valid:
-                return Response({"error": error}, status=status.HTTP_401_UNAUTHORIZED)
-            message = "Login successful!"
-            status_code = status.HTTP_200_OK
-        else:
-            attendee = create_attendee(event, name, password, timezone)
-            message = "Sign up successful!"
-            status_code = status.HTTP_201_CREATED
+            return self.signed_in(attendee, *attendee.validate_password(password))
+        return self.signed_up(event, create_attendee(event, name, password, timezone))
 
+    def signed_in(self, attendee, valid, error):
+        if not valid:
+            return Response({"error": error}, status=status.HTTP_401_UNAUTHORIZED)
+        return self.sign_in_response(attendee, "Login successful!", status.HTTP_200_OK)
+
+    def signed_up(self, event, attendee):
+        publish_attendee_joined(event, attendee)
+        return self.sign_in_response(attendee, "Sign up successful!", status.HTTP_201_CREATED)
+
+    def sign_in_response(self, attendee, message, status_code):
         tokens = get_jwt_token(attendee)
         serializer = AttendeeSerializer(attendee)
 
@@ -140,6 +486,7 @@ class SignInEventView(APIView):
 class SpecificDateAvailabilityView(APIView):
     authentication_classes = [CustomJWTAuthentication]
     permission_classes = [IsAuthenticated]
+    parser_classes = [*api_settings.DEFAULT_PARSER_CLASSES, CompactJSONParser]
 
     def post(self, request, unique_id):
         attendee = request.user
@@ -148,12 +495,89 @@ class SpecificDateAvailabilityView(APIView):
         if not event:
             return Response({"error": "Event not found."}, status=status.HTTP_404_NOT_FOUND)
 
-        if attendee.event != event:
+        forbidden = check_event_attendee(attendee, event)
+        if forbidden:
+            return forbidden
+
+        interval = self.parse_added_interval(request)
+        if isinstance(interval, Response):
+            return interval
+        start_time, end_time = interval
+
+        if event.compact_storage:
+            grid = SlotGrid(event)
+            bits = get_specific_date_bits(grid, start_time, end_time)
+            if bits is None:
+                return outside_grid_response()
+            old_bits, new_bits = submit_write(update_attendee_bitmap, attendee, grid, add=bits)
+            added = get_bitmap_availabilities_list(grid, bits & ~old_bits)
+            return self.added_response(event, attendee, added, get_bitmap_interval(grid, new_bits, bits))
+
+        added = submit_write(apply_specific_date_intervals, attendee, [((start_time, end_time), True)]).created
+        avail = get_existing_specific_date_availability(attendee, start_time, end_time)
+        return self.added_response(
+            event, attendee, added, {"id": avail.id, "start_time": avail.start_time, "end_time": avail.end_time}
+        )
+
+    def delete(self, request, unique_id):
+        attendee = request.user
+        event = get_event_by_unique_id(unique_id)
+
+        if not event:
+            return Response({"error": "Event not found."}, status=status.HTTP_404_NOT_FOUND)
+
+        forbidden = check_event_attendee(attendee, event)
+        if forbidden:
+            return forbidden
+
+        interval = self.parse_removed_interval(request)
+        if isinstance(interval, Response):
+            return interval
+        start_time, end_time = interval
+
+        if event.compact_storage:
+            grid = SlotGrid(event)
+            bits = get_specific_date_bits(grid, start_time, end_time)
+            if bits is None:
+                return self.removed_response(event, attendee, [])
+            old_bits, _ = submit_write(update_attendee_bitmap, attendee, grid, remove=bits)
+            return self.removed_response(event, attendee, get_bitmap_availabilities_list(grid, bits & old_bits))
+
+        removed = submit_write(apply_specific_date_intervals, attendee, [((start_time, end_time), False)]).deleted
+        return self.removed_response(event, attendee, removed)
+
+    def added_response(self, event, attendee, added, availability):
+        """Publishes the time ``added`` and returns the stored interval that now covers the request."""
+        if added:
+            publish_availability_change(event, attendee, added=added)
+            message = "Availability successfully added."
+            status_code = status.HTTP_201_CREATED
+        else:
+            message = "Availability already exists."
+            status_code = status.HTTP_200_OK
+
+        response_data = {
+            "message": message,
+            "availability": availability
+        }
+
+        return Response(response_data, status=status_code)
+
+    def removed_response(self, event, attendee, removed):
+        if not removed:
             return Response(
-                {"error": "You are not authorized to modify availability for this event."},
-                status=status.HTTP_403_FORBIDDEN
+                {"error": "No matching availability found."},
+                status=status.HTTP_404_NOT_FOUND
             )
 
+        publish_availability_change(event, attendee, removed=removed)
+        return Response(
+            {"message": "Availability successfully removed."},
+            status=status.HTTP_200_OK
+        )
+
+    def parse_added_interval(self, request):
+        """Returns (start_time, end_time) from the body of a POST, or an error response."""
         start_time_str = request.data.get("start_time")
         end_time_str = request.data.get("end_time")
 
@@ -164,8 +588,8 @@ class SpecificDateAvailabilityView(APIView):
             )
 
         try:
-            start_time = datetime.fromisoformat(start_time_str)
-            end_time = datetime.fromisoformat(end_time_str)
+            start_time = ensure_aware(datetime.fromisoformat(start_time_str))
+            end_time = ensure_aware(datetime.fromisoformat(end_time_str))
         except ValueError:
             return Response(
                 {"error": "Invalid date format. Use ISO 8601 format (YYYY-MM-DDTHH:MM:SS)."},
@@ -177,41 +601,10 @@ class SpecificDateAvailabilityView(APIView):
                 {"error": "End time must be after start time."},
                 status=status.HTTP_400_BAD_REQUEST
             )
+        return start_time, end_time
 
-        existing_availability = get_existing_specific_date_availability(attendee, start_time, end_time)
-        if existing_availability:
-            avail = existing_availability
-            message = "Availability already exists."
-            status_code = status.HTTP_200_OK
-        else:
-            avail = create_specific_date_availability(attendee, start_time, end_time)
-            message = "Availability successfully added."
-            status_code = status.HTTP_201_CREATED
-
-        response_data = {
-            "message": message,
-            "availability": {
-                "id": avail.id,
-                "start_time": avail.start_time,
-                "end_time": avail.end_time
-            }
-        }
-
-        return Response(response_data, status=status_code)
-
-    def delete(self, request, unique_id):
-        attendee = request.user
-        event = get_event_by_unique_id(unique_id)
-
-        if not event:
-            return Response({"error": "Event not found."}, status=status.HTTP_404_NOT_FOUND)
-
-        if attendee.event != event:
-            return Response(
-                {"error": "You are not authorized to modify availability for this event."},
-                status=status.HTTP_403_FORBIDDEN
-            )
-
+    def parse_removed_interval(self, request):
+        """Returns (start_time, end_time) from the body of a DELETE, or an error response."""
         start_time_str = request.data.get("start_time")
         end_time_str = request.data.get("end_time")
 
@@ -222,30 +615,19 @@ class SpecificDateAvailabilityView(APIView):
             )
 
         try:
-            start_time = datetime.fromisoformat(start_time_str)
-            end_time = datetime.fromisoformat(end_time_str)
+            start_time = ensure_aware(datetime.fromisoformat(start_time_str))
+            end_time = ensure_aware(datetime.fromisoformat(end_time_str))
         except ValueError:
             return Response(
                 {"error": "Invalid date format. Use ISO 8601 format."},
                 status=status.HTTP_400_BAD_REQUEST
             )
-
-        existing_availability = get_existing_specific_date_availability(attendee, start_time, end_time)
-        if not existing_availability:
-            return Response(
-                {"error": "No matching availability found."},
-                status=status.HTTP_404_NOT_FOUND
-            )
-
-        existing_availability.delete()
-        return Response(
-            {"message": "Availability successfully removed."},
-            status=status.HTTP_200_OK
-        )
+        return start_time, end_time
 
 class DayOfWeekAvailabilityView(APIView):
     authentication_classes = [CustomJWTAuthentication]
     permission_classes = [IsAuthenticated]
+    parser_classes = [*api_settings.DEFAULT_PARSER_CLASSES, CompactJSONParser]
 
     DAY_MAPPING = {
     "دوشنبه": 0,
@@ -264,12 +646,99 @@ class DayOfWeekAvailabilityView(APIView):
         if not event:
             return Response({"error": "Event not found."}, status=status.HTTP_404_NOT_FOUND)
 
-        if attendee.event != event:
+        forbidden = check_event_attendee(attendee, event)
+        if forbidden:
+            return forbidden
+
+        slot = self.parse_added_slot(request)
+        if isinstance(slot, Response):
+            return slot
+        day_number, start_hour = slot
+
+        if event.compact_storage:
+            grid = SlotGrid(event)
+            bits = get_day_of_week_bits(grid, day_number, start_hour)
+            if bits is None:
+                return outside_grid_response()
+            old_bits, _ = submit_write(update_attendee_bitmap, attendee, grid, add=bits)
+            event_day = get_event_day_of_week(event, day_number)
+            return self.added_response(
+                event, attendee, bits.bit_length() - 1, event_day, start_hour, created=not old_bits & bits
+            )
+
+        avail = get_existing_day_availability(attendee, day_number, start_hour)
+        if avail:
+            return self.added_response(event, attendee, avail.id, avail.event_day_of_week, start_hour, created=False)
+        avail = submit_write(create_day_of_week_availability, event, attendee, day_number, start_hour)
+        return self.added_response(event, attendee, avail.id, avail.event_day_of_week, start_hour, created=True)
+
+    def added_response(self, event, attendee, availability_id, event_day, start_hour, created):
+        if created:
+            publish_availability_change(event, attendee, added=[format_day_of_week_slot(event_day.day, start_hour)])
+            message = "Availability successfully added."
+            status_code = status.HTTP_201_CREATED
+        else:
+            message = "Availability already exists."
+            status_code = status.HTTP_200_OK
+
+        serializer = EventDayOfWeekSerializer(event_day)
+
+        response_data = {
+            "message": message,
+            "availability": {
+                "id": availability_id,
+                "day_of_week": serializer.data,
+                "start_hour": f"{start_hour:02d}:00"
+            }
+        }
+
+        return Response(response_data, status=status_code)
+
+    def delete(self, request, unique_id):
+        attendee = request.user
+        event = get_event_by_unique_id(unique_id)
+
+        if not event:
+            return Response({"error": "Event not found."}, status=status.HTTP_404_NOT_FOUND)
+
+        forbidden = check_event_attendee(attendee, event)
+        if forbidden:
+            return forbidden
+        slot = self.parse_removed_slot(request)
+        if isinstance(slot, Response):
+            return slot
+        day_number, start_hour = slot
+
+        if event.compact_storage:
+            grid = SlotGrid(event)
+            bits = get_day_of_week_bits(grid, day_number, start_hour)
+            if bits is None:
+                return self.removed_response(event, attendee, None)
+            old_bits, _ = submit_write(update_attendee_bitmap, attendee, grid, remove=bits)
+            return self.removed_response(event, attendee, slot if old_bits & bits else None)
+
+        existing_availability = get_existing_days_of_week_availability(attendee, day_number, start_hour)
+        if not existing_availability:
+            return self.removed_response(event, attendee, None)
+        submit_write(delete_availability, event, existing_availability)
+        return self.removed_response(event, attendee, (day_number, start_hour))
+
+    def removed_response(self, event, attendee, slot):
+        """Publishes the removed (day_number, start_hour), or answers 404 when nothing matched."""
+        if slot is None:
             return Response(
-                {"error": "You are not authorized to modify availability for this event."},
-                status=status.HTTP_403_FORBIDDEN
+                {"error": "No matching availability found."},
+                status=status.HTTP_404_NOT_FOUND
             )
 
+        publish_availability_change(event, attendee, removed=[format_day_of_week_slot(*slot)])
+        return Response(
+            {"message": "Availability successfully removed."},
+            status=status.HTTP_200_OK
+        )
+
+    def parse_added_slot(self, request):
+        """Returns (day_number, start_hour) from the body of a POST, or an error response."""
         day_name = request.data.get("day")
         start_time_str = request.data.get("start_time")
 
@@ -295,43 +764,10 @@ class DayOfWeekAvailabilityView(APIView):
         if not (0 <= start_hour <= 23):
             return Response({"error": "Start hour must be between 0 and 23."},
                             status=status.HTTP_400_BAD_REQUEST)
+        return day_number, start_hour
 
-        existing_availability = get_existing_day_availability(attendee, day_number, start_hour)
-
-        if existing_availability:
-            avail = existing_availability
-            message = "Availability already exists."
-            status_code = status.HTTP_200_OK
-        else:
-            avail = create_day_of_week_availability(event, attendee, day_number, start_hour)
-            message = "Availability successfully added."
-            status_code = status.HTTP_201_CREATED
-
-        serializer = EventDayOfWeekSerializer(avail.event_day_of_week)
-
-        response_data = {
-            "message": message,
-            "availability": {
-                "id": avail.id,
-                "day_of_week": serializer.data,
-                "start_hour": avail.get_formated_start_hour()
-            }
-        }
-
-        return Response(response_data, status=status_code)
-
-    def delete(self, request, unique_id):
-        attendee = request.user
-        event = get_event_by_unique_id(unique_id)
-
-        if not event:
-            return Response({"error": "Event not found."}, status=status.HTTP_404_NOT_FOUND)
-
-        if attendee.event != event:
-            return Response(
-                {"error": "You are not authorized to modify availability for this event."},
-                status=status.HTTP_403_FORBIDDEN
-            )
+    def parse_removed_slot(self, request):
+        """Returns (day_number, start_hour) from the body of a DELETE, or an error response."""
         start_hour = request.data.get('start_time')
         if start_hour is None:
             return Response(
@@ -366,17 +802,396 @@ class DayOfWeekAvailabilityView(APIView):
                 {"error": "Invalid day name. Use Persian days (e.g., 'جمعه')."},
                 status=status.HTTP_400_BAD_REQUEST
             )
+        return day_number, start_hour
 
 
-        existing_availability = get_existing_days_of_week_availability(attendee, day_number, start_hour)
-        if not existing_availability:
+class BestTimesView(APIView):
+    permission_classes = [AllowAny]
+
+    MAX_LIMIT = 50
+
+    def get(self, request, unique_id):
+        event = get_event_by_unique_id(unique_id)
+        if not event:
+            return Response({"error": "Event not found."}, status=status.HTTP_404_NOT_FOUND)
+
+        try:
+            duration = int(request.query_params.get("duration", 60))
+            limit = int(request.query_params.get("limit", 5))
+        except ValueError:
             return Response(
-                {"error": "No matching availability found."},
-                status=status.HTTP_404_NOT_FOUND
+                {"error": "Duration (minutes) and limit must be integers."},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        if duration <= 0 or not (1 <= limit <= self.MAX_LIMIT):
+            return Response(
+                {"error": f"Duration must be positive and limit between 1 and {self.MAX_LIMIT}."},
+                status=status.HTTP_400_BAD_REQUEST
             )
 
-        existing_availability.delete()
-        return Response(
-            {"message": "Availability successfully removed."},
-            status=status.HTTP_200_OK
+        length = -(-duration // int(SLOT_LENGTH.total_seconds() // 60))
+        best_times = get_cached_event_data(
+            event, f"best-times:{length}:{limit}", lambda: get_best_times(event, length, limit)
         )
+        return Response({"duration": duration, "best_times": best_times}, status=status.HTTP_200_OK)
+
+
+class EventCalendarView(APIView):
+    """iCalendar download of the event's best times, or of a chosen time given in the query.
+
+    Specific dates events get one entry per window; days of week events get weekly
+    recurrences starting this week. The file is rendered once per event version and query,
+    then served from the cache.
+    """
+    permission_classes = [AllowAny]
+    authentication_classes = []
+
+    def get(self, request, unique_id):
+        event = get_event_by_unique_id(unique_id)
+        if not event:
+            return Response({"error": "Event not found."}, status=status.HTTP_404_NOT_FOUND)
+
+        try:
+            duration = int(request.query_params.get("duration", 60))
+            limit = int(request.query_params.get("limit", 1))
+        except ValueError:
+            return Response(
+                {"error": "Duration (minutes) and limit must be integers."},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        if duration <= 0 or not (1 <= limit <= BestTimesView.MAX_LIMIT):
+            return Response(
+                {"error": f"Duration must be positive and limit between 1 and {BestTimesView.MAX_LIMIT}."},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        length = -(-duration // int(SLOT_LENGTH.total_seconds() // 60))
+
+        chosen_keys = ("start", "end") if event.event_type == EventTypeChoices.SPECIFIC_DATES else ("day", "start_time")
+        chosen = [request.query_params.get(key) for key in chosen_keys]
+        try:
+            if event.event_type == EventTypeChoices.SPECIFIC_DATES:
+                chosen = parse_specific_date_slot(dict(zip(("start_time", "end_time"), chosen))) if any(chosen) else None
+            else:
+                chosen = parse_day_of_week_slot(dict(zip(("day", "start_time"), chosen))) if any(chosen) else None
+        except ValueError as error:
+            return Response({"error": str(error)}, status=status.HTTP_400_BAD_REQUEST)
+
+        week_start = get_week_start(event) if event.event_type == EventTypeChoices.DAYS_OF_WEEK else None
+        chosen_key = "/".join(
+            value.isoformat() if isinstance(value, datetime) else str(value) for value in chosen or ()
+        )
+        variant = ("ics", length, limit, chosen_key, week_start)
+        etag = get_event_etag(event, *variant)
+        headers = {
+            "ETag": etag,
+            "Cache-Control": "no-cache",
+            "Content-Disposition": f'attachment; filename="event-{event.unique_id}.ics"',
+        }
+        if etag_matches(request, etag):
+            return Response(status=status.HTTP_304_NOT_MODIFIED, headers=headers)
+
+        calendar = get_cached_event_data(
+            event, ":".join(map(str, variant)), lambda: self.render(event, length, limit, chosen, week_start)
+        )
+        return HttpResponse(calendar, content_type="text/calendar; charset=utf-8", headers=headers)
+
+    def render(self, event, length, limit, chosen, week_start):
+        if event.event_type == EventTypeChoices.SPECIFIC_DATES:
+            if chosen:
+                return render_event_calendar(event, [
+                    {"start": chosen[0], "end": chosen[1], "description": "Chosen time."}
+                ])
+        elif chosen:
+            window = get_weekly_calendar_window(event, *chosen, length, week_start, "Chosen time.")
+            return render_event_calendar(event, [window])
+
+        grid = SlotGrid(event)
+        windows = [
+            get_calendar_window(grid, index, length, week_start, f"Available ({count}): {', '.join(attendees)}")
+            for index, count, attendees in get_best_windows(grid, length, limit)
+        ]
+        return render_event_calendar(event, windows)
+
+
+class AvailableAttendeesView(APIView):
+    """Who is available for the whole of [start, end) on a specific dates event."""
+    permission_classes = [AllowAny]
+
+    def get(self, request, unique_id):
+        event = get_event_by_unique_id(unique_id)
+        if not event:
+            return Response({"error": "Event not found."}, status=status.HTTP_404_NOT_FOUND)
+
+        if event.event_type != EventTypeChoices.SPECIFIC_DATES:
+            return Response(
+                {"error": "Availability by time range is only supported for events with specific dates."},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        try:
+            start_time, end_time = parse_specific_date_slot({
+                "start_time": request.query_params.get("start"),
+                "end_time": request.query_params.get("end"),
+            })
+        except ValueError as error:
+            return Response({"error": str(error)}, status=status.HTTP_400_BAD_REQUEST)
+
+        attendees = get_available_attendees(event, start_time, end_time)
+        return Response({
+            "start_time": start_time,
+            "end_time": end_time,
+            "count": len(attendees),
+            "attendees": attendees,
+        }, status=status.HTTP_200_OK)
+
+
+class AvailabilityBatchView(APIView):
+    """Applies many slot changes at once: a list of ``operations``, or ``add``/``remove`` bitmaps
+    over the event grid in the compact encoding.
+
+    PUT replaces the attendee's whole availability with the given ``slots`` list or ``bits``
+    bitmap. Only the difference from the stored availability is written, so repeating the
+    same PUT is a single read.
+    """
+    authentication_classes = [CustomJWTAuthentication]
+    permission_classes = [IsAuthenticated]
+    parser_classes = [*api_settings.DEFAULT_PARSER_CLASSES, CompactJSONParser]
+
+    MAX_OPERATIONS = 500
+    MAX_SLOTS = 5000
+    ACTIONS = {"add": True, "remove": False}
+
+    def post(self, request, unique_id):
+        attendee = request.user
+        event = get_event_by_unique_id(unique_id)
+
+        if not event:
+            return Response({"error": "Event not found."}, status=status.HTTP_404_NOT_FOUND)
+
+        forbidden = check_event_attendee(attendee, event)
+        if forbidden:
+            return forbidden
+
+        if "operations" not in request.data and ("add" in request.data or "remove" in request.data):
+            return self.apply_bitmaps(request, event, attendee)
+
+        operations = request.data.get("operations")
+        if not isinstance(operations, list) or not operations:
+            return Response(
+                {"error": "A non-empty list of operations is required."},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        if len(operations) > self.MAX_OPERATIONS:
+            return Response(
+                {"error": f"At most {self.MAX_OPERATIONS} operations are allowed per batch."},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        grid = SlotGrid(event) if event.compact_storage else None
+        event_days = set()
+        if event.event_type == EventTypeChoices.DAYS_OF_WEEK:
+            event_days = {event_day.day for event_day in event.days_of_week.all()}
+        slots = {}
+        slot_bits = {}
+        errors = []
+        for index, operation in enumerate(operations):
+            try:
+                if not isinstance(operation, dict) or operation.get("action") not in self.ACTIONS:
+                    raise ValueError("Action must be 'add' or 'remove'.")
+                if event.event_type == EventTypeChoices.SPECIFIC_DATES:
+                    slot = parse_specific_date_slot(operation)
+                    bits = get_specific_date_bits(grid, *slot) if grid else 0
+                else:
+                    slot = parse_day_of_week_slot(operation)
+                    if slot[0] not in event_days:
+                        raise ValueError("Day is not part of this event.")
+                    bits = get_day_of_week_bits(grid, *slot) if grid else 0
+                if bits is None:
+                    raise ValueError("Availability is outside the event time grid.")
+            except ValueError as error:
+                errors.append({"index": index, "error": str(error)})
+                continue
+            # later operations on the same slot win, like sequential single-slot requests
+            slots.pop(slot, None)
+            slots[slot] = self.ACTIONS[operation["action"]]
+            slot_bits[slot] = bits
+
+        if errors:
+            return Response({"errors": errors}, status=status.HTTP_400_BAD_REQUEST)
+
+        if grid is not None:
+            add = remove = 0
+            for slot, available in slots.items():
+                if available:
+                    add, remove = add | slot_bits[slot], remove & ~slot_bits[slot]
+                else:
+                    add, remove = add & ~slot_bits[slot], remove | slot_bits[slot]
+            changes = submit_write(apply_bitmap_operations, attendee, grid, add, remove)
+            requested = (add | remove).bit_count()
+        elif event.event_type == EventTypeChoices.SPECIFIC_DATES:
+            changes = submit_write(apply_specific_date_operations, attendee, slots)
+            requested = sum(interval_slot_count(start_time, end_time) for start_time, end_time in slots)
+        else:
+            changes = submit_write(apply_day_of_week_operations, event, attendee, slots)
+            requested = len(slots)
+
+        return self.applied(event, attendee, changes, requested)
+
+    def put(self, request, unique_id):
+        attendee = request.user
+        event = get_event_by_unique_id(unique_id)
+
+        if not event:
+            return Response({"error": "Event not found."}, status=status.HTTP_404_NOT_FOUND)
+
+        forbidden = check_event_attendee(attendee, event)
+        if forbidden:
+            return forbidden
+
+        grid = SlotGrid(event) if event.compact_storage or "bits" in request.data else None
+        if "bits" in request.data:
+            try:
+                bits = decode_bits(grid, request.data["bits"])
+            except ValueError as error:
+                return Response({"error": str(error)}, status=status.HTTP_400_BAD_REQUEST)
+            slots = set(get_bitmap_slots(grid, bits))
+        else:
+            slots = self.parse_slots(request, event, grid)
+            if isinstance(slots, Response):
+                return slots
+            if grid is not None:
+                bits = 0
+                for slot_bits in slots.values():
+                    bits |= slot_bits
+            slots = set(slots)
+
+        # the diff is read before queueing so an unchanged resync never reaches the writer
+        if event.compact_storage:
+            if get_attendee_bitmap(attendee) == bits:
+                return self.replaced(event, attendee, AvailabilityChanges([], [], 0, 0))
+            changes = submit_write(replace_attendee_bitmap, attendee, grid, bits)
+        elif event.event_type == EventTypeChoices.SPECIFIC_DATES:
+            _, _, added, removed = get_specific_date_replacement(attendee, slots)
+            if not added and not removed:
+                return self.replaced(event, attendee, AvailabilityChanges([], [], 0, 0))
+            changes = submit_write(replace_specific_date_intervals, attendee, slots)
+        else:
+            if not get_day_of_week_replacement(event, attendee, slots):
+                return self.replaced(event, attendee, AvailabilityChanges([], [], 0, 0))
+            changes = submit_write(replace_day_of_week_slots, event, attendee, slots)
+        return self.replaced(event, attendee, changes)
+
+    def parse_slots(self, request, event, grid):
+        """Returns {slot: bits} for the PUT ``slots`` list (bits are 0 without a grid), or an error Response."""
+        items = request.data.get("slots")
+        if not isinstance(items, list):
+            return Response(
+                {"error": "A list of slots or a bits bitmap is required."},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        if len(items) > self.MAX_SLOTS:
+            return Response(
+                {"error": f"At most {self.MAX_SLOTS} slots are allowed."},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        event_days = set()
+        if event.event_type == EventTypeChoices.DAYS_OF_WEEK:
+            event_days = {event_day.day for event_day in event.days_of_week.all()}
+        slots = {}
+        errors = []
+        for index, item in enumerate(items):
+            try:
+                if not isinstance(item, dict):
+                    raise ValueError("Each slot must be an object.")
+                if event.event_type == EventTypeChoices.SPECIFIC_DATES:
+                    slot = parse_specific_date_slot(item)
+                    bits = get_specific_date_bits(grid, *slot) if grid else 0
+                else:
+                    slot = parse_day_of_week_slot(item)
+                    if slot[0] not in event_days:
+                        raise ValueError("Day is not part of this event.")
+                    bits = get_day_of_week_bits(grid, *slot) if grid else 0
+                if bits is None:
+                    raise ValueError("Availability is outside the event time grid.")
+            except ValueError as error:
+                errors.append({"index": index, "error": str(error)})
+                continue
+            slots[slot] = bits
+
+        if errors:
+            return Response({"errors": errors}, status=status.HTTP_400_BAD_REQUEST)
+        return slots
+
+    def replaced(self, event, attendee, changes):
+        publish_availability_change(event, attendee, added=changes.created, removed=changes.deleted)
+        return Response({
+            "message": "Availability replaced." if changes.created or changes.deleted else "Availability is already up to date.",
+            "created": changes.created_slots,
+            "deleted": changes.deleted_slots,
+        }, status=status.HTTP_200_OK)
+
+    def apply_bitmaps(self, request, event, attendee):
+        grid = SlotGrid(event)
+        try:
+            add = decode_bits(grid, request.data.get("add", ""))
+            remove = decode_bits(grid, request.data.get("remove", ""))
+        except ValueError as error:
+            return Response({"error": str(error)}, status=status.HTTP_400_BAD_REQUEST)
+        if add & remove:
+            return Response(
+                {"error": "A slot cannot be both added and removed."},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        if event.compact_storage:
+            changes = submit_write(apply_bitmap_operations, attendee, grid, add, remove)
+        else:
+            slots = dict.fromkeys(get_bitmap_slots(grid, add), True)
+            slots.update(dict.fromkeys(get_bitmap_slots(grid, remove), False))
+            if event.event_type == EventTypeChoices.SPECIFIC_DATES:
+                changes = submit_write(apply_specific_date_operations, attendee, slots)
+            else:
+                changes = submit_write(apply_day_of_week_operations, event, attendee, slots)
+        return self.applied(event, attendee, changes, (add | remove).bit_count())
+
+    def applied(self, event, attendee, changes, requested):
+        publish_availability_change(event, attendee, added=changes.created, removed=changes.deleted)
+        return Response({
+            "message": "Availability batch applied.",
+            "created": changes.created_slots,
+            "deleted": changes.deleted_slots,
+            # a removal shorter than a slot can cost a slot it did not name
+            "unchanged": max(requested - changes.created_slots - changes.deleted_slots, 0),
+        }, status=status.HTTP_200_OK)
+
+
+STREAM_HEARTBEAT_SECONDS = 20
+
+async def event_stream(request, unique_id):
+    """Server-sent events with availability deltas for one event; requires an ASGI server.
+
+    Every message and keep-alive carries the event's current version, so a client that sees it
+    move without a matching delta (a write handled by another worker) knows to refetch.
+    """
+    versions = Event.objects.filter(unique_id=unique_id).values_list("version", flat=True)
+    if not await versions.aexists():
+        return JsonResponse({"error": "Event not found."}, status=status.HTTP_404_NOT_FOUND)
+
+    async def stream():
+        subscriber = event_hub.subscribe(unique_id)
+        try:
+            yield "retry: 3000\n\n"
+            while True:
+                try:
+                    message = await asyncio.wait_for(subscriber.queue.get(), STREAM_HEARTBEAT_SECONDS)
+                except asyncio.TimeoutError:
+                    message = {"type": "keep-alive"}
+                yield format_sse({**message, "version": await versions.afirst()})
+        finally:
+            event_hub.unsubscribe(unique_id, subscriber)
+
+    response = StreamingHttpResponse(stream(), content_type="text/event-stream")
+    response["Cache-Control"] = "no-cache"
+    response["X-Accel-Buffering"] = "no"
+    return response
@@ -0,0 +1,104 @@
+import asyncio
+import queue
+import threading
+from concurrent.futures import Future
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.db import close_old_connections, transaction
+
+
+class WriteQueue:
+    """Funnels small writes from many request threads through one writer thread.
+
+    The writer drains whatever is queued (up to ``max_batch`` jobs, waiting at most
+    ``max_delay`` seconds for more) and applies it in a single transaction, each job in its
+    own savepoint. SQLite then takes its write lock and syncs once per batch instead of
+    once per request, and request threads never contend for the lock themselves.
+    Callers block until their batch has committed, so a response never reports a write
+    that is not durable yet.
+    """
+
+    def __init__(self, max_batch, max_delay):
+        self.max_batch = max_batch
+        self.max_delay = max_delay
+        self.batches = 0
+        self.jobs = 0
+        self._queue = queue.Queue()
+        self._thread = None
+        self._lock = threading.Lock()
+
+    def submit(self, func, *args, **kwargs):
+        """Runs ``func`` on the writer thread and returns its result (or raises its exception)."""
+        if transaction.get_connection().in_atomic_block:
+            # the caller's own transaction must see and own this write
+            return func(*args, **kwargs)
+        return self._enqueue(func, args, kwargs).result()
+
+    async def asubmit(self, func, *args, **kwargs):
+        return await asyncio.wrap_future(self._enqueue(func, args, kwargs))
+
+    def depth(self):
+        return self._queue.qsize()
+
+    def _enqueue(self, func, args, kwargs):
+        future = Future()
+        self._ensure_writer()
+        self._queue.put((func, args, kwargs, future))
+        return future
+
+    def _ensure_writer(self):
+        # started lazily so each forked server worker gets its own writer
+        with self._lock:
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(target=self._run, name="availability-writer", daemon=True)
+                self._thread.start()
+
+    def _next_batch(self):
+        jobs = [self._queue.get()]
+        while len(jobs) < self.max_batch:
+            try:
+                jobs.append(self._queue.get(timeout=self.max_delay))
+            except queue.Empty:
+                break
+        return jobs
+
+    def _run(self):
+        while True:
+            jobs = self._next_batch()
+            close_old_connections()
+            outcomes = []
+            try:
+                with transaction.atomic():
+                    for func, args, kwargs, _ in jobs:
+                        try:
+                            with transaction.atomic():
+                                outcomes.append((True, func(*args, **kwargs)))
+                        except Exception as error:
+                            outcomes.append((False, error))
+            except Exception as error:
+                outcomes = [(False, error)] * len(jobs)
+
+            self.batches += 1
+            self.jobs += len(jobs)
+            for (_, _, _, future), (succeeded, value) in zip(jobs, outcomes):
+                if succeeded:
+                    future.set_result(value)
+                else:
+                    future.set_exception(value)
+
+
+write_queue = WriteQueue(settings.WRITE_QUEUE_MAX_BATCH, settings.WRITE_QUEUE_MAX_DELAY)
+
+
+def submit_write(func, *args, **kwargs):
+    """Applies an availability write through the write queue when it is enabled."""
+    if settings.AVAILABILITY_WRITE_QUEUE:
+        return write_queue.submit(func, *args, **kwargs)
+    return func(*args, **kwargs)
+
+
+async def asubmit_write(func, *args, **kwargs):
+    if settings.AVAILABILITY_WRITE_QUEUE:
+        return await write_queue.asubmit(func, *args, **kwargs)
+    return await sync_to_async(func)(*args, **kwargs)
@@ -57,7 +57,13 @@ SIMPLE_JWT = {
     "REFRESH_TOKEN_LIFETIME": timedelta(days=7),
 }
 
+# The Prometheus /metrics endpoint is only mounted when one of these is set. A scrape must
+# send "Authorization: Bearer <METRICS_TOKEN>" or come from one of METRICS_ALLOWED_IPS.
+METRICS_TOKEN = os.getenv("METRICS_TOKEN", "")
+METRICS_ALLOWED_IPS = [ip.strip() for ip in os.getenv("METRICS_ALLOWED_IPS", "").split(",") if ip.strip()]
+
 MIDDLEWARE = [
+    'scheduler.middleware.MetricsMiddleware',
     'corsheaders.middleware.CorsMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
@@ -97,9 +103,85 @@ DATABASES = {
     'default': {
         'ENGINE': 'django.db.backends.sqlite3',
         'NAME': BASE_DIR / 'db' / 'db.sqlite3',
+        # Keep connections (and their pragmas) open between requests.
+        'CONN_MAX_AGE': int(os.getenv("DB_CONN_MAX_AGE", 600)),
+        'CONN_HEALTH_CHECKS': True,
+        'OPTIONS': {
+            # WAL lets readers proceed while a write is in progress; IMMEDIATE takes the
+            # write lock at BEGIN so concurrent writers queue on busy_timeout instead of
+            # failing with "database is locked" when upgrading a read lock.
+            'init_command': (
+                # only takes effect on a new database (purge_events can convert an existing one),
+                # and only before the journal mode is set
+                "PRAGMA auto_vacuum=INCREMENTAL;"
+                f"PRAGMA journal_mode={os.getenv('SQLITE_JOURNAL_MODE', 'WAL')};"
+                "PRAGMA synchronous=NORMAL;"
+                "PRAGMA temp_store=MEMORY;"
+                "PRAGMA cache_size=-20000;"
+                "PRAGMA mmap_size=134217728;"
+            ),
+            'transaction_mode': 'IMMEDIATE',
+            'timeout': 20,
+        },
     }
 }
 
+# Route availability writes through the in-process coalescing write queue.
+AVAILABILITY_WRITE_QUEUE = os.getenv("AVAILABILITY_WRITE_QUEUE", "True") == "True"
+WRITE_QUEUE_MAX_BATCH = int(os.getenv("WRITE_QUEUE_MAX_BATCH", 64))
+WRITE_QUEUE_MAX_DELAY = float(os.getenv("WRITE_QUEUE_MAX_DELAY", 0.002))
+
+# Serve the event, sign-in and single-slot availability endpoints with the async views, which
+# hold no thread while waiting under ASGI. Off by default: under WSGI and runserver each async
+# view would run in an event loop of its own. `manage.py serve --interface asgi` turns it on
+# unless ASYNC_VIEWS is set.
+ASYNC_VIEWS = os.getenv("ASYNC_VIEWS", "False") == "True"
+
+
+# Cache
+# https://docs.djangoproject.com/en/5.1/topics/cache/
+
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'OPTIONS': {'MAX_ENTRIES': 5000},
+    }
+}
+
+# Seconds a versioned event response stays cached; writes bump the version instead of expiring it.
+EVENT_CACHE_TIMEOUT = int(os.getenv("EVENT_CACHE_TIMEOUT", 600))
+
+# In-process cache of event definitions looked up by unique_id.
+EVENT_LOOKUP_CACHE_SIZE = int(os.getenv("EVENT_LOOKUP_CACHE_SIZE", 1024))
+EVENT_LOOKUP_CACHE_TTL = int(os.getenv("EVENT_LOOKUP_CACHE_TTL", 300))
+# Upper bound, in seconds, on how stale a cached event's version counter may get.
+EVENT_VERSION_MAX_AGE = float(os.getenv("EVENT_VERSION_MAX_AGE", 1))
+
+# Retention: an event expires this many days after its last date, or after this many days
+# without attendee or availability writes. Expired events are archived and deleted by the
+# purge_events command.
+EVENT_RETENTION_DAYS_AFTER_LAST_DATE = int(os.getenv("EVENT_RETENTION_DAYS_AFTER_LAST_DATE", 30))
+EVENT_RETENTION_INACTIVE_DAYS = int(os.getenv("EVENT_RETENTION_INACTIVE_DAYS", 180))
+EVENT_ARCHIVE_DIR = os.getenv("EVENT_ARCHIVE_DIR", BASE_DIR / "db" / "archive")
+
+
+# Password hashing
+# https://docs.djangoproject.com/en/5.1/topics/auth/passwords/
+
+# Event passwords only guard a shared scheduling link, so attendee sign-up and sign-in ask
+# for EventPasswordHasher, which trades the Django work factor for sign-in throughput;
+# older attendee hashes are upgraded on sign-in. Everything else uses the first hasher.
+PASSWORD_HASHERS = [
+    'django.contrib.auth.hashers.PBKDF2PasswordHasher',
+    'scheduler.hashers.EventPasswordHasher',
+    'django.contrib.auth.hashers.PBKDF2SHA1PasswordHasher',
+    'django.contrib.auth.hashers.Argon2PasswordHasher',
+    'django.contrib.auth.hashers.BCryptSHA256PasswordHasher',
+    'django.contrib.auth.hashers.ScryptPasswordHasher',
+]
+EVENT_PASSWORD_ITERATIONS = int(os.getenv("EVENT_PASSWORD_ITERATIONS", 100_000))
+PASSWORD_HASHING_WORKERS = int(os.getenv("PASSWORD_HASHING_WORKERS", os.cpu_count() or 1))
+
 
 # Password validation
 # https://docs.djangoproject.com/en/5.1/ref/settings/#auth-password-validators
@@ -14,10 +14,16 @@ Including another URLconf
     1. Import the include() function: from django.urls import include, path
     2. Add a URL to urlpatterns:  path('blog/', include('blog.urls'))
 """
+from django.conf import settings
 from django.contrib import admin
 from django.urls import path, include
+from scheduler.views import ReadinessView, metrics
 
 urlpatterns = [
     path('admin/', admin.site.urls),
+    path('ready/', ReadinessView.as_view(), name='ready'),
     path('event/', include("scheduler.urls")),
 ]
+
+if settings.METRICS_TOKEN or settings.METRICS_ALLOWED_IPS:
+    urlpatterns.append(path('metrics', metrics, name='metrics'))